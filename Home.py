@@ -1,6 +1,7 @@
 import streamlit as st
 import requests
 import os
+import uuid
 
 # Allow user to select API endpoint or use environment variable
 API_OPTIONS = [
@@ -15,7 +16,7 @@ def get_api_url():
 def get_api_response(messages):
     url = get_api_url()
     try:
-        resp = requests.post(url, json={"messages": messages})
+        resp = requests.post(url, json={"messages": messages, "session_id": st.session_state.session_id})
         if resp.ok:
             return resp.json().get("response", "<no response field>")
         else:
@@ -37,6 +38,7 @@ st.session_state.api_url = api_url
 # Add Refresh button to clear conversation
 if st.sidebar.button("🔄 Refresh Conversation"):
     st.session_state.messages = []
+    st.session_state.session_id = uuid.uuid4().hex
     st.session_state.current_step = "intro"
     st.session_state.current_version = 0
     st.rerun()
@@ -44,6 +46,8 @@ if st.sidebar.button("🔄 Refresh Conversation"):
 st.title("Essay Engineering")
 
 # Initialize session state for chat history and conversation state
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
 if "messages" not in st.session_state:
     st.session_state.messages = []
 if "current_step" not in st.session_state:
@@ -1 +1,16 @@
-# This file makes the agent directory a Python package
+# This file makes the agent directory a Python package.
+# Agents are imported on first access so that `import agent` stays cheap and
+# EssayAgent's langchain/langgraph dependencies load only when it is used.
+
+__all__ = ["SimpleEssayAgent", "EssayAgent", "EssayState"]
+
+def __getattr__(name):
+    if name == "SimpleEssayAgent":
+        from agent.simple_essay_agent import SimpleEssayAgent
+
+        return SimpleEssayAgent
+    if name in ("EssayAgent", "EssayState"):
+        from agent import essay_agent
+
+        return getattr(essay_agent, name)
+    raise AttributeError(f"module 'agent' has no attribute '{name}'")
@@ -0,0 +1,276 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, Optional
+
+from utils.metrics import REGISTRY, LLMCall, track_llm_call
+from utils.session_store import DEFAULT_DB_PATH
+
+# USD per million prompt and completion tokens
+MODEL_PRICES = {
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60)
+}
+
+# Downgrade tiers, cheapest last: the configured model, a smaller model, then
+# cached or reference answers and the rule-based path (no LLM call)
+TIERS = ("full", "small", "cached")
+
+# Share of a budget at which a session or tenant moves to the smaller model
+SOFT_LIMIT = float(os.getenv("ESSAY_BUDGET_SOFT_LIMIT", "0.8"))
+SMALL_MODEL = os.getenv("ESSAY_BUDGET_SMALL_MODEL", "gpt-4.1-nano")
+# Tenant budgets apply per window (a day by default); session budgets to the whole session
+TENANT_WINDOW_SECONDS = float(os.getenv("ESSAY_TENANT_BUDGET_WINDOW", "86400"))
+
+LLM_COST = REGISTRY.counter(
+    "essay_llm_cost_dollars_total", "Estimated cost of LLM calls in USD", ["model"])
+TENANT_TOKENS = REGISTRY.counter(
+    "essay_tenant_llm_tokens_total", "Tokens used by LLM calls per tenant", ["tenant"])
+TENANT_COST = REGISTRY.counter(
+    "essay_tenant_llm_cost_dollars_total", "Estimated cost of LLM calls in USD per tenant", ["tenant"])
+BUDGET_DECISIONS = REGISTRY.counter(
+    "essay_budget_decisions_total", "LLM calls planned per budget tier", ["tier"])
+
+def llm_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Price of a call in USD, 0 for models without a known price."""
+    prompt_price, completion_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+@dataclass
+class BudgetLimits:
+    """Most tokens, USD and seconds of LLM time a session or tenant may use; 0 means unlimited."""
+    tokens: int = 0
+    cost: float = 0.0
+    llm_seconds: float = 0.0
+
+    @classmethod
+    def from_env(cls, scope: str, tokens: int, cost: float, llm_seconds: float) -> "BudgetLimits":
+        """Limits from ESSAY_<SCOPE>_TOKEN_BUDGET, ESSAY_<SCOPE>_COST_BUDGET and ESSAY_<SCOPE>_LLM_SECONDS."""
+        prefix = f"ESSAY_{scope.upper()}"
+        return cls(
+            tokens=int(os.getenv(f"{prefix}_TOKEN_BUDGET", str(tokens))),
+            cost=float(os.getenv(f"{prefix}_COST_BUDGET", str(cost))),
+            llm_seconds=float(os.getenv(f"{prefix}_LLM_SECONDS", str(llm_seconds)))
+        )
+
+@dataclass
+class Usage:
+    """LLM usage of a session or tenant."""
+    tokens: int = 0
+    cost: float = 0.0
+    llm_seconds: float = 0.0
+    calls: int = 0
+
+    def share(self, limits: BudgetLimits) -> float:
+        """Largest share of any limit used (0 if there are no limits)."""
+        shares = [used / limit for used, limit in ((self.tokens, limits.tokens), (self.cost, limits.cost),
+                                                   (self.llm_seconds, limits.llm_seconds)) if limit > 0]
+        return max(shares, default=0.0)
+
+@dataclass
+class Plan:
+    """How to answer the next LLM-backed step of a session."""
+    tier: str
+    model: Optional[str]  # Model to call, None when no LLM call should be made
+
+    @property
+    def allows_llm(self) -> bool:
+        return self.model is not None
+
+class BudgetManager:
+    """
+    Token, cost and LLM-time budgets per session and per tenant (e.g. a school).
+
+    Usage is kept in the session database, so every worker sees the same totals.
+    Before an LLM call, plan() picks the tier the budgets allow: the configured
+    model, a smaller model once either budget passes SOFT_LIMIT, and no LLM call
+    at all once one is used up.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, session_limits: Optional[BudgetLimits] = None,
+                 tenant_limits: Optional[BudgetLimits] = None, soft_limit: float = SOFT_LIMIT,
+                 small_model: str = SMALL_MODEL, tenant_window: float = TENANT_WINDOW_SECONDS):
+        """
+        Initialize the budget manager.
+
+        Args:
+            db_path: Path of the SQLite database shared with the session store
+            session_limits: Limits of each session, from ESSAY_SESSION_* by default
+            tenant_limits: Limits of each tenant per window, from ESSAY_TENANT_* by default
+            soft_limit: Share of a budget after which the smaller model is used
+            small_model: Model used once a budget passes the soft limit
+            tenant_window: Seconds after which a tenant's usage starts over
+        """
+        self.db_path = db_path
+        self.session_limits = session_limits or BudgetLimits.from_env("session", 60_000, 0.05, 120)
+        self.tenant_limits = tenant_limits or BudgetLimits.from_env("tenant", 5_000_000, 5.0, 7200)
+        self.soft_limit = soft_limit
+        self.small_model = small_model
+        self.tenant_window = tenant_window
+        self._local = threading.local()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connect().execute(
+            """CREATE TABLE IF NOT EXISTS llm_usage (
+                scope TEXT NOT NULL,
+                key TEXT NOT NULL,
+                window_start REAL NOT NULL,
+                tokens INTEGER NOT NULL DEFAULT 0,
+                cost REAL NOT NULL DEFAULT 0,
+                llm_seconds REAL NOT NULL DEFAULT 0,
+                calls INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (scope, key)
+            )"""
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return the connection owned by the calling thread."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _window_start(self, scope: str, now: float) -> float:
+        """Start of the current budget window of a scope."""
+        if scope == "tenant" and self.tenant_window > 0:
+            return now - now % self.tenant_window
+        return 0.0
+
+    def usage(self, scope: str, key: Optional[str]) -> Usage:
+        """Usage of a session ("session") or tenant ("tenant") in the current window."""
+        if not key:
+            return Usage()
+        row = self._connect().execute(
+            "SELECT tokens, cost, llm_seconds, calls FROM llm_usage WHERE scope = ? AND key = ? AND window_start = ?",
+            (scope, key, self._window_start(scope, time.time()))
+        ).fetchone()
+        return Usage(*row) if row else Usage()
+
+    def tier(self, session_id: Optional[str], tenant_id: Optional[str]) -> str:
+        """Tier the budgets of a session and its tenant allow: "full", "small" or "cached"."""
+        share = max(self.usage("session", session_id).share(self.session_limits),
+                    self.usage("tenant", tenant_id).share(self.tenant_limits))
+        if share >= 1.0:
+            return "cached"
+        return "small" if share >= self.soft_limit else "full"
+
+    def plan(self, session_id: Optional[str], tenant_id: Optional[str], model: str) -> Plan:
+        """
+        Choose the tier of the next LLM call of a session.
+
+        Args:
+            session_id: The session making the call
+            tenant_id: The session's tenant, if known
+            model: The model the call would use within budget
+
+        Returns:
+            Plan: The tier and the model to call (None for no LLM call)
+        """
+        tier = self.tier(session_id, tenant_id)
+        plan = Plan(tier, None if tier == "cached" else (self.small_model if tier == "small" else model))
+        BUDGET_DECISIONS.inc(tier=plan.tier)
+        return plan
+
+    def record(self, session_id: Optional[str], tenant_id: Optional[str], model: str,
+               prompt_tokens: int = 0, completion_tokens: int = 0, seconds: float = 0.0):
+        """Add one LLM call to the usage of its session and tenant."""
+        tokens = prompt_tokens + completion_tokens
+        cost = llm_cost(model, prompt_tokens, completion_tokens)
+        LLM_COST.inc(cost, model=model)
+        if tenant_id:
+            TENANT_TOKENS.inc(tokens, tenant=tenant_id)
+            TENANT_COST.inc(cost, tenant=tenant_id)
+        now = time.time()
+        conn = self._connect()
+        for scope, key in (("session", session_id), ("tenant", tenant_id)):
+            if not key:
+                continue
+            window_start = self._window_start(scope, now)
+            # A row from an earlier window starts over
+            conn.execute(
+                """INSERT INTO llm_usage (scope, key, window_start, tokens, cost, llm_seconds, calls)
+                   VALUES (?, ?, ?, ?, ?, ?, 1)
+                   ON CONFLICT (scope, key) DO UPDATE SET
+                       tokens = CASE WHEN window_start = excluded.window_start THEN tokens + excluded.tokens ELSE excluded.tokens END,
+                       cost = CASE WHEN window_start = excluded.window_start THEN cost + excluded.cost ELSE excluded.cost END,
+                       llm_seconds = CASE WHEN window_start = excluded.window_start THEN llm_seconds + excluded.llm_seconds ELSE excluded.llm_seconds END,
+                       calls = CASE WHEN window_start = excluded.window_start THEN calls + 1 ELSE 1 END,
+                       window_start = excluded.window_start""",
+                (scope, key, window_start, tokens, cost, seconds)
+            )
+
+    def session(self, session_id: Optional[str], tenant_id: Optional[str] = None) -> "SessionBudget":
+        """The budget of one session, for planning and tracking its calls."""
+        return SessionBudget(self, session_id, tenant_id)
+
+    def report(self, session_id: str, tenant_id: Optional[str] = None) -> Dict[str, Any]:
+        """Usage, limits and current tier of a session (and its tenant), as reported by the API."""
+        report = {
+            "session": {**asdict(self.usage("session", session_id)), "limits": asdict(self.session_limits)},
+            "tier": self.tier(session_id, tenant_id)
+        }
+        if tenant_id:
+            report["tenant"] = {**asdict(self.usage("tenant", tenant_id)), "limits": asdict(self.tenant_limits)}
+        return report
+
+class SessionBudget:
+    """The budget of one session: plans its LLM calls and records what they used."""
+
+    def __init__(self, manager: BudgetManager, session_id: Optional[str], tenant_id: Optional[str] = None):
+        self.manager = manager
+        self.session_id = session_id
+        self.tenant_id = tenant_id
+
+    def plan(self, model: str) -> Plan:
+        return self.manager.plan(self.session_id, self.tenant_id, model)
+
+    @contextmanager
+    def track(self, model: str) -> Iterator[LLMCall]:
+        """
+        Record the latency, tokens and cost of one LLM call against the session and its tenant.
+
+        Use like utils.metrics.track_llm_call: report the tokens through the yielded handle.
+        """
+        call = _BudgetedCall(model)
+        started = time.perf_counter()
+        try:
+            with track_llm_call(model):
+                yield call
+        finally:
+            self.manager.record(self.session_id, self.tenant_id, model, call.prompt_tokens,
+                                call.completion_tokens, time.perf_counter() - started)
+
+class _BudgetedCall(LLMCall):
+    """LLM call handle that also remembers the tokens for the budget."""
+
+    def __init__(self, model: str):
+        super().__init__(model)
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def record_usage(self, prompt_tokens: int = 0, completion_tokens: int = 0):
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        super().record_usage(prompt_tokens, completion_tokens)
+
+_manager: Optional[BudgetManager] = None
+_manager_lock = threading.Lock()
+
+def get_budget_manager() -> BudgetManager:
+    """Return the process-wide budget manager, creating it on first use."""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = BudgetManager(os.getenv("ESSAY_SESSION_DB", DEFAULT_DB_PATH))
+    return _manager
@@ -0,0 +1,282 @@
+import json
+import mmap
+import os
+import re
+import sys
+import shutil
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from agent.sentence_index import RELOAD_CHECK_SECONDS, iter_sentence_spans
+
+CORPUS_DIR = os.path.join("data", "corpus")
+
+# Units whose (start, end) byte offsets the index holds, in file order
+UNITS = ("page", "paragraph", "sentence")
+
+TEXT_FILE = "corpus.txt"
+OFFSETS_FILE = "corpus.offsets"
+MANIFEST_FILE = "corpus.json"
+# Names the generation directory that readers should map
+CURRENT_FILE = "CURRENT"
+GENERATION_PREFIX = "gen-"
+
+_PARAGRAPH = re.compile(r"[^\n]*\S[^\n]*")
+
+def _byte_spans(text: str, spans: List[Tuple[int, int]], base: int) -> List[Tuple[int, int]]:
+    """Convert ordered character spans of a text to UTF-8 byte offsets, shifted by base."""
+    result = []
+    position, offset = 0, base
+    for start, end in spans:
+        offset += len(text[position:start].encode("utf-8"))
+        start_byte = offset
+        offset += len(text[start:end].encode("utf-8"))
+        position = end
+        result.append((start_byte, offset))
+    return result
+
+def build_corpus(documents: Dict[str, List[str]], directory: str = CORPUS_DIR) -> Dict:
+    """
+    Write a corpus store: the documents' text as one UTF-8 file plus an offsets index.
+
+    The index holds the byte range of every page, paragraph (non-empty line of the
+    extracted text) and sentence, as little-endian uint64 pairs. All three files
+    are written next to the store and swapped in, so readers never see a partial
+    store.
+
+    Args:
+        documents: Name of each document mapped to the text of its pages
+        directory: Where to write the store
+
+    Returns:
+        Dict: The manifest (documents with their byte ranges, and the number of each unit)
+    """
+    os.makedirs(directory, exist_ok=True)
+    spans: Dict[str, List[Tuple[int, int]]] = {unit: [] for unit in UNITS}
+    manifest = {"documents": [], "units": {}}
+    offset = 0
+    with open(os.path.join(directory, TEXT_FILE + ".tmp"), "wb") as f:
+        for name, pages in documents.items():
+            text = "\n".join(pages)
+            page_spans, position = [], 0
+            for page in pages:
+                page_spans.append((position, position + len(page)))
+                position += len(page) + 1
+            spans["page"].extend(_byte_spans(text, page_spans, offset))
+            spans["paragraph"].extend(_byte_spans(text, [m.span() for m in _PARAGRAPH.finditer(text)], offset))
+            spans["sentence"].extend(_byte_spans(text, list(iter_sentence_spans(text)), offset))
+            data = text.encode("utf-8") + b"\n"
+            f.write(data)
+            manifest["documents"].append({"name": name, "start": offset, "end": offset + len(data) - 1,
+                                          "pages": len(pages)})
+            offset += len(data)
+
+    offsets = array("Q")
+    for unit in UNITS:
+        manifest["units"][unit] = {"first": len(offsets) // 2, "count": len(spans[unit])}
+        for start, end in spans[unit]:
+            offsets.extend((start, end))
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    with open(os.path.join(directory, OFFSETS_FILE + ".tmp"), "wb") as f:
+        offsets.tofile(f)
+    with open(os.path.join(directory, MANIFEST_FILE + ".tmp"), "w") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    # The manifest goes last: a reader that sees it finds matching text and offsets
+    for filename in (TEXT_FILE, OFFSETS_FILE, MANIFEST_FILE):
+        os.replace(os.path.join(directory, filename + ".tmp"), os.path.join(directory, filename))
+    return manifest
+
+class CorpusStore:
+    """
+    Read-only, memory-mapped view of a corpus store written by build_corpus.
+
+    The text and the offsets are mapped, not read, so every worker process
+    shares one copy through the page cache, and passages are sliced out as
+    zero-copy memoryviews (decode them with bytes(view).decode() or
+    text() when a str is needed).
+    """
+
+    def __init__(self, directory: str = CORPUS_DIR):
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST_FILE)) as f:
+            self.manifest = json.load(f)
+        self._text_file = open(os.path.join(directory, TEXT_FILE), "rb")
+        self._offsets_file = open(os.path.join(directory, OFFSETS_FILE), "rb")
+        # mmap cannot map empty files
+        self._text = mmap.mmap(self._text_file.fileno(), 0, access=mmap.ACCESS_READ) \
+            if os.fstat(self._text_file.fileno()).st_size else b""
+        self._offsets_map = mmap.mmap(self._offsets_file.fileno(), 0, access=mmap.ACCESS_READ) \
+            if os.fstat(self._offsets_file.fileno()).st_size else None
+        self._view = memoryview(self._text)
+        if self._offsets_map is None:
+            self._offsets = array("Q")
+        elif sys.byteorder == "little":
+            self._offsets = memoryview(self._offsets_map).cast("Q")
+        else:
+            self._offsets = array("Q", bytes(self._offsets_map))
+            self._offsets.byteswap()
+        self._document_starts = [document["start"] for document in self.manifest["documents"]]
+
+    @property
+    def documents(self) -> List[str]:
+        return [document["name"] for document in self.manifest["documents"]]
+
+    def count(self, unit: str) -> int:
+        """Number of pages, paragraphs or sentences in the corpus."""
+        return self.manifest["units"][unit]["count"]
+
+    def span(self, unit: str, i: int) -> Tuple[int, int]:
+        """Byte range of the i-th page, paragraph or sentence."""
+        if not 0 <= i < self.count(unit):
+            raise IndexError(f"{unit} {i} out of range")
+        item = self.manifest["units"][unit]["first"] + i
+        return self._offsets[2 * item], self._offsets[2 * item + 1]
+
+    def passage(self, start: int, end: int) -> memoryview:
+        """Zero-copy view of a byte range of the corpus."""
+        return self._view[start:end]
+
+    def text(self, start: int, end: int) -> str:
+        """Decoded text of a byte range of the corpus."""
+        return str(self._view[start:end], "utf-8")
+
+    def unit(self, unit: str, i: int) -> memoryview:
+        """Zero-copy view of the i-th page, paragraph or sentence."""
+        return self.passage(*self.span(unit, i))
+
+    def iter_units(self, unit: str) -> Iterator[Tuple[str, memoryview]]:
+        """Yield (document name, zero-copy view) of every page, paragraph or sentence in order."""
+        for i in range(self.count(unit)):
+            start, end = self.span(unit, i)
+            yield self.document_at(start), self._view[start:end]
+
+    def document_at(self, offset: int) -> str:
+        """Name of the document holding a byte offset."""
+        return self.manifest["documents"][bisect_right(self._document_starts, offset) - 1]["name"]
+
+    def document(self, name: str) -> memoryview:
+        """Zero-copy view of a whole document."""
+        for document in self.manifest["documents"]:
+            if document["name"] == name:
+                return self._view[document["start"]:document["end"]]
+        raise KeyError(name)
+
+    def close(self):
+        """Release the mappings (views handed out must be released first)."""
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        self._view.release()
+        for mapping in (self._text, self._offsets_map):
+            if isinstance(mapping, mmap.mmap):
+                mapping.close()
+        self._text_file.close()
+        self._offsets_file.close()
+
+def extract_documents(docs_dir: str = "docs") -> Dict[str, List[str]]:
+    """Extract the pages of every PDF in a directory, keyed by file name without extension."""
+    from utils.pdf_utils import extract_pages_by_document
+
+    pdf_paths = [os.path.join(docs_dir, filename) for filename in sorted(os.listdir(docs_dir))
+                 if filename.lower().endswith(".pdf")]
+    return {os.path.splitext(os.path.basename(path))[0]: pages
+            for path, pages in extract_pages_by_document(pdf_paths).items()}
+
+def publish_corpus(documents: Dict[str, List[str]], root: str = CORPUS_DIR, keep: int = 2) -> str:
+    """
+    Write a new generation of the corpus store and make it the current one.
+
+    Each generation lives in its own directory under root; the CURRENT file naming
+    it is replaced atomically once the generation is complete, so live workers keep
+    reading the store they mapped and switch to the new one on their next check.
+
+    Args:
+        documents: Name of each document mapped to the text of its pages
+        root: Directory holding the generations
+        keep: Generations to keep, the current one included (older ones stay readable
+            by processes that still map them until they let go)
+
+    Returns:
+        str: Directory of the new generation
+    """
+    os.makedirs(root, exist_ok=True)
+    generation = os.path.join(root, f"{GENERATION_PREFIX}{time.time_ns()}")
+    build_corpus(documents, generation)
+    with open(os.path.join(root, CURRENT_FILE + ".tmp"), "w") as f:
+        f.write(os.path.basename(generation))
+    os.replace(os.path.join(root, CURRENT_FILE + ".tmp"), os.path.join(root, CURRENT_FILE))
+
+    generations = sorted(name for name in os.listdir(root) if name.startswith(GENERATION_PREFIX))
+    for name in generations[:-keep]:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    return generation
+
+def current_corpus_dir(root: str = CORPUS_DIR) -> Optional[str]:
+    """Directory of the current corpus store: the generation named by CURRENT, else root itself if it holds a store."""
+    try:
+        with open(os.path.join(root, CURRENT_FILE)) as f:
+            return os.path.join(root, f.read().strip())
+    except FileNotFoundError:
+        return root if os.path.exists(os.path.join(root, MANIFEST_FILE)) else None
+
+# Seconds a replaced store stays open for requests still reading it
+RETIRE_AFTER_SECONDS = float(os.getenv("ESSAY_CORPUS_RETIRE_SECONDS", "60"))
+
+_default_store: Optional[CorpusStore] = None
+_default_lock = threading.Lock()
+_last_check = 0.0
+# Replaced stores with the time they were replaced, closed once RETIRE_AFTER_SECONDS have passed
+_retired: List[Tuple[float, CorpusStore]] = []
+
+def _close_retired(now: float):
+    """Close the replaced stores whose grace period is over and that no view still uses."""
+    remaining = []
+    for retired_at, store in _retired:
+        if now - retired_at < RETIRE_AFTER_SECONDS:
+            remaining.append((retired_at, store))
+            continue
+        try:
+            store.close()
+        except BufferError:
+            # A view handed out from it is still alive; try again on a later check
+            remaining.append((retired_at, store))
+    _retired[:] = remaining
+
+def get_corpus_store() -> Optional[CorpusStore]:
+    """
+    Return the process-wide corpus store, or None if it has not been built.
+
+    At most once every RELOAD_CHECK_SECONDS the current generation is checked, and
+    a newly published one is mapped in its place. The previous store stays open for
+    RETIRE_AFTER_SECONDS, so requests reading it can finish, and is closed on a later
+    check once no view from it is alive. Its files, which publish_corpus may have
+    deleted, are then released.
+    """
+    global _default_store, _last_check
+    if _default_store is not None and time.monotonic() - _last_check < RELOAD_CHECK_SECONDS:
+        return _default_store
+    with _default_lock:
+        now = _last_check = time.monotonic()
+        directory = current_corpus_dir(CORPUS_DIR)
+        if directory is not None and (_default_store is None or _default_store.directory != directory):
+            try:
+                store = CorpusStore(directory)
+                if _default_store is not None:
+                    _retired.append((now, _default_store))
+                _default_store = store
+            except Exception as e:
+                print(f"Error loading corpus store {directory}: {str(e)}")
+        _close_retired(now)
+    return _default_store
+
+if __name__ == "__main__":
+    docs_dir = sys.argv[1] if len(sys.argv) > 1 else "docs"
+    generation = publish_corpus(extract_documents(docs_dir))
+    store = CorpusStore(generation)
+    counts = ", ".join(f"{store.count(unit)} {unit}s" for unit in UNITS)
+    print(f"Stored {len(store.documents)} documents ({counts}) in {generation}")
+    store.close()
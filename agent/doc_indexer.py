@@ -0,0 +1,205 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from agent.corpus_store import CORPUS_DIR, CorpusStore, current_corpus_dir, publish_corpus
+from agent.sentence_index import SENTENCE_INDEX_PATH, index_corpus
+
+# Hash, size and modification time of every PDF at the last sync
+DOCS_MANIFEST_FILE = "documents.json"
+# Extracted pages of each PDF, one JSON file per content hash
+PAGES_DIR = "pages"
+
+@dataclass
+class SyncResult:
+    """What a sync found in docs/ and what it published."""
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    extracted: List[str] = field(default_factory=list)
+    generation: Optional[str] = None  # Directory of the corpus published by this sync, if any
+
+    @property
+    def modified(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+def file_hash(path: str) -> str:
+    """SHA-1 of a file's content."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class DocIndexer:
+    """
+    Keeps the corpus store and the sentence index in step with the PDFs in docs/.
+
+    PDFs are told apart by content hash: only added or changed files are extracted,
+    and the pages of the others come from the extraction cache. Each sync that
+    finds a difference publishes a new corpus generation and rewrites the sentence
+    index atomically, and live workers switch to both on their next reload check.
+    Run one indexer per deployment (see `python -m agent.doc_indexer --watch`).
+    """
+
+    def __init__(self, docs_dir: str = "docs", corpus_dir: str = CORPUS_DIR,
+                 index_path: str = SENTENCE_INDEX_PATH, keep_generations: int = 2):
+        """
+        Initialize the indexer.
+
+        Args:
+            docs_dir: Directory of the PDFs
+            corpus_dir: Directory of the corpus generations, the docs manifest and the extraction cache
+            index_path: Where the sentence index is written
+            keep_generations: Corpus generations kept on disk, the current one included
+        """
+        self.docs_dir = docs_dir
+        self.corpus_dir = corpus_dir
+        self.index_path = index_path
+        self.keep_generations = keep_generations
+
+    def _load_manifest(self) -> Dict[str, Dict]:
+        try:
+            with open(os.path.join(self.corpus_dir, DOCS_MANIFEST_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save_manifest(self, manifest: Dict[str, Dict]):
+        path = os.path.join(self.corpus_dir, DOCS_MANIFEST_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+
+    def scan(self, previous: Optional[Dict[str, Dict]] = None) -> Dict[str, Dict]:
+        """
+        Describe the PDFs currently in docs/.
+
+        Files whose size and modification time match the previous scan keep their
+        hash, so only touched files are read.
+
+        Args:
+            previous: Result of the previous scan (the docs manifest)
+
+        Returns:
+            Dict[str, Dict]: File name mapped to {"sha1", "size", "mtime_ns"}
+        """
+        previous = previous or {}
+        entries = {}
+        for filename in sorted(os.listdir(self.docs_dir)):
+            if not filename.lower().endswith(".pdf"):
+                continue
+            stat = os.stat(os.path.join(self.docs_dir, filename))
+            known = previous.get(filename)
+            if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+                sha1 = known["sha1"]
+            else:
+                sha1 = file_hash(os.path.join(self.docs_dir, filename))
+            entries[filename] = {"sha1": sha1, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        return entries
+
+    def _cached_pages(self, sha1: str) -> Optional[List[str]]:
+        try:
+            with open(os.path.join(self.corpus_dir, PAGES_DIR, sha1 + ".json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _extract(self, entries: Dict[str, Dict]) -> Dict[str, List[str]]:
+        """Extract the pages of PDFs through one process pool and cache them under their hashes."""
+        from utils.pdf_utils import extract_pages_by_document
+
+        paths = {os.path.join(self.docs_dir, filename): filename for filename in entries}
+        extracted = {}
+        for path, pages in extract_pages_by_document(paths).items():
+            filename = paths[path]
+            cache_path = os.path.join(self.corpus_dir, PAGES_DIR, entries[filename]["sha1"] + ".json")
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path + ".tmp", "w") as f:
+                json.dump(pages, f, ensure_ascii=False)
+            os.replace(cache_path + ".tmp", cache_path)
+            extracted[filename] = pages
+        return extracted
+
+    def sync(self, force: bool = False) -> SyncResult:
+        """
+        Re-extract the PDFs that were added or changed and republish the corpus if anything changed.
+
+        Args:
+            force: Publish a new generation even if no PDF changed
+
+        Returns:
+            SyncResult: The files added, changed, removed and extracted, and the generation published
+        """
+        previous = self._load_manifest()
+        current = self.scan(previous)
+        result = SyncResult()
+        for filename, entry in current.items():
+            if filename not in previous:
+                result.added.append(filename)
+            elif previous[filename]["sha1"] != entry["sha1"]:
+                result.changed.append(filename)
+            else:
+                result.unchanged.append(filename)
+        result.removed = sorted(set(previous) - set(current))
+
+        published = current_corpus_dir(self.corpus_dir) is not None and os.path.exists(self.index_path)
+        if published and not result.modified and not force:
+            return result
+
+        pages = {filename: self._cached_pages(entry["sha1"]) for filename, entry in current.items()}
+        # Files that fail are recorded in the manifest all the same, so they are retried only once they change
+        extracted = self._extract({filename: current[filename] for filename, cached in pages.items() if cached is None})
+        result.extracted = sorted(extracted)
+        pages.update(extracted)
+        documents = {os.path.splitext(filename)[0]: file_pages
+                     for filename, file_pages in sorted(pages.items()) if file_pages is not None}
+
+        result.generation = publish_corpus(documents, self.corpus_dir, self.keep_generations)
+        store = CorpusStore(result.generation)
+        try:
+            index_corpus(store, self.index_path)
+        finally:
+            store.close()
+        self._save_manifest(current)
+
+        # Drop the extracted pages of files that are gone
+        hashes = {entry["sha1"] + ".json" for entry in current.values()}
+        pages_dir = os.path.join(self.corpus_dir, PAGES_DIR)
+        for name in os.listdir(pages_dir) if os.path.isdir(pages_dir) else []:
+            if name not in hashes:
+                os.remove(os.path.join(pages_dir, name))
+        return result
+
+    def watch(self, interval: float = 5.0, stop: Optional[threading.Event] = None):
+        """Sync every `interval` seconds until `stop` is set."""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                result = self.sync()
+                if result.modified:
+                    print(f"Published {result.generation}: {len(result.added)} added, "
+                          f"{len(result.changed)} changed, {len(result.removed)} removed")
+            except Exception as e:
+                print(f"Error syncing {self.docs_dir}: {str(e)}")
+            stop.wait(interval)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-index the PDFs in docs/ that were added, changed or removed.")
+    parser.add_argument("docs_dir", nargs="?", default="docs", help="Directory of the PDFs")
+    parser.add_argument("--watch", type=float, metavar="SECONDS", help="Keep syncing at this interval")
+    parser.add_argument("--force", action="store_true", help="Publish a new corpus even if nothing changed")
+    args = parser.parse_args()
+
+    indexer = DocIndexer(args.docs_dir)
+    if args.watch:
+        indexer.watch(args.watch)
+    else:
+        synced = indexer.sync(force=args.force)
+        print(f"{len(synced.added)} added, {len(synced.changed)} changed, {len(synced.removed)} removed, "
+              f"{len(synced.extracted)} extracted; corpus: {synced.generation or current_corpus_dir(CORPUS_DIR)}")
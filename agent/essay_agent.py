@@ -1,19 +1,22 @@
+import hashlib
 import os
-from typing import List, Dict, Generator, Any, TypedDict
-from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_core.tools import Tool, StructuredTool
-from langgraph.checkpoint.memory import MemorySaver
-from langgraph.graph import END, START, StateGraph
-from langgraph.prebuilt import ToolNode
-from langgraph.graph.message import add_messages
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.output_parsers import StrOutputParser
-
-# Load environment variables
-load_dotenv()
+from collections import OrderedDict
+from typing import List, Dict, Generator, Any, Optional, TypedDict
+from agent.budget import BudgetManager, get_budget_manager
+from agent.intent_router import Intent, classify_intent
+from agent.sentence_index import SentenceRecord, extract_quoted_sentence, get_sentence_index, normalize_sentence, sentence_id
+from agent.skill_model import SkillStore, get_skill_store
+from agent.speculation import Speculator
+from agent.step_engine import StepEngine, Transition
+from utils.metrics import record_cache_lookup
+from utils.profiler import phase
+from utils.trajectory_store import check_rules
+
+# langchain, langgraph and langchain_openai take over a second to import, so they
+# are imported on first use; importing this module stays cheap.
+
+# Recent messages sent along when an open question falls through to the LLM
+LLM_FALLBACK_TURNS = 6
 
 class EssayState(TypedDict):
     messages: List[Dict[str, str]]
@@ -21,23 +24,130 @@ class EssayState(TypedDict):
     reconstruction_versions: List[str]
     accuracy_scores: List[float]
     original_text: str
+    sentence_id: str
     current_version: int
     is_new_student: bool
     current_step: str  # 'intro', 'meaning_blocks', 'reconstruction', 'feedback'
     student_meaning_blocks: str
     confirmed_meaning_blocks: str
+    session_id: Optional[str]
+    tenant_id: Optional[str]
+
+def introduced_sentence(message: str) -> str:
+    """Sentence a student message introduces: a quoted sentence, or the message itself when it is one complete sentence that asks nothing of the tutor."""
+    quoted = extract_quoted_sentence(message)
+    if quoted:
+        return quoted
+    intent = classify_intent(message)
+    if intent.name == "new_sentence" and intent.confidence >= 0.6 and not intent.features["request"]:
+        return message.strip()
+    return ""
 
 class EssayAgent:
     """Agent for essay writing assistance."""
     
     def __init__(self):
         """Initialize the essay agent."""
+        from dotenv import load_dotenv
+
+        # Load environment variables
+        load_dotenv()
         self.model = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
-        self.llm = ChatOpenAI(model=self.model, temperature=0.7)
+        # Open questions that fit no step are answered by the LLM; without it they get the hints
+        self.llm_fallback = os.getenv("ESSAY_LLM_FALLBACK", "1") != "0"
         self.system_prompt = self._load_system_prompt()
-        self.tools = self._create_tools()
-        self.graph = self._create_graph()
-        self.memory = MemorySaver()
+        self._llm = None
+        self._small_llm = None
+        self._budget = None
+        self._tools = None
+        self._engine = None
+        self._memory = None
+        self._speculator = None
+        self._skill_store = None
+        # Target sentence of each session, detected once (bounded, least recently used dropped)
+        self._session_sentences: "OrderedDict[str, SentenceRecord]" = OrderedDict()
+        self.max_cached_sessions = 10000
+        # LLM answers to open questions, reused once a session is out of LLM budget
+        self._answers: "OrderedDict[str, str]" = OrderedDict()
+        self.max_cached_answers = 1000
+
+    @property
+    def llm(self):
+        """Chat model, created on first use."""
+        if self._llm is None:
+            from langchain_openai import ChatOpenAI
+
+            self._llm = ChatOpenAI(model=self.model, temperature=0.7)
+        return self._llm
+
+    @llm.setter
+    def llm(self, value):
+        self._llm = value
+
+    @property
+    def small_llm(self):
+        """Smaller chat model used once a session or tenant nears its budget, created on first use."""
+        if self._small_llm is None:
+            from langchain_openai import ChatOpenAI
+
+            self._small_llm = ChatOpenAI(model=self.budget.small_model, temperature=0.7)
+        return self._small_llm
+
+    @small_llm.setter
+    def small_llm(self, value):
+        self._small_llm = value
+
+    @property
+    def budget(self) -> BudgetManager:
+        """LLM budgets of the sessions and tenants, the process-wide manager unless one is set."""
+        if self._budget is None:
+            self._budget = get_budget_manager()
+        return self._budget
+
+    @budget.setter
+    def budget(self, value: BudgetManager):
+        self._budget = value
+
+    @property
+    def tools(self) -> List[Any]:
+        """Agent tools, created on first use."""
+        if self._tools is None:
+            self._tools = self._create_tools()
+        return self._tools
+
+    @property
+    def engine(self) -> StepEngine:
+        """Step engine of a tutoring turn, created on first use."""
+        if self._engine is None:
+            self._engine = self._create_engine()
+        return self._engine
+
+    @property
+    def speculator(self) -> Speculator:
+        """Background preparation of the student's probable next step, created on first use."""
+        if self._speculator is None:
+            self._speculator = Speculator()
+        return self._speculator
+
+    @property
+    def skill_store(self) -> SkillStore:
+        """Skill profiles of the students (session IDs), the process-wide store unless one is set."""
+        if self._skill_store is None:
+            self._skill_store = get_skill_store()
+        return self._skill_store
+
+    @skill_store.setter
+    def skill_store(self, value: SkillStore):
+        self._skill_store = value
+
+    @property
+    def memory(self):
+        """Conversation checkpoint memory, created on first use."""
+        if self._memory is None:
+            from langgraph.checkpoint.memory import MemorySaver
+
+            self._memory = MemorySaver()
+        return self._memory
     
     def _load_system_prompt(self) -> str:
         """Load the system prompt from file."""
@@ -48,13 +158,11 @@ class EssayAgent:
         except FileNotFoundError:
             raise Exception(f"System prompt file not found at {prompt_path}")
     
-    def _create_tools(self) -> List[Any]:
-        """Create tools for the agent."""
-        def evaluate_meaning_blocks(student_blocks: str, original_text: str) -> str:
-            """Evaluate student's identified meaning blocks and provide feedback."""
-            # Check if student is new or unsure
-            if "have you used" in student_blocks.lower() or "i don't know" in student_blocks.lower():
-                return f"""Welcome! Let me explain the Essay Engineering method.
+    def _evaluate_meaning_blocks(self, student_blocks: str, original_text: str) -> str:
+        """Evaluate student's identified meaning blocks and provide feedback."""
+        # Check if student is new or unsure
+        if "have you used" in student_blocks.lower() or "i don't know" in student_blocks.lower():
+            return f"""Welcome! Let me explain the Essay Engineering method.
 
 We'll work with this sentence:
 "{original_text}"
@@ -66,15 +174,43 @@ Can you tell me:
 2. Where would you put the parentheses to separate them?
 
 Just give me your division into meaning blocks first. Once we confirm that, we'll move on to version 1 (v1) of your meaning reconstruction."""
+        
+        # Check if student has provided meaning blocks
+        if "(" in student_blocks and ")" in student_blocks:
+            reference = self.speculator.context(original_text, "meaning_blocks").reference
+            if reference and reference.meaning_blocks:
+                correct_blocks = " ".join(f"({block})" for block in reference.meaning_blocks)
+                if reference.blocks_match(student_blocks):
+                    return f"""Well done — that's exactly right:
+{correct_blocks}
+
+Now that we've locked in the meaning blocks, you're ready to write version 1 (v1) of your meaning reconstruction. Remember: don't repeat any words from the original sentence (except names of people or places). Go ahead and give me your v1!"""
+                mistake = reference.find_mistake("blocks", student_blocks)
+                explanation = mistake["feedback"] if mistake else reference.rationale
+                return f"""Thanks — that's a good start. Let's refine the division based on the core principle of the Essay Engineering method: semantic grouping — what ideas belong together in terms of meaning.
+
+Original Sentence:
+"{original_text}"
+
+{explanation}
+
+Correct Meaning Block{"s" if len(reference.meaning_blocks) > 1 else ""}:
+{correct_blocks}
+
+Now that we've locked in the meaning block{"s" if len(reference.meaning_blocks) > 1 else ""}, you're ready to write version 1 (v1) of your meaning reconstruction — just remember:
+
+Don't repeat any words from the original sentence (except names of people or places).
+
+It's fine if it's not perfect — just aim to capture some part of the meaning in your own words.
+
+Go ahead and give me your v1!"""
+
+            # Analyze the meaning blocks
+            blocks = student_blocks.strip("()").split(")(")
             
-            # Check if student has provided meaning blocks
-            if "(" in student_blocks and ")" in student_blocks:
-                # Analyze the meaning blocks
-                blocks = student_blocks.strip("()").split(")(")
-                
-                # Check if blocks form a complete sentence
-                if len(blocks) > 1:
-                    return f"""Thanks — that's a good start. Let's refine the division based on the core principle of the Essay Engineering method: semantic grouping — what ideas belong together in terms of meaning.
+            # Check if blocks form a complete sentence
+            if len(blocks) > 1:
+                return f"""Thanks — that's a good start. Let's refine the division based on the core principle of the Essay Engineering method: semantic grouping — what ideas belong together in terms of meaning.
 
 Here's how we can analyze it:
 
@@ -95,10 +231,10 @@ Don't repeat any words from the original sentence (except names of people or pla
 It's fine if it's not perfect — just aim to capture some part of the meaning in your own words.
 
 Go ahead and give me your v1!"""
-                else:
-                    return "Good! You've identified a single meaning block. Now, let's move on to reconstructing its meaning. Give me your v1!"
-            
-            return """When looking for meaning blocks, consider:
+            else:
+                return "Good! You've identified a single meaning block. Now, let's move on to reconstructing its meaning. Give me your v1!"
+        
+        return """When looking for meaning blocks, consider:
 1. What is the main action or event?
 2. Who is involved?
 3. When does it happen?
@@ -112,34 +248,46 @@ You might identify blocks like:
 
 Give it a try with the current sentence!"""
 
-        def evaluate_reconstruction(student_reconstruction: str, original_block: str) -> str:
-            """Evaluate student's meaning reconstruction and provide feedback."""
-            # Check for repeated words
-            original_words = set(original_block.lower().split())
-            student_words = set(student_reconstruction.lower().split())
-            repeated_words = original_words.intersection(student_words)
-            
-            if repeated_words:
-                return f"I notice you've used some words from the original text: {', '.join(repeated_words)}. Try to express the meaning without repeating any words from the original."
-            
-            # Calculate accuracy (this would be more sophisticated in practice)
+    def _evaluate_reconstruction(self, student_reconstruction: str, original_block: str) -> str:
+        """Evaluate student's meaning reconstruction and provide feedback."""
+        # Usually prepared while the student was writing this version
+        context = self.speculator.context(original_block, "reconstruction")
+        
+        # Check for repeated words
+        repeated_words = context.repeated_words(student_reconstruction)
+        
+        if repeated_words:
+            return f"I notice you've used some words from the original text: {', '.join(repeated_words)}. Try to express the meaning without repeating any words from the original."
+        
+        # Precomputed reference answers give an accuracy estimate without generation
+        reference = context.reference
+        mistake = None
+        missing_ideas = []
+        if reference and reference.ideas:
+            accuracy, missing_ideas = reference.estimate_accuracy(student_reconstruction)
+            mistake = reference.find_mistake("reconstruction", student_reconstruction)
+        else:
             accuracy = 70  # Placeholder for actual accuracy calculation
-            
-            feedback = f"Your reconstruction is about {accuracy}% accurate. "
-            if accuracy < 30:
-                feedback += "You're on the right track, but try to capture more of the original meaning."
-            elif accuracy < 60:
-                feedback += "Good effort! You're getting closer to the core meaning."
-            elif accuracy < 90:
-                feedback += "Very good! You've captured most of the meaning. Can you refine it further?"
-            else:
-                feedback += "Excellent! You've captured the meaning very well."
-            
-            return feedback
+        
+        feedback = f"Your reconstruction is about {accuracy}% accurate. "
+        if accuracy < 30:
+            feedback += "You're on the right track, but try to capture more of the original meaning."
+        elif accuracy < 60:
+            feedback += "Good effort! You're getting closer to the core meaning."
+        elif accuracy < 90:
+            feedback += "Very good! You've captured most of the meaning. Can you refine it further?"
+        else:
+            feedback += "Excellent! You've captured the meaning very well."
+        
+        if mistake:
+            feedback += f"\n\n{mistake['feedback']}"
+        if missing_ideas and accuracy < 90:
+            feedback += f"\n\nThink about this: {missing_ideas[0]['question']}"
+        return feedback
 
-        def provide_hints(original_text: str) -> str:
-            """Provide hints to help students identify meaning blocks."""
-            return """When looking for meaning blocks, consider:
+    def _provide_hints(self, original_text: str) -> str:
+        """Provide hints to help students identify meaning blocks."""
+        return """When looking for meaning blocks, consider:
 1. What is the main action or event?
 2. Who is involved?
 3. When does it happen?
@@ -153,115 +301,150 @@ You might identify blocks like:
 
 Give it a try with the current sentence!"""
 
+    def _create_tools(self) -> List[Any]:
+        """Wrap the step handlers as tools for LLM agents."""
+        from langchain_core.tools import StructuredTool
+
         return [
             StructuredTool.from_function(
-                evaluate_meaning_blocks,
+                self._evaluate_meaning_blocks,
                 name="evaluate_meaning_blocks",
                 description="Evaluate student's identified meaning blocks and provide feedback."
             ),
             StructuredTool.from_function(
-                evaluate_reconstruction,
+                self._evaluate_reconstruction,
                 name="evaluate_reconstruction",
                 description="Evaluate student's meaning reconstruction and provide feedback."
             ),
             StructuredTool.from_function(
-                provide_hints,
+                self._provide_hints,
                 name="provide_hints",
                 description="Provide hints to help students identify meaning blocks."
             )
         ]
-    
-    def _create_graph(self) -> StateGraph:
-        """Create the LangGraph workflow."""
-        # Define the nodes
-        def process_input(state: EssayState) -> EssayState:
-            """Process student input and provide feedback."""
-            messages = state["messages"]
-            if not messages:
-                return state
-            
-            # Get the latest message
-            latest_message = messages[-1]["content"]
-            
-            # Check if this is a new student or unsure
-            if state["is_new_student"] or "i don't know" in latest_message.lower():
-                state["is_new_student"] = False
-                state["current_step"] = "intro"
-                result = self.tools[0].invoke({
-                    "student_blocks": latest_message,
-                    "original_text": state["original_text"]
-                })
-                state["current_meaning_block"] = result
-                return state
-            
-            # Check if this is a meaning block identification
-            if "(" in latest_message and ")" in latest_message:
-                state["current_step"] = "meaning_blocks"
-                state["student_meaning_blocks"] = latest_message
-                result = self.tools[0].invoke({
-                    "student_blocks": latest_message,
-                    "original_text": state["original_text"]
-                })
-                state["current_meaning_block"] = result
-                return state
-            
-            # Check if this is a reconstruction attempt
-            if "v" in latest_message.lower() or any(str(i) in latest_message for i in range(1, 10)):
-                state["current_step"] = "reconstruction"
-                state["current_version"] += 1
-                result = self.tools[1].invoke({
-                    "student_reconstruction": latest_message,
-                    "original_block": state["original_text"]
-                })
-                state["reconstruction_versions"].append(latest_message)
-                state["current_meaning_block"] = result
-                return state
-            
-            # Default to providing hints
-            result = self.tools[2].invoke({
-                "original_text": state["original_text"]
-            })
-            state["current_meaning_block"] = result
-            return state
-
-        def provide_guidance(state: EssayState) -> EssayState:
-            """Provide additional guidance if needed."""
-            if not state["current_meaning_block"]:
-                return state
-            
-            # Check if student might need hints
-            if "help" in state["current_meaning_block"].lower() or "hint" in state["current_meaning_block"].lower():
-                result = self.tools[2].invoke({
-                    "original_text": state["original_text"]
-                })
-                state["current_meaning_block"] = result
-            
-            return state
 
-        # Create the graph
-        workflow = StateGraph(EssayState)
+    def _create_engine(self) -> StepEngine:
+        """Create the step table of a tutoring turn."""
+        def starts_intro(state: EssayState, intent: Intent, message: str) -> bool:
+            return state["is_new_student"] or intent.name == "unsure"
+
+        def introduce(state: EssayState, intent: Intent, message: str) -> str:
+            state["is_new_student"] = False
+            return self._evaluate_meaning_blocks(message, state["original_text"])
+
+        def gives_blocks(state: EssayState, intent: Intent, message: str) -> bool:
+            # A parenthesized division counts as meaning blocks whatever its score
+            return intent.name == "meaning_blocks" or (intent.name != "version" and "(" in message and ")" in message)
+
+        def check_blocks(state: EssayState, intent: Intent, message: str) -> str:
+            state["student_meaning_blocks"] = message
+            return self._evaluate_meaning_blocks(message, state["original_text"])
+
+        def gives_version(state: EssayState, intent: Intent, message: str) -> bool:
+            return intent.name == "version"
+
+        def check_version(state: EssayState, intent: Intent, message: str) -> str:
+            state["current_version"] += 1
+            state["reconstruction_versions"].append(message)
+            return self._evaluate_reconstruction(message, state["original_text"])
+
+        return StepEngine([
+            Transition("introduce", "intro", starts_intro, introduce),
+            Transition("meaning_blocks", "meaning_blocks", gives_blocks, check_blocks),
+            Transition("version", "reconstruction", gives_version, check_version)
+        ], fallback=self._fallback, after=self._add_guidance)
+
+    def _fallback(self, state: EssayState, intent: Intent, message: str) -> str:
+        """Answer a turn that fits no step: hints, or the LLM for an open question."""
+        # Questions asking for help or about meaning blocks are answered by the hints
+        features = intent.features
+        if not (self.llm_fallback and features.get("question") and not features.get("hint")
+                and not features.get("blocks_phrase")):
+            return self._provide_hints(state["original_text"])
+
+        key = hashlib.sha1(f"{state['sentence_id']}\n{normalize_sentence(message)}".encode("utf-8")).hexdigest()
+        budget = self.budget.session(state["session_id"], state["tenant_id"])
+        plan = budget.plan(self.model)
+        if not plan.allows_llm:
+            # Out of budget: an earlier answer to the same question, else the rule-based hints
+            answer = self._answers.get(key)
+            record_cache_lookup("llm_answer", answer is not None)
+            return answer or self._provide_hints(state["original_text"])
+
+        messages = [("system", self.system_prompt)]
+        if state["original_text"]:
+            messages.append(("system", f"The student is working on this sentence: \"{state['original_text']}\""))
+        messages += [(msg["role"], msg["content"]) for msg in state["messages"][-LLM_FALLBACK_TURNS:]]
+        llm = self.llm if plan.model == self.model else self.small_llm
+        with budget.track(plan.model) as call:
+            reply = llm.invoke(messages)
+            usage = getattr(reply, "usage_metadata", None) or {}
+            call.record_usage(usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+        self._answers[key] = reply.content
+        if len(self._answers) > self.max_cached_answers:
+            self._answers.popitem(last=False)
+        return reply.content
+
+    def _add_guidance(self, state: EssayState, feedback: str) -> str:
+        """Replace feedback that asks for help with the hints."""
+        if "help" in feedback.lower() or "hint" in feedback.lower():
+            return self._provide_hints(state["original_text"])
+        return feedback
+
+    def _resolve_sentence(self, messages: List[Dict[str, str]], session_id: Optional[str] = None) -> Optional[SentenceRecord]:
+        """
+        Find the sentence a session is working on.
         
-        # Add nodes
-        workflow.add_node("process_input", process_input)
-        workflow.add_node("provide_guidance", provide_guidance)
+        The sentence is detected once per session (keyed by session_id, or by the
+        first message when no ID is given) and resolved against the sentence index,
+        so known practice sentences come with their meaning-block data. A latest
+        message that introduces another sentence replaces the session's sentence.
         
-        # Add edges
-        workflow.add_edge(START, "process_input")
-        workflow.add_edge("process_input", "provide_guidance")
-        workflow.add_edge("provide_guidance", END)
+        Args:
+            messages: List of message dictionaries with 'role' and 'content' keys
+            session_id: Optional identifier of the session
+            
+        Returns:
+            The sentence record, or None if no quoted sentence was found yet
+        """
+        key = session_id or hashlib.sha1(messages[0]["content"].encode("utf-8")).hexdigest()
+        latest = next((msg["content"] for msg in reversed(messages) if msg["role"] == "user"), "")
+        text = introduced_sentence(latest)
+        record = self._session_sentences.get(key)
+        if record is not None and text and normalize_sentence(text) != normalize_sentence(record.text):
+            record = None
+        record_cache_lookup("session_sentence", record is not None)
+        if record is not None:
+            self._session_sentences.move_to_end(key)
+            return record
         
-        # Set entry point
-        workflow.set_entry_point("process_input")
+        if not text:
+            for msg in messages:
+                text = extract_quoted_sentence(msg["content"])
+                if text:
+                    break
+            else:
+                return None
         
-        return workflow.compile()
-    
-    def get_response(self, messages: List[Dict[str, str]], system_prompt: str = None) -> Generator[str, None, None]:
+        record = get_sentence_index().lookup(text)
+        record_cache_lookup("sentence_index", record is not None)
+        if record is None:
+            record = SentenceRecord(id=sentence_id(text), text=text)
+        self._session_sentences[key] = record
+        if len(self._session_sentences) > self.max_cached_sessions:
+            self._session_sentences.popitem(last=False)
+        return record
+
+    def get_response(self, messages: List[Dict[str, str]], system_prompt: str = None,
+                     session_id: Optional[str] = None, tenant_id: Optional[str] = None) -> Generator[str, None, None]:
         """
         Get a streaming response from the agent.
         
         Args:
             messages: List of message dictionaries with 'role' and 'content' keys
             system_prompt: Optional system prompt to override the default one
+            session_id: Optional identifier of the session, used to remember its sentence
+            tenant_id: Optional tenant (e.g. school) of the session, whose LLM budget it shares
             
         Yields:
             Chunks of the response as they arrive
@@ -270,16 +453,13 @@ Give it a try with the current sentence!"""
             raise Exception("Messages list cannot be empty")
         print(f"[DEBUG] get_response called with messages: {messages}")
         try:
-            # Extract original text from first message if it contains a quote
-            original_text = ""
-            for msg in messages:
-                if '"' in msg["content"]:
-                    # Extract text between quotes
-                    start = msg["content"].find('"') + 1
-                    end = msg["content"].rfind('"')
-                    if start > 0 and end > start:
-                        original_text = msg["content"][start:end]
-                        break
+            # Find the sentence the student is working on
+            with phase("parsing"):
+                record = self._resolve_sentence(messages, session_id)
+                # Only a student's first turn, with no versions written in earlier sessions, gets the introduction
+                first_turn = sum(1 for msg in messages if msg["role"] == "user") == 1 and \
+                    not any(msg["role"] == "assistant" for msg in messages)
+                is_new_student = first_turn and (session_id is None or self.skill_store.get(session_id).is_new)
             
             # Initialize state
             initial_state = EssayState(
@@ -287,35 +467,44 @@ Give it a try with the current sentence!"""
                 current_meaning_block="",
                 reconstruction_versions=[],
                 accuracy_scores=[],
-                original_text=original_text,
+                original_text=record.text if record else "",
+                sentence_id=record.id if record else "",
                 current_version=0,
-                is_new_student=True,
+                is_new_student=is_new_student,
                 current_step="intro",
                 student_meaning_blocks="",
-                confirmed_meaning_blocks=""
+                confirmed_meaning_blocks=" ".join(f"({block})" for block in record.meaning_blocks) if record else "",
+                session_id=session_id,
+                tenant_id=tenant_id
             )
             print(f"[DEBUG] Initial state: {initial_state}")
             
-            # Run the graph
-            for state in self.graph.stream(initial_state):
-                print(f"[DEBUG] State from graph: {state}")
-                node_state = list(state.values())[0] if state else {}
-                
-                # Yield reconstruction versions if available
-                if "reconstruction_versions" in node_state and node_state["reconstruction_versions"]:
-                    latest_reconstruction = node_state["reconstruction_versions"][-1]
-                    print(f"[DEBUG] Yielding: {latest_reconstruction}")
-                    yield latest_reconstruction + " "
-                
-                # Yield current meaning block if available
-                elif "current_meaning_block" in node_state and node_state["current_meaning_block"]:
-                    print(f"[DEBUG] Yielding current_meaning_block: {node_state['current_meaning_block']}")
-                    yield node_state["current_meaning_block"] + " "
+            # Apply the turn to the step table
+            with phase("steps"):
+                feedback = self.engine.run(initial_state)
+            step = initial_state["current_step"]
+            print(f"[DEBUG] Step {step}: {feedback}")
+            if feedback:
+                yield feedback + " "
+            
+            if step == "reconstruction" and session_id and initial_state["original_text"]:
+                self._record_version(session_id, initial_state["original_text"], messages[-1]["content"])
             
+            # Prepare the step the student will most likely take next while they write it
+            self.speculator.speculate(initial_state["original_text"], step)
             print("[DEBUG] get_response finished streaming.")
         except Exception as e:
             print(f"[DEBUG] Exception in get_response: {e}")
-            raise Exception(f"Graph execution error: {str(e)}")
+            raise Exception(f"Step execution error: {str(e)}")
+
+    def _record_version(self, session_id: str, original_text: str, reconstruction: str):
+        """Update the student's skill profile with a version attempt."""
+        try:
+            reference = self.speculator.context(original_text, "reconstruction").reference
+            accuracy = reference.estimate_accuracy(reconstruction)[0] if reference and reference.ideas else float("nan")
+            self.skill_store.record_version(session_id, original_text, accuracy, check_rules(reconstruction, original_text))
+        except Exception as e:
+            print(f"Error updating skill profile: {str(e)}")
 
     def reset_memory(self):
         """Reset the conversation memory."""
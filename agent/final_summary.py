@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+from agent.budget import SessionBudget
+from agent.reference_bank import get_reference_bank
+from agent.sentence_index import strip_meaning_blocks
+from utils.jobs import JobContext
+from utils.metrics import track_llm_call
+
+PROGRESS_PROMPT = """You are the Essay Engineering tutor. A student reconstructed the meaning of this sentence in successive versions.
+
+Original sentence: "{sentence}"
+
+Versions:
+{versions}
+
+In two or three sentences addressed to the student, explain how much progress they made from the first version to the last:
+which ideas of the original they captured along the way and what the last version still misses. Do not rewrite the sentence for them."""
+
+# SimpleEssayAgent numbers versions itself, so a student's own label ends up doubled ("v1. v1. ...")
+_DOUBLED_LABEL = re.compile(r"^(v\d+\.\s*)[\"'“]?\s*v(?:ersion)?\s*\d+\s*[.:)-]?\s*", re.IGNORECASE)
+
+# Closing questions of the final summary, from the rules for the final summary of all versions
+FINAL_QUESTIONS = """How does the EE Method feel to you for reading comprehension?
+Do you feel that you understand more of what you read?
+What do you think your comprehension level of sentences was before you started this method?
+
+After several weeks of this, you'll be able to do this faster."""
+
+def summary_inputs(state: Dict) -> List[Dict]:
+    """
+    Collect what the final summary is written from: each sentence with its meaning blocks and versions.
+
+    Args:
+        state: Session state of a SimpleEssayAgent (see SimpleEssayAgent.to_dict)
+
+    Returns:
+        List[Dict]: One {"text", "meaning_blocks", "versions"} entry per sentence that has versions
+    """
+    paragraph = state.get("paragraph")
+    if paragraph:
+        sentences = [{"text": s["text"], "meaning_blocks": s["meaning_blocks"],
+                      "versions": [_DOUBLED_LABEL.sub(r"\1", v) for v in s["versions"]]}
+                     for s in paragraph["sentences"]]
+    else:
+        sentences = [{
+            "text": strip_meaning_blocks(state.get("current_sentence") or ""),
+            "meaning_blocks": [block["text"] for block in state.get("meaning_blocks", [])],
+            "versions": [_DOUBLED_LABEL.sub(r"\1", v) for v in state.get("versions", [])]
+        }]
+    return [s for s in sentences if s["versions"]]
+
+def summary_key(sentences: List[Dict], model: str = "") -> str:
+    """Content hash of a summary's inputs, so identical requests share one job and its result."""
+    payload = json.dumps([model, sentences], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def describe_progress(sentence: str, versions: List[str]) -> str:
+    """Describe a student's progress on a sentence from the reference accuracy estimates, without the LLM."""
+    bank = get_reference_bank()
+    reference = bank.lookup(sentence) if bank else None
+    if reference is None or not reference.ideas:
+        return f"You wrote {len(versions)} version{'s' if len(versions) != 1 else ''}, each one a step closer to the full meaning."
+    first, _ = reference.estimate_accuracy(versions[0])
+    last, missing = reference.estimate_accuracy(versions[-1])
+    text = f"Your first version was about {first}% accurate and your last one about {last}%."
+    if missing:
+        text += f" To go further, think about this: {missing[0]['question']}"
+    return text
+
+def write_final_summary(job: JobContext, sentences: List[Dict], llm: Optional[Any] = None,
+                        model: Optional[str] = None, budget: Optional[SessionBudget] = None) -> Dict:
+    """
+    Write the final summary of a session: all versions of each sentence, the progress made, and the closing questions.
+
+    Runs as a background job; progress is reported once per sentence, which is also
+    where a cancelled job stops.
+
+    Args:
+        job: Context of the running job
+        sentences: Inputs from summary_inputs
+        llm: Chat model that explains the progress made; without one the reference estimates are used
+        model: Model name for the LLM metrics
+        budget: Budget of the session; once it is used up, the remaining sentences use the reference estimates
+
+    Returns:
+        Dict: {"summary": text, "sentences": number of sentences summarized}
+    """
+    model = model or os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
+    sections = []
+    for i, sentence in enumerate(sentences):
+        job.report(i / (len(sentences) + 1), f"Summarizing sentence {i + 1} of {len(sentences)}")
+        versions = "\n".join(sentence["versions"])
+        if llm is not None and (budget is None or budget.plan(model).allows_llm):
+            with (budget.track(model) if budget else track_llm_call(model)) as call:
+                reply = llm.invoke(PROGRESS_PROMPT.format(sentence=sentence["text"], versions=versions))
+                usage = getattr(reply, "usage_metadata", None) or {}
+                call.record_usage(usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+            progress = reply.content.strip()
+        else:
+            progress = describe_progress(sentence["text"], sentence["versions"])
+        heading = f"Sentence {i + 1}: " if len(sentences) > 1 else ""
+        sections.append(f"{heading}\"{sentence['text']}\"\n\nYour versions:\n{versions}\n\n{progress}")
+
+    job.report(len(sentences) / (len(sentences) + 1), "Writing the closing questions")
+    return {"summary": "\n\n".join(sections + [FINAL_QUESTIONS]), "sentences": len(sentences)}
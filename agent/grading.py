@@ -0,0 +1,273 @@
+import json
+import math
+import os
+import re
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from agent.budget import llm_cost
+from agent.reference_bank import ReferenceEntry, load_reference_entries
+from agent.sentence_index import normalize_sentence, sentence_id
+from utils.metrics import track_llm_call
+from utils.word_rules import strip_version_label
+
+GOLDEN_SET_PATH = os.path.join("data", "golden_grading.jsonl")
+
+LABELS = ("correct", "partially_correct", "wrong")
+
+_BLOCK = re.compile(r"\(([^()]*)\)")
+
+GRADING_PROMPT = """You grade students practising the Essay Engineering method of sentence-level meaning reconstruction.
+
+Original sentence: "{sentence}"
+
+{task_description}
+
+Student input: "{input}"
+
+Label the input "correct", "partially_correct" or "wrong". Reply with JSON only:
+{{"label": "...", "accuracy": <0-100>}}"""
+
+TASK_DESCRIPTIONS = {
+    "blocks": "The student divided the sentence into meaning blocks, each in parentheses. "
+              "A meaning block is a part of the sentence that expresses one complete idea.",
+    "reconstruction": "The student reconstructed the sentence's meaning in their own words. "
+                      "A reconstruction must not repeat any word of the original except names, "
+                      "and is graded on how many of the sentence's ideas it conveys."
+}
+
+@dataclass
+class Grade:
+    """A grading backend's verdict on one student input."""
+    label: str
+    accuracy: Optional[float] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+
+def label_for_accuracy(accuracy: float) -> str:
+    """Map an accuracy in percent to a grading label."""
+    if accuracy >= 90:
+        return "correct"
+    if accuracy >= 50:
+        return "partially_correct"
+    return "wrong"
+
+def load_golden_set(path: str = GOLDEN_SET_PATH) -> List[Dict]:
+    """Load labelled grading items (id, sentence, task, input, label) from a JSON-lines file."""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def independent_items(items: List[Dict], entries: List[ReferenceEntry]) -> List[Dict]:
+    """
+    Hold out labelled items that copy a reference reconstruction.
+
+    The rules and vector backends score against those reconstructions, so such
+    items would measure recall of the reference data rather than grading.
+    """
+    copied = {(entry.sentence_id, normalize_sentence(strip_version_label(version["text"])))
+              for entry in entries for version in entry.reconstructions}
+    return [item for item in items
+            if (sentence_id(item["sentence"]), normalize_sentence(strip_version_label(item["input"]))) not in copied]
+
+class RuleGrader:
+    """Grades from the reference answers alone: block comparison, repeated words and idea coverage."""
+
+    name = "rules"
+
+    def __init__(self, entries: Optional[List[ReferenceEntry]] = None):
+        self.entries = {entry.sentence_id: entry for entry in (entries or load_reference_entries())}
+
+    def _entry(self, sentence: str) -> ReferenceEntry:
+        entry = self.entries.get(sentence_id(sentence))
+        if entry is None:
+            raise Exception(f"No reference answers for: {sentence}")
+        return entry
+
+    def grade_blocks(self, entry: ReferenceEntry, student_input: str) -> Grade:
+        if entry.blocks_match(student_input):
+            return Grade("correct", 100.0)
+        blocks = [block for block in _BLOCK.findall(student_input) if block.strip()]
+        if normalize_sentence(" ".join(blocks)) != normalize_sentence(entry.text):
+            return Grade("wrong", 0.0)
+        # Each block more or fewer than the reference division costs half the credit
+        accuracy = max(0.0, 100.0 - 50.0 * abs(len(blocks) - len(entry.meaning_blocks)))
+        return Grade(label_for_accuracy(accuracy), accuracy)
+
+    def grade_reconstruction(self, entry: ReferenceEntry, student_input: str) -> Grade:
+        accuracy, _ = entry.estimate_accuracy(student_input)
+        if entry.repeated_words(student_input):
+            return Grade("wrong", float(accuracy))
+        return Grade(label_for_accuracy(accuracy), float(accuracy))
+
+    def grade(self, item: Dict) -> Grade:
+        entry = self._entry(item["sentence"])
+        if item["task"] == "blocks":
+            return self.grade_blocks(entry, item["input"])
+        return self.grade_reconstruction(entry, item["input"])
+
+class VectorGrader(RuleGrader):
+    """
+    Grades reconstructions by their similarity to the reference versions.
+
+    Inputs and reference versions are embedded locally as hashed character-trigram
+    vectors; the accuracy is the similarity-weighted mean accuracy of the reference
+    versions. Meaning blocks are graded by the rules.
+    """
+
+    name = "vector"
+
+    def __init__(self, entries: Optional[List[ReferenceEntry]] = None, dimensions: int = 2048, sharpness: float = 4.0):
+        """
+        Initialize the grader.
+
+        Args:
+            entries: Reference entries, defaults to the curated reference answers
+            dimensions: Size of the hashed trigram vectors
+            sharpness: Exponent applied to the similarities, so the closest versions dominate
+        """
+        import numpy as np
+
+        super().__init__(entries)
+        self.dimensions = dimensions
+        self.sharpness = sharpness
+        self._exemplars = {}
+        for sid, entry in self.entries.items():
+            if entry.reconstructions:
+                vectors = np.stack([self.embed(version["text"]) for version in entry.reconstructions])
+                accuracies = np.array([version["accuracy"] for version in entry.reconstructions], dtype=float)
+                self._exemplars[sid] = (vectors, accuracies)
+
+    def embed(self, text: str):
+        """Unit-length hashed character-trigram vector of a text."""
+        import numpy as np
+
+        padded = f"  {normalize_sentence(text)} "
+        vector = np.zeros(self.dimensions)
+        for i in range(len(padded) - 2):
+            vector[zlib.crc32(padded[i:i + 3].encode("utf-8")) % self.dimensions] += 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def grade_reconstruction(self, entry: ReferenceEntry, student_input: str) -> Grade:
+        import numpy as np
+
+        if entry.sentence_id not in self._exemplars:
+            return super().grade_reconstruction(entry, student_input)
+        vectors, accuracies = self._exemplars[entry.sentence_id]
+        weights = np.clip(vectors @ self.embed(student_input), 0.0, 1.0) ** self.sharpness
+        # An input unlike every reference version conveys none of their ideas
+        accuracy = float(weights @ accuracies / weights.sum() * weights.max() ** (1 / self.sharpness)) \
+            if weights.sum() else 0.0
+        if entry.repeated_words(student_input):
+            return Grade("wrong", accuracy)
+        return Grade(label_for_accuracy(accuracy), accuracy)
+
+class LLMGrader:
+    """Grades by asking a chat model for a label, reporting the tokens and cost of each call."""
+
+    name = "llm"
+
+    def __init__(self, model: Optional[str] = None, llm: Any = None):
+        """
+        Initialize the grader.
+
+        Args:
+            model: Model name, also used to price the calls (see agent.budget.MODEL_PRICES)
+            llm: Chat model to call (e.g. a CassetteLLM), defaults to ChatOpenAI with the model
+        """
+        self.model = model or os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
+        if llm is None:
+            from langchain_openai import ChatOpenAI
+            llm = ChatOpenAI(model=self.model, temperature=0)
+        self.llm = llm
+
+    def cost(self, prompt_tokens: int, completion_tokens: int) -> float:
+        """Price of a call in USD, 0 for models without a known price."""
+        return llm_cost(self.model, prompt_tokens, completion_tokens)
+
+    def grade(self, item: Dict) -> Grade:
+        prompt = GRADING_PROMPT.format(
+            sentence=item["sentence"], task_description=TASK_DESCRIPTIONS[item["task"]], input=item["input"])
+        with track_llm_call(self.model) as call:
+            reply = self.llm.invoke(prompt)
+            usage = getattr(reply, "usage_metadata", None) or {}
+            prompt_tokens, completion_tokens = usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+            call.record_usage(prompt_tokens, completion_tokens)
+
+        content = reply.content
+        start, end = content.find("{"), content.rfind("}")
+        if start < 0 or end < start:
+            raise Exception(f"No JSON in the grading reply: {content}")
+        verdict = json.loads(content[start:end + 1])
+        if verdict.get("label") not in LABELS:
+            raise Exception(f"Unknown label in the grading reply: {content}")
+        accuracy = verdict.get("accuracy")
+        return Grade(verdict["label"], float(accuracy) if accuracy is not None else None,
+                     prompt_tokens, completion_tokens, self.cost(prompt_tokens, completion_tokens))
+
+GRADERS = {
+    "rules": RuleGrader,
+    "vector": VectorGrader,
+    "llm": LLMGrader
+}
+
+def _percentile(values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(len(ordered) * percent / 100) - 1))]
+
+def evaluate_grader(grader: Any, items: List[Dict], concurrency: int = 8, repeat: int = 1) -> Dict:
+    """
+    Run a grading backend over labelled items and measure it.
+
+    Args:
+        grader: Object with a name and a grade(item) -> Grade method
+        items: Labelled items, see load_golden_set
+        concurrency: Items graded at the same time
+        repeat: Passes over the items, to get steadier latency figures
+
+    Returns:
+        Dict: Agreement with the labels (overall and per label), p50/p95 latency in ms,
+        cost and tokens per item, throughput, errors and the disagreeing item IDs
+    """
+    def run(item: Dict) -> Dict:
+        start = time.perf_counter()
+        try:
+            grade = grader.grade(item)
+        except Exception as e:
+            print(f"Error grading {item['id']} with {grader.name}: {str(e)}")
+            grade = None
+        return {"item": item, "grade": grade, "latency": time.perf_counter() - start}
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        results = list(pool.map(run, items * repeat))
+    elapsed = time.perf_counter() - started
+
+    # Agreement is judged on the first pass; later passes only add latency samples
+    first_pass = results[:len(items)]
+    agree = [r["grade"] is not None and r["grade"].label == r["item"]["label"] for r in first_pass]
+    per_label = {}
+    for label in LABELS:
+        matches = [ok for ok, r in zip(agree, first_pass) if r["item"]["label"] == label]
+        if matches:
+            per_label[label] = sum(matches) / len(matches)
+    latencies = [r["latency"] * 1000 for r in results]
+    grades = [r["grade"] for r in results if r["grade"] is not None]
+    return {
+        "backend": grader.name,
+        "items": len(items),
+        "agreement": sum(agree) / len(items) if items else 0.0,
+        "agreement_by_label": per_label,
+        "p50_ms": _percentile(latencies, 50) if latencies else 0.0,
+        "p95_ms": _percentile(latencies, 95) if latencies else 0.0,
+        "cost_per_item": sum(g.cost for g in grades) / len(results) if results else 0.0,
+        "tokens_per_item": sum(g.prompt_tokens + g.completion_tokens for g in grades) / len(results) if results else 0.0,
+        "items_per_second": len(results) / elapsed if elapsed else 0.0,
+        "errors": len(results) - len(grades),
+        "disagreements": [r["item"]["id"] for ok, r in zip(agree, first_pass) if not ok]
+    }
@@ -0,0 +1,117 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict
+
+# Intents a student turn can express, in tie-breaking order
+INTENTS = ("version", "meaning_blocks", "unsure", "evaluate", "hint", "next_sentence", "new_sentence")
+
+# One alternation of named feature patterns, scanned in a single pass over the
+# lowercased message. The lookahead on the first letters of the keywords lets the
+# scanner skip most positions without trying every alternative.
+_FEATURES = re.compile(
+    r"""
+    (?P<paren_group>\([^()]{2,}\))
+    | (?P<question>\?)
+    | (?<![a-z])(?=[vmihnfaesg])(?:
+        (?P<version_ref>v\d+|version\s*\d+)
+        | (?P<blocks_phrase>meaning\s+blocks?)
+        | (?P<unsure>i\s+don['’]?t\s+know|not\s+sure|no\s+idea|have\s+you\s+used|never\s+used
+            |first\s+time|new\s+to\s+this)
+        | (?P<evaluate>evaluate|evaluation|accuracy|accurate|score|grade)
+        | (?P<hint>hints?|help|stuck|example|explain)
+        | (?P<next>next\s+(?:sentence|one)|move\s+on)
+    )\b
+    """,
+    re.VERBOSE
+)
+
+_VERSION_PREFIX = re.compile(r"""\s*["'“]?\s*v(?:ersion)?\s*\d+\b""")
+
+_SENTENCE_END = re.compile(r"""[.!?]["'”’)]*\s*$""")
+
+# A message addressed to the tutor: it opens in the first person or as a plea or
+# question, says "please", or points at the student's own work ("my last version",
+# "this sentence")
+_REQUEST = re.compile(
+    r"""^\W*(?:i|i['’]?m|i['’]?d|i['’]?ll|please|can|could|would|will|let['’]?s|let\s+me|give|show|tell)\b
+    | \bplease\b
+    | \b(?:my|this|that)\s+(?:\w+\s+)?(?:sentence|version|reconstruction|blocks?|answer|attempt)\b
+    """,
+    re.VERBOSE
+)
+
+@dataclass
+class Intent:
+    """Classified intent of a student turn."""
+    name: str
+    confidence: float
+    scores: Dict[str, float] = field(default_factory=dict)
+    features: Dict[str, int] = field(default_factory=dict)
+
+def extract_features(text: str) -> Dict[str, int]:
+    """Count the routing features of a message in one regex pass."""
+    features = {
+        "version_prefix": 0, "version_ref": 0, "paren_group": 0, "blocks_phrase": 0,
+        "unsure": 0, "evaluate": 0, "hint": 0, "next": 0, "question": 0
+    }
+    lowered = text.lower()
+    for match in _FEATURES.finditer(lowered):
+        features[match.lastgroup] += 1
+    features["version_prefix"] = 1 if _VERSION_PREFIX.match(lowered) else 0
+    features["word"] = len(text.split())
+    features["sentence_end"] = 1 if _SENTENCE_END.search(text) else 0
+    features["request"] = 1 if _REQUEST.search(lowered) else 0
+    return features
+
+def score_features(features: Dict[str, int]) -> Dict[str, float]:
+    """Turn feature counts into a score between 0 and 1 per intent."""
+    paren_groups = features["paren_group"]
+    # Any bracketed group is an attempt at meaning blocks, even a single block
+    # holding the whole sentence ("(The Mole had been working ... home.)")
+    blocks = 0.0
+    if paren_groups >= 2:
+        blocks = 0.9
+    elif paren_groups == 1:
+        blocks = 0.7 + (0.1 if features["blocks_phrase"] else 0.0)
+    elif features["blocks_phrase"] and not features["question"]:
+        blocks = 0.4
+
+    # A complete sentence that happens to contain a keyword ("He could not help but
+    # smile.") is literary text, not a request: keywords only count in questions,
+    # short or unfinished messages and messages addressed to the tutor
+    # ("I need some help with this sentence.")
+    complete_sentence = features["word"] >= 6 and features["sentence_end"] and not features["question"]
+    request = features["request"] or not complete_sentence
+    sentence = 0.6 if complete_sentence and not paren_groups else 0.3
+
+    hint = 0.0
+    if features["hint"] and request:
+        hint = 0.7 + (0.1 if features["question"] else 0.0)
+    elif features["question"]:
+        # Questions about the method ("what are meaning blocks?") ask for guidance
+        hint = 0.65 if features["blocks_phrase"] else 0.4
+
+    return {
+        "version": 0.95 if features["version_prefix"] else (0.5 if features["version_ref"] and not features["question"] else 0.0),
+        "meaning_blocks": blocks,
+        "unsure": 0.9 if features["unsure"] and request else 0.0,
+        "evaluate": 0.8 if features["evaluate"] and request else 0.0,
+        "hint": hint,
+        "next_sentence": 0.85 if features["next"] and request else 0.0,
+        "new_sentence": sentence
+    }
+
+def classify_intent(text: str) -> Intent:
+    """
+    Classify a student turn.
+
+    Args:
+        text: The student's message
+
+    Returns:
+        Intent: The most likely intent with its confidence, the per-intent scores and the raw features
+    """
+    features = extract_features(text)
+    scores = score_features(features)
+    name = max(INTENTS, key=lambda intent: (scores[intent], -INTENTS.index(intent)))
+    return Intent(name=name, confidence=scores[name], scores=scores, features=features)
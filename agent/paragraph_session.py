@@ -0,0 +1,193 @@
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+from agent.reference_bank import ReferenceBank, generate_reference, get_reference_bank
+from agent.sentence_index import get_sentence_index, sentence_id, split_sentences
+from utils.prefetch import PrefetchCache
+
+# Guiding questions for sentences without reference answers
+GENERIC_HINTS = [
+    "What is the main action or event?",
+    "Who is involved?",
+    "When does it happen?",
+    "Why or how is it happening?"
+]
+
+@dataclass
+class SentencePreparation:
+    """Meaning-block analysis and hints for one sentence, ready before the student reaches it."""
+    sentence_id: str
+    text: str
+    meaning_blocks: List[str] = field(default_factory=list)
+    rationale: str = ""
+    hints: List[str] = field(default_factory=list)
+    source: str = "generic"  # 'reference', 'index', 'generated' or 'generic'
+
+def prepare_sentence(text: str, bank: Optional[ReferenceBank] = None, generate: bool = False) -> SentencePreparation:
+    """
+    Prepare a sentence for practice.
+
+    Known practice sentences take their meaning blocks and guiding questions from
+    the reference bank and the sentence index; other sentences get generic hints,
+    or LLM-generated guiding questions when `generate` is set.
+
+    Args:
+        text: The sentence
+        bank: Reference bank to look the sentence up in, defaults to the process-wide bank
+        generate: Ask the LLM for guiding questions when the sentence has no reference answers
+
+    Returns:
+        SentencePreparation: The analysis and hints of the sentence
+    """
+    sid = sentence_id(text)
+    bank = bank or get_reference_bank()
+    reference = bank.get(sid) if bank else None
+    if reference is not None and reference.meaning_blocks:
+        hints = [idea["question"] for idea in reference.ideas] or list(GENERIC_HINTS)
+        return SentencePreparation(sid, text, list(reference.meaning_blocks), reference.rationale, hints, "reference")
+
+    record = get_sentence_index().get(sid)
+    if record is not None and record.meaning_blocks:
+        return SentencePreparation(sid, text, list(record.meaning_blocks), record.rationale, list(GENERIC_HINTS), "index")
+
+    if generate:
+        try:
+            ideas = generate_reference(text).get("ideas", [])
+            hints = [idea["question"] for idea in ideas if idea.get("question")]
+            if hints:
+                return SentencePreparation(sid, text, hints=hints, source="generated")
+        except Exception as e:
+            print(f"Error generating hints for {text!r}: {str(e)}")
+    return SentencePreparation(sid, text, hints=list(GENERIC_HINTS))
+
+class SentencePreparer:
+    """
+    Prepares upcoming sentences in background threads.
+
+    While a student works on one sentence of a paragraph, the next ones are
+    prepared ahead of time, so moving on is a cache hit instead of a round-trip.
+    """
+
+    def __init__(self, max_workers: int = 2, max_cached: int = 1000, bank: Optional[ReferenceBank] = None,
+                 generate: bool = False):
+        """
+        Initialize the preparer.
+
+        Args:
+            max_workers: Threads preparing sentences in the background
+            max_cached: Preparations kept in memory
+            bank: Reference bank to prepare from, defaults to the process-wide bank
+            generate: Ask the LLM for guiding questions for sentences without reference answers
+        """
+        self.bank = bank
+        self.generate = generate
+        self._cache = PrefetchCache("sentence_preparation", max_workers, max_cached)
+
+    def prefetch(self, texts: List[str]):
+        """Start preparing sentences in the background."""
+        for text in texts:
+            self._cache.prefetch(sentence_id(text), prepare_sentence, text, self.bank, self.generate)
+
+    def get(self, text: str, timeout: Optional[float] = None) -> SentencePreparation:
+        """Return the preparation of a sentence, waiting for it if it is still in flight."""
+        try:
+            return self._cache.get(sentence_id(text), prepare_sentence, text, self.bank, self.generate, timeout=timeout)
+        except Exception as e:
+            print(f"Error preparing sentence {text!r}: {str(e)}")
+            return SentencePreparation(sentence_id(text), text, hints=list(GENERIC_HINTS))
+
+    def shutdown(self):
+        self._cache.shutdown()
+
+_preparer: Optional[SentencePreparer] = None
+_preparer_lock = threading.Lock()
+
+def get_sentence_preparer() -> SentencePreparer:
+    """Return the process-wide sentence preparer, creating it on first use."""
+    global _preparer
+    if _preparer is None:
+        with _preparer_lock:
+            if _preparer is None:
+                _preparer = SentencePreparer(
+                    max_workers=int(os.getenv("ESSAY_PREFETCH_WORKERS", "2")),
+                    generate=os.getenv("ESSAY_PREFETCH_GENERATE", "0") == "1"
+                )
+    return _preparer
+
+@dataclass
+class SentenceProgress:
+    """A student's progress on one sentence of a paragraph."""
+    text: str
+    sentence_id: str
+    status: str = "pending"  # 'pending', 'meaning_blocks', 'reconstruction' or 'done'
+    meaning_blocks: List[str] = field(default_factory=list)
+    versions: List[str] = field(default_factory=list)
+
+class ParagraphSession:
+    """A paragraph exercise: the paragraph segmented into sentences, worked through one at a time."""
+
+    def __init__(self, sentences: List[SentenceProgress], current: int = 0):
+        self.sentences = sentences
+        self.current = current
+
+    @classmethod
+    def from_text(cls, text: str) -> "ParagraphSession":
+        """Segment a paragraph into sentences."""
+        return cls([SentenceProgress(sentence, sentence_id(sentence)) for sentence in split_sentences(text)])
+
+    def to_dict(self) -> Dict:
+        """Serialize the session to a JSON-compatible dictionary."""
+        return {"sentences": [asdict(s) for s in self.sentences], "current": self.current}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ParagraphSession":
+        """Rebuild a session from a dictionary produced by to_dict."""
+        return cls([SentenceProgress(**s) for s in data.get("sentences", [])], data.get("current", 0))
+
+    @property
+    def current_sentence(self) -> Optional[SentenceProgress]:
+        return self.sentences[self.current] if self.current < len(self.sentences) else None
+
+    @property
+    def finished(self) -> bool:
+        return self.current >= len(self.sentences)
+
+    def upcoming(self, count: int) -> List[str]:
+        """Texts of the next `count` sentences after the current one."""
+        return [s.text for s in self.sentences[self.current + 1:self.current + 1 + count]]
+
+    def record_blocks(self, blocks: List[str]):
+        """Record the student's meaning blocks for the current sentence."""
+        sentence = self.current_sentence
+        if sentence is not None:
+            sentence.meaning_blocks = list(blocks)
+            sentence.status = "meaning_blocks"
+
+    def record_version(self, version: str):
+        """Record a reconstruction version for the current sentence."""
+        sentence = self.current_sentence
+        if sentence is not None:
+            sentence.versions.append(version)
+            sentence.status = "reconstruction"
+
+    def advance(self) -> Optional[SentenceProgress]:
+        """Mark the current sentence done and move to the next one, returning it (None at the end)."""
+        sentence = self.current_sentence
+        if sentence is not None:
+            sentence.status = "done"
+            self.current += 1
+        return self.current_sentence
+
+    def progress(self) -> Dict:
+        """Per-sentence progress: status and number of versions of each sentence."""
+        return {
+            "current": self.current,
+            "total": len(self.sentences),
+            "completed": sum(1 for s in self.sentences if s.status == "done"),
+            "sentences": [
+                {"index": i, "text": s.text, "status": s.status, "versions": len(s.versions)}
+                for i, s in enumerate(self.sentences)
+            ]
+        }
@@ -0,0 +1,275 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Tuple
+
+from agent.sentence_index import (
+    PRACTICE_SENTENCES_PATH, RELOAD_CHECK_SECONDS, SentenceIndex, normalize_sentence, sentence_id
+)
+from utils.word_rules import STOPWORDS, repeated_words, strip_version_label, words
+
+REFERENCE_ANSWERS_PATH = os.path.join("data", "reference_answers.json")
+REFERENCE_BANK_PATH = os.path.join("data", "reference_bank.sqlite3")
+
+_BLOCK = re.compile(r"\(([^()]*)\)")
+
+# Reconstructions at least this similar to a reference version get its accuracy
+EXEMPLAR_SIMILARITY = 0.6
+
+GENERATION_PROMPT = """You prepare reference answers for the Essay Engineering method of sentence-level meaning reconstruction.
+
+Sentence: "{text}"
+
+Reply with JSON only, in this shape:
+{{"reconstructions": [{{"text": "...", "accuracy": 30}}, ...],
+  "ideas": [{{"name": "...", "cues": ["..."], "question": "..."}}, ...],
+  "mistakes": [{{"kind": "blocks" or "reconstruction", "pattern": "<Python regex on lowercased input>", "feedback": "..."}}, ...]}}
+
+Give four reconstructions at about 30, 50, 70 and 100 percent accuracy that never repeat a word from the sentence.
+List each idea of the sentence with cue words a good reconstruction would use, and a guiding question that
+does not give the answer away. List the mistakes students commonly make with this sentence."""
+
+@dataclass
+class ReferenceEntry:
+    """Precomputed feedback material for one practice sentence."""
+    sentence_id: str
+    text: str
+    meaning_blocks: List[str] = field(default_factory=list)
+    rationale: str = ""
+    reconstructions: List[Dict] = field(default_factory=list)
+    ideas: List[Dict] = field(default_factory=list)
+    mistakes: List[Dict] = field(default_factory=list)
+
+    def blocks_match(self, student_blocks: str) -> bool:
+        """Whether a division into meaning blocks matches the reference division."""
+        blocks = [normalize_sentence(block) for block in _BLOCK.findall(student_blocks) if block.strip()]
+        return blocks == [normalize_sentence(block) for block in self.meaning_blocks]
+
+    def find_mistake(self, kind: str, student_input: str) -> Optional[Dict]:
+        """Return the first common mistake of this kind that the input makes."""
+        lowered = student_input.lower()
+        for mistake in self.mistakes:
+            if mistake["kind"] == kind and re.search(mistake["pattern"], lowered):
+                return mistake
+        return None
+
+    def repeated_words(self, reconstruction: str) -> List[str]:
+        """Words of the sentence that a reconstruction repeats (see utils.word_rules)."""
+        return repeated_words(self.text, reconstruction)
+
+    def estimate_accuracy(self, reconstruction: str) -> Tuple[int, List[Dict]]:
+        """
+        Estimate how accurate a reconstruction is without asking the LLM.
+
+        The estimate is the share of the sentence's ideas the reconstruction expresses,
+        raised to the accuracy of a reference version it closely resembles.
+
+        Args:
+            reconstruction: The student's reconstruction, with or without its version label
+
+        Returns:
+            Tuple[int, List[Dict]]: Accuracy in percent, and the ideas it is still missing
+        """
+        used = set(words(strip_version_label(reconstruction)))
+        missing = [idea for idea in self.ideas if not used.intersection(idea["cues"])]
+        accuracy = round(100 * (len(self.ideas) - len(missing)) / len(self.ideas)) if self.ideas else 0
+
+        content = used - STOPWORDS
+        for version in self.reconstructions:
+            reference = set(words(version["text"])) - STOPWORDS
+            union = content | reference
+            if union and len(content & reference) / len(union) >= EXEMPLAR_SIMILARITY:
+                accuracy = max(accuracy, version["accuracy"])
+        return accuracy, missing
+
+class ReferenceBank:
+    """Read-only access to the reference bank file, one row per sentence ID."""
+
+    def __init__(self, path: str = REFERENCE_BANK_PATH, max_cached_entries: int = 1024):
+        self.path = path
+        self.max_cached_entries = max_cached_entries
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+        # Least recently used lookups, misses included (students' own sentences are looked up every version)
+        self._cache: "OrderedDict[str, Optional[ReferenceEntry]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM reference").fetchone()[0]
+
+    def get(self, sid: str) -> Optional[ReferenceEntry]:
+        """Return the entry of a sentence ID, or None if the sentence has no reference answers."""
+        with self._lock:
+            if sid in self._cache:
+                self._cache.move_to_end(sid)
+                return self._cache[sid]
+            row = self._conn.execute("SELECT entry FROM reference WHERE sentence_id = ?", (sid,)).fetchone()
+            entry = ReferenceEntry(**json.loads(row[0])) if row else None
+            self._cache[sid] = entry
+            if len(self._cache) > self.max_cached_entries:
+                self._cache.popitem(last=False)
+        return entry
+
+    def lookup(self, text: str) -> Optional[ReferenceEntry]:
+        """Return the entry of a sentence, or None if it is not in the bank."""
+        return self.get(sentence_id(text))
+
+    def close(self):
+        self._conn.close()
+
+_default_bank: Optional[ReferenceBank] = None
+_default_version: Optional[Tuple[int, int]] = None
+_default_lock = threading.Lock()
+_last_check = 0.0
+_missing_reported = False
+
+def _bank_version(path: str = REFERENCE_BANK_PATH) -> Optional[Tuple[int, int]]:
+    """Modification time and size of the bank file, which change whenever it is rebuilt."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def ensure_reference_bank(path: str = REFERENCE_BANK_PATH, answers_path: str = REFERENCE_ANSWERS_PATH) -> bool:
+    """
+    Build the reference bank from the curated reference answers if it does not exist yet.
+
+    Returns:
+        bool: Whether the bank exists now
+    """
+    if os.path.exists(path):
+        return True
+    if not os.path.exists(answers_path):
+        return False
+    print(f"Reference bank {path} not found, building it from {answers_path}")
+    try:
+        build_reference_bank(path, answers_path)
+    except Exception as e:
+        print(f"Error building reference bank {path}: {str(e)}")
+    return os.path.exists(path)
+
+def get_reference_bank() -> Optional[ReferenceBank]:
+    """
+    Return the process-wide reference bank, or None if it cannot be built.
+
+    The bank is built from the curated reference answers on first use. At most
+    once every RELOAD_CHECK_SECONDS the file is checked, and a rebuilt bank is
+    opened and swapped in.
+    """
+    global _default_bank, _default_version, _last_check, _missing_reported
+    if (_default_bank is not None or _missing_reported) and time.monotonic() - _last_check < RELOAD_CHECK_SECONDS:
+        return _default_bank
+    with _default_lock:
+        _last_check = time.monotonic()
+        if _default_bank is None and not ensure_reference_bank(REFERENCE_BANK_PATH, REFERENCE_ANSWERS_PATH):
+            if not _missing_reported:
+                print(f"Reference bank {REFERENCE_BANK_PATH} is missing and {REFERENCE_ANSWERS_PATH} "
+                      f"was not found; feedback from reference answers is off")
+                _missing_reported = True
+            return None
+        version = _bank_version(REFERENCE_BANK_PATH)
+        if version is not None and version != _default_version:
+            # The replaced bank is closed when the last request using it lets go of it
+            _default_bank, _default_version = ReferenceBank(REFERENCE_BANK_PATH), version
+    return _default_bank
+
+def generate_reference(text: str, model: str = "gpt-4o") -> Dict:
+    """Ask the LLM for reference answers to a sentence that has no curated ones."""
+    from langchain_openai import ChatOpenAI
+
+    llm = ChatOpenAI(model=model, temperature=0)
+    reply = llm.invoke(GENERATION_PROMPT.format(text=text)).content
+    start, end = reply.find("{"), reply.rfind("}")
+    if start < 0 or end < start:
+        raise Exception(f"No JSON in the reference answers generated for: {text}")
+    return json.loads(reply[start:end + 1])
+
+def load_reference_entries(answers_path: str = REFERENCE_ANSWERS_PATH, practice_path: str = PRACTICE_SENTENCES_PATH,
+                           generate: bool = False) -> List[ReferenceEntry]:
+    """
+    Assemble reference entries from the practice sentences and the curated reference answers.
+
+    Args:
+        answers_path: Curated reference answers (reconstructions, ideas, common mistakes)
+        practice_path: Practice sentences with their correct meaning blocks
+        generate: Generate reference answers with the LLM for practice sentences that have none
+
+    Returns:
+        List[ReferenceEntry]: One entry per sentence
+    """
+    index = SentenceIndex()
+    index.load_practice_sentences(practice_path)
+    with open(answers_path) as f:
+        answers = {sentence_id(item["text"]): item for item in json.load(f)}
+
+    entries = []
+    for sid in list(answers) + [record.id for record in index if record.id not in answers]:
+        record = index.get(sid)
+        answer = answers.get(sid)
+        text = answer["text"] if answer else record.text
+        if answer is None and generate:
+            try:
+                answer = generate_reference(text)
+            except Exception as e:
+                print(f"Error generating reference answers for {text!r}: {str(e)}")
+        answer = answer or {}
+        entries.append(ReferenceEntry(
+            sentence_id=sid,
+            text=text,
+            meaning_blocks=record.meaning_blocks if record else [],
+            rationale=record.rationale if record else "",
+            reconstructions=answer.get("reconstructions", []),
+            ideas=answer.get("ideas", []),
+            mistakes=answer.get("mistakes", [])
+        ))
+    return entries
+
+def build_reference_bank(path: str = REFERENCE_BANK_PATH, answers_path: str = REFERENCE_ANSWERS_PATH,
+                         practice_path: str = PRACTICE_SENTENCES_PATH, generate: bool = False) -> int:
+    """
+    Build the reference bank from the practice sentences and the curated reference answers.
+
+    Args:
+        path: Where to write the bank
+        answers_path: Curated reference answers (reconstructions, ideas, common mistakes)
+        practice_path: Practice sentences with their correct meaning blocks
+        generate: Generate reference answers with the LLM for practice sentences that have none
+
+    Returns:
+        int: Number of sentences in the bank
+    """
+    entries = load_reference_entries(answers_path, practice_path, generate)
+
+    # Build next to the target and swap it in, so running servers never see a partial file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(tmp_path)
+    with conn:
+        conn.execute("CREATE TABLE reference (sentence_id TEXT PRIMARY KEY, text TEXT NOT NULL, entry TEXT NOT NULL)")
+        conn.executemany(
+            "INSERT INTO reference (sentence_id, text, entry) VALUES (?, ?, ?)",
+            [(entry.sentence_id, entry.text, json.dumps(asdict(entry), ensure_ascii=False)) for entry in entries]
+        )
+    conn.close()
+    os.replace(tmp_path, path)
+    return len(entries)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the reference answer bank for the practice sentences.")
+    parser.add_argument("--output", default=REFERENCE_BANK_PATH)
+    parser.add_argument("--generate", action="store_true",
+                        help="Generate reference answers with the LLM for sentences without curated ones")
+    args = parser.parse_args()
+    count = build_reference_bank(args.output, generate=args.generate)
+    print(f"Wrote reference answers for {count} sentences to {args.output}")
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+PRACTICE_SENTENCES_PATH = os.path.join("data", "practice_sentences.json")
+SENTENCE_INDEX_PATH = os.path.join("data", "sentence_index.jsonl")
+
+# How often live workers look for a re-indexed corpus
+RELOAD_CHECK_SECONDS = float(os.getenv("ESSAY_RELOAD_CHECK_SECONDS", "1"))
+
+# Quoted spans in straight or curly double quotes, paired left to right
+_QUOTED = re.compile(r'"([^"]+)"|“([^”]+)”')
+
+_SENTENCE_BOUNDARY = re.compile(r"""(?<=[.!?])["'”’)]*\s+(?=["'“‘(]?[A-Z])""")
+_ABBREVIATIONS = ("Mr.", "Mrs.", "Ms.", "Dr.", "St.", "Mme.", "M.", "Jr.", "Sr.")
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = "\"'“”‘’()[] .,;:!?"
+_TRANSLATE_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+
+@dataclass
+class SentenceRecord:
+    """A practice sentence and its precomputed meaning-block data."""
+    id: str
+    text: str
+    source: Optional[str] = None
+    meaning_blocks: List[str] = field(default_factory=list)
+    rationale: str = ""
+
+def normalize_sentence(text: str) -> str:
+    """Normalize quotes, case, whitespace and edge punctuation so equivalent sentences compare equal."""
+    text = text.translate(_TRANSLATE_QUOTES).lower()
+    return _WHITESPACE.sub(" ", text).strip(_EDGE_PUNCTUATION)
+
+def sentence_id(text: str) -> str:
+    """Stable identifier of a sentence, shared across processes and restarts."""
+    return hashlib.sha1(normalize_sentence(text).encode("utf-8")).hexdigest()[:16]
+
+def strip_meaning_blocks(text: str) -> str:
+    """Turn a division into meaning blocks back into the plain sentence."""
+    return _WHITESPACE.sub(" ", text.replace("(", " ").replace(")", " ")).strip()
+
+def extract_quoted_sentence(content: str, min_words: int = 3) -> str:
+    """
+    Find the sentence a student quoted in a message.
+
+    Quotes are paired left to right, so a message with several quoted spans
+    yields the longest span rather than everything between the first and the
+    last quote character. Parentheses are dropped, so a quoted division into
+    meaning blocks yields the sentence itself.
+
+    Args:
+        content: Message content
+        min_words: Minimum number of words for a quoted span to count as a sentence
+
+    Returns:
+        str: The quoted sentence, or an empty string
+    """
+    best = ""
+    for match in _QUOTED.finditer(content):
+        span = strip_meaning_blocks(match.group(1) or match.group(2))
+        if len(span.split()) >= min_words and len(span) > len(best):
+            best = span
+    return best
+
+def iter_sentence_spans(text: str) -> Iterator[Tuple[int, int]]:
+    """Yield (start, end) offsets of the sentences in a passage of prose."""
+    start = 0
+    for match in _SENTENCE_BOUNDARY.finditer(text):
+        candidate = text[start:match.start()].rstrip("\"'”’)")
+        if candidate.endswith(_ABBREVIATIONS):
+            continue
+        end = match.start()
+        if text[start:end].strip():
+            yield start, end
+        start = match.end()
+    if text[start:].strip():
+        yield start, len(text.rstrip())
+
+def split_sentences(text: str) -> List[str]:
+    """Split a passage of prose into sentences."""
+    return [_WHITESPACE.sub(" ", text[start:end]).strip() for start, end in iter_sentence_spans(text)]
+
+class SentenceIndex:
+    """Hash index from sentence IDs to their records, for O(1) lookup of known sentences."""
+
+    def __init__(self):
+        self._records: Dict[str, SentenceRecord] = {}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[SentenceRecord]:
+        return iter(self._records.values())
+
+    def add(self, record: SentenceRecord, overwrite: bool = True):
+        if overwrite or record.id not in self._records:
+            self._records[record.id] = record
+
+    def get(self, sid: str) -> Optional[SentenceRecord]:
+        return self._records.get(sid)
+
+    def lookup(self, text: str) -> Optional[SentenceRecord]:
+        """Return the record of a sentence, or None if it is not indexed."""
+        return self._records.get(sentence_id(text))
+
+    def add_corpus(self, source: str, text: str):
+        """Segment a document and index its sentences (existing records are kept)."""
+        for sentence in split_sentences(text):
+            self.add(SentenceRecord(id=sentence_id(sentence), text=sentence, source=source), overwrite=False)
+
+    def load_practice_sentences(self, path: str = PRACTICE_SENTENCES_PATH):
+        """Index the curated practice sentences, which carry meaning-block data."""
+        with open(path) as f:
+            for item in json.load(f):
+                self.add(SentenceRecord(id=sentence_id(item["text"]), **item))
+
+    def load(self, path: str = SENTENCE_INDEX_PATH):
+        """Load a segmented corpus written by save() (existing records are kept)."""
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    self.add(SentenceRecord(**json.loads(line)), overwrite=False)
+
+    def save(self, path: str = SENTENCE_INDEX_PATH):
+        """Write all records as JSON lines."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            for record in self._records.values():
+                f.write(json.dumps(asdict(record), ensure_ascii=False) + "\n")
+        os.replace(tmp_path, path)
+
+_default_index: Optional[SentenceIndex] = None
+_default_version: Optional[Tuple[int, int]] = None
+_default_lock = threading.Lock()
+_last_check = 0.0
+
+def _index_version() -> Optional[Tuple[int, int]]:
+    """Modification time and size of the index file, which change whenever it is rewritten."""
+    try:
+        stat = os.stat(SENTENCE_INDEX_PATH)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def get_sentence_index() -> SentenceIndex:
+    """
+    Return the process-wide index: practice sentences plus the segmented corpus if it was built.
+
+    At most once every RELOAD_CHECK_SECONDS the index file is checked, and an index
+    rewritten by the docs indexer is loaded and swapped in whole.
+    """
+    global _default_index, _default_version, _last_check
+    if _default_index is not None and time.monotonic() - _last_check < RELOAD_CHECK_SECONDS:
+        return _default_index
+    with _default_lock:
+        _last_check = time.monotonic()
+        version = _index_version()
+        if _default_index is None or version != _default_version:
+            index = SentenceIndex()
+            if os.path.exists(PRACTICE_SENTENCES_PATH):
+                index.load_practice_sentences()
+            if version is not None:
+                index.load()
+            _default_index, _default_version = index, version
+    return _default_index
+
+def index_corpus(store, path: str = SENTENCE_INDEX_PATH) -> SentenceIndex:
+    """Write the index of the practice sentences and every sentence of a corpus store."""
+    index = SentenceIndex()
+    index.load_practice_sentences()
+    for source, view in store.iter_units("sentence"):
+        sentence = _WHITESPACE.sub(" ", str(view, "utf-8")).strip()
+        index.add(SentenceRecord(id=sentence_id(sentence), text=sentence, source=source), overwrite=False)
+        view.release()
+    index.save(path)
+    return index
+
+def build_index(docs_dir: str = "docs", path: str = SENTENCE_INDEX_PATH, corpus_dir: Optional[str] = None) -> SentenceIndex:
+    """Bring the corpus store and the sentence index up to date with the PDFs in docs_dir."""
+    from agent.corpus_store import CORPUS_DIR
+    from agent.doc_indexer import DocIndexer
+
+    DocIndexer(docs_dir, corpus_dir or CORPUS_DIR, path).sync()
+    index = SentenceIndex()
+    index.load(path)
+    return index
+
+if __name__ == "__main__":
+    docs_dir = sys.argv[1] if len(sys.argv) > 1 else "docs"
+    built = build_index(docs_dir)
+    print(f"Indexed {len(built)} sentences to {SENTENCE_INDEX_PATH}")
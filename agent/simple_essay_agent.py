@@ -1,6 +1,7 @@
-from typing import List, Dict, Optional
-from dataclasses import dataclass
+from typing import List, Dict, Optional, Sequence, Tuple
+from dataclasses import dataclass, asdict
 import json
+from agent.paragraph_session import ParagraphSession
 
 @dataclass
 class Message:
@@ -13,15 +14,71 @@ class MeaningBlock:
     explanation: str
 
 class SimpleEssayAgent:
+    # Messages kept in the stored history; older ones are dropped
+    max_history = 40
+
     def __init__(self):
         self.conversation_history: List[Message] = []
         self.current_sentence: Optional[str] = None
         self.meaning_blocks: List[MeaningBlock] = []
         self.versions: List[str] = []
+        # Set when the student practises a whole paragraph, one sentence at a time
+        self.paragraph: Optional[ParagraphSession] = None
         
+    def to_dict(self) -> Dict:
+        """Serialize the agent state to a JSON-compatible dictionary."""
+        return {
+            "conversation_history": [asdict(m) for m in self.conversation_history],
+            "current_sentence": self.current_sentence,
+            "meaning_blocks": [asdict(b) for b in self.meaning_blocks],
+            "versions": list(self.versions),
+            "paragraph": self.paragraph.to_dict() if self.paragraph else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "SimpleEssayAgent":
+        """Rebuild an agent from a dictionary produced by to_dict."""
+        agent = cls()
+        agent.conversation_history = [Message(**m) for m in data.get("conversation_history", [])]
+        agent.current_sentence = data.get("current_sentence")
+        agent.meaning_blocks = [MeaningBlock(**b) for b in data.get("meaning_blocks", [])]
+        agent.versions = list(data.get("versions", []))
+        if data.get("paragraph"):
+            agent.paragraph = ParagraphSession.from_dict(data["paragraph"])
+        return agent
+
+    def start_sentence(self, sentence: Optional[str]):
+        """Start working on a new sentence, clearing the analysis of the previous one."""
+        self.current_sentence = sentence
+        self.meaning_blocks = []
+        self.versions = []
+
     def add_message(self, role: str, content: str):
-        """Add a message to the conversation history."""
+        """Add a message to the conversation history, keeping the last max_history messages."""
         self.conversation_history.append(Message(role=role, content=content))
+        if len(self.conversation_history) > self.max_history:
+            del self.conversation_history[:-self.max_history]
+
+    def add_messages(self, messages: Sequence[Tuple[str, str]]):
+        """
+        Add the messages of a chat turn that are not in the history yet.
+
+        Clients may send the whole conversation with every turn. The longest run
+        of messages that continues the end of the history is skipped; the last
+        message is the turn itself and is always added.
+
+        Args:
+            messages: (role, content) pairs in conversation order
+        """
+        history = [(m.role, m.content) for m in self.conversation_history]
+        start = 0
+        for end in range(len(messages) - 1, 0, -1):
+            overlap = min(end, len(history))
+            if overlap and list(messages[end - overlap:end]) == history[len(history) - overlap:]:
+                start = end
+                break
+        for role, content in messages[start:]:
+            self.add_message(role, content)
         
     def analyze_meaning_blocks(self, sentence: str) -> List[MeaningBlock]:
         """Analyze a sentence and break it into meaning blocks."""
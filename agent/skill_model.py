@@ -0,0 +1,265 @@
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from agent.sentence_index import SentenceIndex, SentenceRecord, get_sentence_index, sentence_id
+from utils.session_store import DEFAULT_DB_PATH
+from utils.trajectory_store import RULES
+from utils.word_rules import WORD
+
+# Steepness of the expected-accuracy curve and learning rate of the skill level
+SKILL_SLOPE = 6.0
+SKILL_RATE = 0.08
+# Expected accuracy on the sentence picked next: hard enough to take a few versions,
+# easy enough to finish without many LLM turns
+TARGET_ACCURACY = 0.7
+# Smoothing of the fast and slow accuracy averages whose difference is the trend
+FAST_ALPHA = 0.3
+SLOW_ALPHA = 0.05
+# Sentences a student worked on recently, not offered again
+RECENT_SENTENCES = 20
+
+_CLAUSE = re.compile(r"[,;:—–]|\b(?:which|who|whom|whose|that|because|although|though|while|when|if)\b", re.IGNORECASE)
+# Documents holding the method's rules rather than prose to practice on
+_RULE_DOCUMENT = re.compile(r"\b(?:rules?|rubric)\b", re.IGNORECASE)
+
+def sentence_difficulty(text: str) -> float:
+    """
+    Heuristic difficulty of a sentence from 0 (easy) to 1 (hard).
+
+    Long sentences, many clauses and a high share of long words all make a
+    sentence harder to reconstruct without repeating its words.
+    """
+    words = WORD.findall(text)
+    if not words:
+        return 0.0
+    length = min(len(words) / 40, 1.0)
+    clauses = min(len(_CLAUSE.findall(text)) / 4, 1.0)
+    long_words = min(sum(1 for word in words if len(word) >= 7) / len(words) / 0.35, 1.0)
+    return round(0.35 * length + 0.25 * clauses + 0.4 * long_words, 4)
+
+def expected_accuracy(level: float, difficulty: float) -> float:
+    """Accuracy (0 to 1) a student at a skill level is expected to reach on a sentence."""
+    return 1 / (1 + math.exp(-SKILL_SLOPE * (level - difficulty)))
+
+@dataclass
+class SkillProfile:
+    """
+    A student's skill across sentences, updated in O(1) per version attempt.
+
+    The level lives on the same 0-1 scale as sentence_difficulty and moves like an
+    Elo rating: up when a version beats the accuracy expected on that sentence,
+    down when it falls short.
+    """
+    level: float = 0.3
+    versions: int = 0
+    sentences: int = 0
+    violations: List[int] = field(default_factory=lambda: [0] * len(RULES))
+    scored_versions: int = 0
+    accuracy_fast: float = 0.0
+    accuracy_slow: float = 0.0
+    last_sentence: str = ""
+    recent: List[str] = field(default_factory=list)
+
+    @property
+    def is_new(self) -> bool:
+        return self.versions == 0
+
+    @property
+    def versions_per_sentence(self) -> float:
+        return self.versions / self.sentences if self.sentences else 0.0
+
+    @property
+    def accuracy_trend(self) -> float:
+        """Recent accuracy minus long-run accuracy, in points: positive when the student is improving."""
+        return self.accuracy_fast - self.accuracy_slow
+
+    def violation_rates(self) -> Dict[str, float]:
+        """Share of versions that broke each method rule."""
+        return {rule: (count / self.versions if self.versions else 0.0) for rule, count in zip(RULES, self.violations)}
+
+    def record_version(self, sentence_id: str, difficulty: float, accuracy: float = float("nan"),
+                       violations: int = 0):
+        """
+        Update the profile with one version attempt.
+
+        Args:
+            sentence_id: Hash ID of the sentence
+            difficulty: sentence_difficulty of the sentence
+            accuracy: Estimated accuracy in percent, NaN if unknown
+            violations: Bit mask of broken rules (see utils.trajectory_store.check_rules)
+        """
+        self.versions += 1
+        if sentence_id != self.last_sentence:
+            self.sentences += 1
+            self.last_sentence = sentence_id
+            if sentence_id in self.recent:
+                self.recent.remove(sentence_id)
+            self.recent = (self.recent + [sentence_id])[-RECENT_SENTENCES:]
+        for i in range(len(RULES)):
+            if violations & (1 << i):
+                self.violations[i] += 1
+
+        if math.isnan(accuracy):
+            # Without an estimate, a version that keeps to the rules counts as an average result
+            outcome = 0.5 if violations else TARGET_ACCURACY
+        else:
+            outcome = max(0.0, min(accuracy / 100, 1.0))
+            if self.scored_versions == 0:
+                self.accuracy_fast = self.accuracy_slow = accuracy
+            else:
+                self.accuracy_fast += FAST_ALPHA * (accuracy - self.accuracy_fast)
+                self.accuracy_slow += SLOW_ALPHA * (accuracy - self.accuracy_slow)
+            self.scored_versions += 1
+        self.level = max(0.0, min(1.0, self.level + SKILL_RATE * (outcome - expected_accuracy(self.level, difficulty))))
+
+    def target_difficulty(self) -> float:
+        """Difficulty of the sentence on which the student is expected to reach TARGET_ACCURACY."""
+        return max(0.0, min(1.0, self.level - math.log(TARGET_ACCURACY / (1 - TARGET_ACCURACY)) / SKILL_SLOPE))
+
+    def summary(self) -> Dict[str, Any]:
+        """The profile as reported by the API."""
+        return {
+            "level": round(self.level, 4),
+            "target_difficulty": round(self.target_difficulty(), 4),
+            "versions": self.versions,
+            "sentences": self.sentences,
+            "versions_per_sentence": round(self.versions_per_sentence, 2),
+            "accuracy": round(self.accuracy_fast, 1) if self.scored_versions else None,
+            "accuracy_trend": round(self.accuracy_trend, 1),
+            "violation_rates": {rule: round(rate, 3) for rule, rate in self.violation_rates().items()}
+        }
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "SkillProfile":
+        return cls(**data)
+
+class SkillStore:
+    """Skill profiles of every student, shared by all worker processes through the session database."""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connect().execute(
+            """CREATE TABLE IF NOT EXISTS skill_profiles (
+                student TEXT PRIMARY KEY,
+                profile TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return the connection owned by the calling thread."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, student: str) -> SkillProfile:
+        """Return a student's profile (an empty one for a new student)."""
+        row = self._connect().execute("SELECT profile FROM skill_profiles WHERE student = ?", (student,)).fetchone()
+        return SkillProfile.from_dict(json.loads(row[0])) if row else SkillProfile()
+
+    def update(self, student: str, fn: Callable[[SkillProfile], Any]) -> SkillProfile:
+        """Apply fn to a student's profile and save it, in one write transaction."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT profile FROM skill_profiles WHERE student = ?", (student,)).fetchone()
+            profile = SkillProfile.from_dict(json.loads(row[0])) if row else SkillProfile()
+            fn(profile)
+            conn.execute(
+                "INSERT OR REPLACE INTO skill_profiles (student, profile, updated_at) VALUES (?, ?, ?)",
+                (student, json.dumps(profile.to_dict(), separators=(",", ":")), time.time())
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return profile
+
+    def record_version(self, student: str, sentence: str, accuracy: float = float("nan"),
+                       violations: int = 0) -> SkillProfile:
+        """Record a version attempt of a student on a sentence (see SkillProfile.record_version)."""
+        difficulty = sentence_difficulty(sentence)
+        return self.update(student, lambda profile: profile.record_version(
+            sentence_id(sentence), difficulty, accuracy, violations))
+
+_store: Optional[SkillStore] = None
+_store_lock = threading.Lock()
+
+def get_skill_store() -> SkillStore:
+    """Return the process-wide skill store, creating it on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SkillStore(os.getenv("ESSAY_SESSION_DB", DEFAULT_DB_PATH))
+    return _store
+
+def is_practice_sentence(record: SentenceRecord) -> bool:
+    """Whether an indexed sentence is prose worth practicing on (not a rule, heading or fragment)."""
+    words = len(WORD.findall(record.text))
+    return 8 <= words <= 45 and record.text[:1].isupper() and record.text[-1:] in ".!?\"”" \
+        and not _RULE_DOCUMENT.search(record.source or "")
+
+# Practice sentences of the current index sorted by difficulty, rebuilt when the index is reloaded
+_candidates: Tuple[Optional[SentenceIndex], List[float], List[SentenceRecord]] = (None, [], [])
+
+def _sorted_candidates(index: SentenceIndex) -> Tuple[List[float], List[SentenceRecord]]:
+    global _candidates
+    if _candidates[0] is not index:
+        ranked = sorted((sentence_difficulty(record.text), record.id, record)
+                        for record in index if is_practice_sentence(record))
+        _candidates = (index, [difficulty for difficulty, _, _ in ranked], [record for _, _, record in ranked])
+    return _candidates[1], _candidates[2]
+
+def select_sentence(profile: SkillProfile, index: Optional[SentenceIndex] = None,
+                    window: int = 25) -> Optional[Tuple[SentenceRecord, float]]:
+    """
+    Pick the next practice sentence for a student from the indexed corpus.
+
+    Looks at the `window` sentences closest to the student's target difficulty
+    that they have not worked on recently, and prefers one with reference meaning
+    blocks, whose feedback needs no LLM call.
+
+    Args:
+        profile: The student's skill profile
+        index: Sentence index to pick from, defaults to the process-wide index
+        window: Nearby sentences considered
+
+    Returns:
+        Optional[Tuple[SentenceRecord, float]]: The sentence and its difficulty, or None if the index has no practice sentences
+    """
+    difficulties, records = _sorted_candidates(index or get_sentence_index())
+    target = profile.target_difficulty()
+    recent = set(profile.recent)
+    below, above = bisect_left(difficulties, target) - 1, bisect_left(difficulties, target)
+    nearby = []
+    while len(nearby) < window and (below >= 0 or above < len(records)):
+        if above >= len(records) or (below >= 0 and target - difficulties[below] <= difficulties[above] - target):
+            i, below = below, below - 1
+        else:
+            i, above = above, above + 1
+        if records[i].id not in recent:
+            nearby.append(i)
+    if not nearby:
+        return None
+    chosen = next((i for i in nearby if records[i].meaning_blocks), nearby[0])
+    return records[chosen], difficulties[chosen]
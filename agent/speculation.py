@@ -0,0 +1,93 @@
+import threading
+from dataclasses import dataclass
+from typing import FrozenSet, List, Optional
+
+from agent.reference_bank import ReferenceBank, ReferenceEntry, get_reference_bank
+from agent.sentence_index import sentence_id
+from utils.metrics import record_cache_lookup
+from utils.prefetch import PrefetchCache
+from utils.word_rules import find_repeated, forbidden_words
+
+# The step a student almost always takes after each step
+NEXT_STEP = {
+    "intro": "meaning_blocks",
+    "meaning_blocks": "reconstruction",
+    "reconstruction": "reconstruction"
+}
+
+@dataclass
+class StepContext:
+    """Everything the feedback for one step on one sentence needs, computed before the student asks."""
+    sentence_id: str
+    text: str
+    step: str
+    reference: Optional[ReferenceEntry] = None
+    lexicon: FrozenSet[str] = frozenset()
+
+    def repeated_words(self, student_input: str) -> List[str]:
+        """Words of the sentence that the input repeats, in the order the input uses them."""
+        return find_repeated(self.lexicon, student_input)
+
+def build_step_context(text: str, step: str, bank: Optional[ReferenceBank] = None) -> StepContext:
+    """
+    Compute the context of a step on a sentence.
+
+    Args:
+        text: The sentence the student works on
+        step: 'meaning_blocks' or 'reconstruction'
+        bank: Reference bank, defaults to the process-wide bank
+
+    Returns:
+        StepContext: The sentence's reference answers and repeated-word lexicon
+    """
+    sid = sentence_id(text)
+    bank = bank or get_reference_bank()
+    reference = bank.get(sid) if bank and text else None
+    record_cache_lookup("reference_bank", reference is not None)
+    return StepContext(sid, text, step, reference, forbidden_words(text))
+
+class Speculator:
+    """
+    Precomputes the context of a student's probable next step.
+
+    After each turn the agent asks for the step that almost always follows (v1
+    after meaning blocks, vN+1 after vN) to be prepared in the background, so the
+    next turn finds its reference answers and lexicon ready. A step that was not
+    predicted is computed on the caller's thread, so it never waits behind
+    speculation, and contexts are dropped when the reference bank is rebuilt.
+    """
+
+    def __init__(self, max_workers: int = 1, max_cached: int = 1000, bank: Optional[ReferenceBank] = None):
+        self.bank = bank
+        self._cache = PrefetchCache("speculation", max_workers, max_cached)
+        self._cached_bank: Optional[ReferenceBank] = None
+        self._bank_lock = threading.Lock()
+
+    def _current_bank(self) -> Optional[ReferenceBank]:
+        """The bank contexts are built from, forgetting contexts of a bank that was replaced."""
+        bank = self.bank or get_reference_bank()
+        with self._bank_lock:
+            if bank is not self._cached_bank:
+                self._cache.clear()
+                self._cached_bank = bank
+        return bank
+
+    @staticmethod
+    def predict(step: str) -> Optional[str]:
+        """The step most likely to follow a step, if any."""
+        return NEXT_STEP.get(step)
+
+    def speculate(self, text: str, step: str):
+        """Start preparing the context of the step that probably follows `step` on a sentence."""
+        next_step = self.predict(step)
+        if text and next_step:
+            bank = self._current_bank()
+            self._cache.prefetch((sentence_id(text), next_step), build_step_context, text, next_step, bank)
+
+    def context(self, text: str, step: str) -> StepContext:
+        """Return the context of a step, prepared in the background if it was predicted."""
+        bank = self._current_bank()
+        return self._cache.get((sentence_id(text), step), build_step_context, text, step, bank)
+
+    def shutdown(self):
+        self._cache.shutdown()
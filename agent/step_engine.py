@@ -0,0 +1,87 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from agent.intent_router import Intent, classify_intent
+
+# Steps of a tutoring turn, in the order a student normally goes through them
+STEPS = ("intro", "meaning_blocks", "reconstruction", "feedback")
+
+Guard = Callable[[Dict[str, Any], Intent, str], bool]
+Action = Callable[[Dict[str, Any], Intent, str], str]
+
+@dataclass(frozen=True)
+class Transition:
+    """
+    One row of the step table: when `guard` holds, move to `target` and run
+    `action`, whose return value is the tutor's feedback.
+    """
+    name: str
+    target: str
+    guard: Guard
+    action: Action
+
+class StepEngine:
+    """
+    Ordered rule table for the structured steps of a tutoring turn.
+
+    Each turn starts from the intro step, so the guards decide from the message and
+    the conversation, not from a step stored between turns. Transitions are tried
+    in table order and the first whose guard holds fires.
+    When none does, the fallback answers without changing step; it is the only
+    place an LLM call can happen, so turns that fit a transition cost a few
+    function calls.
+    """
+
+    def __init__(self, transitions: Sequence[Transition], fallback: Action,
+                 after: Optional[Callable[[Dict[str, Any], str], str]] = None):
+        """
+        Initialize the engine.
+
+        Args:
+            transitions: The step table, in priority order
+            fallback: Answers turns no transition matches
+            after: Optional pass over the feedback of every turn (e.g. to add guidance)
+
+        Raises:
+            Exception: If a transition names an unknown step
+        """
+        for transition in transitions:
+            if transition.target not in STEPS:
+                raise Exception(f"Transition {transition.name} uses unknown steps: {transition.target}")
+        self.transitions: List[Transition] = list(transitions)
+        self.fallback = fallback
+        self.after = after
+
+    def match(self, state: Dict[str, Any], intent: Intent, message: str) -> Optional[Transition]:
+        """Return the first transition whose guard holds, if any."""
+        for transition in self.transitions:
+            if transition.guard(state, intent, message):
+                return transition
+        return None
+
+    def run(self, state: Dict[str, Any], message: Optional[str] = None) -> str:
+        """
+        Apply one student turn to the state.
+
+        Args:
+            state: Turn state (an EssayState); current_step and current_meaning_block are updated in place
+            message: The student's message, by default the content of the last message in the state
+
+        Returns:
+            str: The tutor's feedback ("" if there are no messages)
+        """
+        if message is None:
+            if not state["messages"]:
+                return ""
+            message = state["messages"][-1]["content"]
+        intent = classify_intent(message)
+        transition = self.match(state, intent, message)
+        if transition is None:
+            feedback = self.fallback(state, intent, message)
+        else:
+            state["current_step"] = transition.target
+            feedback = transition.action(state, intent, message)
+        if feedback and self.after is not None:
+            feedback = self.after(state, feedback)
+        state["current_meaning_block"] = feedback
+        return feedback
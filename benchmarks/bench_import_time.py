@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark based on `python -X importtime`.
+
+Imports each entry-point module in a fresh interpreter, reports its cumulative
+import time and the heaviest top-level dependencies, and can save or compare
+against a previous run to track regressions.
+
+Usage:
+    python benchmarks/bench_import_time.py [--repeat 5] [--save results.json] [--compare results.json]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    "agent",
+    "agent.simple_essay_agent",
+    "agent.essay_agent",
+    "utils.prompt_utils",
+    "run"
+]
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def measure(module: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """
+    Import a module in a fresh interpreter.
+
+    Returns:
+        Tuple[float, List[Tuple[str, float]]]: Cumulative import time of the module in ms,
+        and (package, ms) for every import made directly by it
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise Exception(f"Importing {module} failed:\n{result.stderr}")
+
+    # importtime lists children before their parent, indented one level deeper
+    total = 0.0
+    children: List[Tuple[str, float]] = []
+    direct_imports: List[Tuple[str, float]] = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative_ms = int(match.group(2)) / 1000
+        depth = (len(match.group(3)) - 1) // 2
+        if depth == 1:
+            children.append((match.group(4), cumulative_ms))
+        elif depth == 0:
+            if match.group(4) == module:
+                total = cumulative_ms
+                direct_imports = children
+            children = []
+    return total, direct_imports
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="Number of heaviest dependencies to list per module")
+    parser.add_argument("--save", help="Write the median timings to this JSON file")
+    parser.add_argument("--compare", help="Compare against timings saved by --save")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    args = parser.parse_args()
+
+    baseline: Dict[str, float] = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results: Dict[str, float] = {}
+    for module in args.modules:
+        runs = [measure(module) for _ in range(args.repeat)]
+        median = statistics.median(total for total, _ in runs)
+        results[module] = median
+
+        line = f"{module:<28} {median:>9.1f} ms"
+        if module in baseline:
+            line += f"   (was {baseline[module]:.1f} ms, {baseline[module] / max(median, 0.001):.1f}x faster)"
+        print(line)
+
+        heaviest = sorted(runs[-1][1], key=lambda item: item[1], reverse=True)[:args.top]
+        for package, ms in heaviest:
+            print(f"    {package:<36} {ms:>9.1f} ms")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.save}")
+
+if __name__ == "__main__":
+    main()
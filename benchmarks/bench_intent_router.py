@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Routing benchmark on the recorded conversations in the transcript log.
+
+Compares the shared intent router with the substring checks previously used by
+run.py and EssayAgent.process_input: routing accuracy on the hand-labelled
+student turns, disagreements, and classification cost per message.
+
+Usage:
+    python benchmarks/bench_intent_router.py [--repeat 2000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Callable, Dict, List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from agent.intent_router import classify_intent
+from utils.transcript_log import DEFAULT_LOG_PATH, TranscriptLog
+
+# Expected intent of each distinct student turn found in the recordings
+LABELS = {
+    '("There was a touch) (of paternal contempt) (in it, even toward people he liked.)"': "meaning_blocks",
+    "(The Mole had been working very hard) (all the morning) (spring-cleaning his little home)": "meaning_blocks",
+    "(There was a touch of paternal contempt) (in it, even toward people he liked)": "meaning_blocks",
+    "Hello, I want to create a version": "new_sentence",
+    "How accurate is my reconstruction?": "evaluate",
+    "I don't know": "unsure",
+    "Please evaluate my work": "evaluate",
+    "The Mole had been working very hard all the morning, spring-cleaning his little home.": "new_sentence",
+    "There was a touch of paternal contempt in it, even toward people he liked.": "new_sentence",
+    "What are the meaning blocks in this sentence?": "hint",
+    "evaluate this version": "evaluate",
+    "v1. it had a large piece evil sorrow, also about dogs and boys": "version",
+    "v1. my reconstruction attempt": "version",
+    "v1. this is my first attempt": "version",
+    "v1: it had a large piece evil sorrow, also about dogs and boys.": "version",
+    "v2. it even gave a major siren sound, and for women he hated": "version",
+    "v2: it even gave a major siren sound, and for women he hated": "version",
+    "v3. it even had a little piece of monster man, also for acceptable girlfriends": "version",
+    "v4. it even had a little bit of bossy professor, also for men and women he knew": "version",
+    "v5. it even had a little bit of bossy anger, also for men and women he thought were good": "version",
+}
+
+def legacy_api_route(message: str) -> str:
+    """The chain of checks previously in run.py::chat."""
+    if "meaning blocks" in message.lower() or "(" in message and ")" in message:
+        return "meaning_blocks"
+    elif message.lower().startswith("v") and any(char.isdigit() for char in message):
+        return "version"
+    elif "evaluate" in message.lower() or "accuracy" in message.lower():
+        return "evaluate"
+    return "new_sentence"
+
+def legacy_agent_route(message: str) -> str:
+    """The chain of checks previously in EssayAgent.process_input (ignoring is_new_student)."""
+    if "i don't know" in message.lower():
+        return "unsure"
+    if "(" in message and ")" in message:
+        return "meaning_blocks"
+    if "v" in message.lower() or any(str(i) in message for i in range(1, 10)):
+        return "version"
+    return "hint"
+
+def load_recorded_turns() -> List[str]:
+    """Collect every recorded input turn (duplicates included, as they occur in the log)."""
+    log = TranscriptLog(os.path.join(PROJECT_ROOT, DEFAULT_LOG_PATH))
+    return [record["input"].strip() for record in log.iter_records()
+            if record["kind"] == "turn" and record.get("input")]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000, help="Passes over the recordings when timing")
+    args = parser.parse_args()
+
+    turns = load_recorded_turns()
+    labelled = [turn for turn in turns if turn in LABELS]
+    routers: Dict[str, Callable[[str], str]] = {
+        "intent_router": lambda message: classify_intent(message).name,
+        "legacy_run_py": legacy_api_route,
+        "legacy_essay_agent": legacy_agent_route
+    }
+
+    print(f"{len(turns)} recorded turns, {len(labelled)} labelled student turns "
+          f"({len(set(labelled))} distinct)\n")
+    print(f"{'router':<20} {'accuracy':>9} {'us/turn':>9}")
+    for name, route in routers.items():
+        correct = sum(route(turn) == LABELS[turn] for turn in labelled)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for turn in turns:
+                route(turn)
+        per_turn = (time.perf_counter() - start) / (args.repeat * len(turns)) * 1e6
+        print(f"{name:<20} {correct / len(labelled):>9.0%} {per_turn:>9.2f}")
+
+    print("\nTurns the routers disagree on:")
+    for turn in sorted(set(labelled)):
+        routes = {name: route(turn) for name, route in routers.items()}
+        if len(set(routes.values())) > 1 or routes["intent_router"] != LABELS[turn]:
+            intent = classify_intent(turn)
+            print(f"- {turn[:70]!r}")
+            print(f"    expected={LABELS[turn]} " + " ".join(f"{k}={v}" for k, v in routes.items()) +
+                  f" (confidence {intent.confidence:.2f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Request/response JSON encode and decode time for long transcripts.
+
+Builds /chat requests and the stored session state for transcripts of 10, 50
+and 200 turns, then times each way of decoding the request and encoding the
+response and the state: the standard library, orjson, and Pydantic's Rust core
+(model_validate_json / model_dump_json). Also reports the gzip ratio of the
+request body.
+
+Usage:
+    python benchmarks/bench_json.py [--turns 10,50,200] [--repeat 2000]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson
+
+from agent.simple_essay_agent import SimpleEssayAgent
+from run import ChatRequest, ChatResponse
+
+SENTENCE = "There was a touch of paternal contempt in it, even toward people he liked."
+
+def transcript(turns: int):
+    """A /chat request body and the session state after a transcript of `turns` student turns."""
+    agent = SimpleEssayAgent()
+    agent.current_sentence = SENTENCE
+    messages = []
+    for i in range(turns):
+        student = f"v{i + 1}. His manner carried some fatherly scorn, showing up also with those this man found likeable ({i})."
+        agent.add_message("user", student)
+        agent.create_version(i + 1, student)
+        reply = agent.get_next_prompt()
+        agent.add_message("assistant", reply)
+        messages += [{"role": "user", "content": student}, {"role": "assistant", "content": reply}]
+    body = json.dumps({"messages": messages, "session_id": "bench"}).encode("utf-8")
+    return body, agent.to_dict()
+
+def timed(repeat: int, fn) -> float:
+    """Microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", default="10,50,200")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'turns':>5} {'body KB':>8} {'gzip':>6}  {'step':<16} {'json µs':>9} {'orjson µs':>10} {'pydantic µs':>12}")
+    for turns in (int(t) for t in args.turns.split(",")):
+        body, state = transcript(turns)
+        request = ChatRequest.model_validate_json(body)
+        response = ChatResponse(response=request.messages[-1].content * 4, session_id="bench")
+        state_text = json.dumps(state)
+        rows = [
+            ("decode request",
+             timed(args.repeat, lambda: ChatRequest.model_validate(json.loads(body))),
+             timed(args.repeat, lambda: ChatRequest.model_validate(orjson.loads(body))),
+             timed(args.repeat, lambda: ChatRequest.model_validate_json(body))),
+            ("encode response",
+             timed(args.repeat, lambda: json.dumps(response.model_dump())),
+             timed(args.repeat, lambda: orjson.dumps(response.model_dump())),
+             timed(args.repeat, response.model_dump_json)),
+            ("decode state", timed(args.repeat, lambda: json.loads(state_text)),
+             timed(args.repeat, lambda: orjson.loads(state_text)), None),
+            ("encode state", timed(args.repeat, lambda: json.dumps(state, separators=(",", ":"))),
+             timed(args.repeat, lambda: orjson.dumps(state)), None),
+        ]
+        ratio = len(gzip.compress(body)) / len(body)
+        for i, (step, standard, fast, rust) in enumerate(rows):
+            prefix = f"{turns:>5} {len(body) / 1024:>8.1f} {ratio:>6.2f}" if i == 0 else " " * 21
+            rust = f"{rust:>12.1f}" if rust is not None else f"{'-':>12}"
+            print(f"{prefix}  {step:<16} {standard:>9.1f} {fast:>10.1f} {rust}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+PDF extraction throughput in pages per second.
+
+Extracts every PDF in a directory (repeated to simulate a larger library) with
+a growing number of worker processes, and reports pages per second, failed
+pages and the peak memory of the main process.
+
+Usage:
+    python benchmarks/bench_pdf_extraction.py [--docs docs] [--workers 1,2,4] [--repeat 4] [--chunk-size 8]
+"""
+
+import argparse
+import os
+import resource
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.pdf_utils import PAGE_CHUNK_SIZE, iter_pages
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", default="docs")
+    parser.add_argument("--workers", default=f"1,2,{os.cpu_count() or 1}")
+    parser.add_argument("--repeat", type=int, default=4, help="Times each PDF is extracted per run")
+    parser.add_argument("--chunk-size", type=int, default=PAGE_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    pdf_paths = [os.path.join(args.docs, filename) for filename in sorted(os.listdir(args.docs))
+                 if filename.lower().endswith(".pdf")] * args.repeat
+    print(f"{len(pdf_paths)} PDFs, {os.cpu_count()} CPUs\n")
+    print(f"{'workers':>7} {'pages':>7} {'failed':>7} {'seconds':>8} {'pages/s':>9} {'peak RSS':>9}")
+    for workers in sorted({int(w) for w in args.workers.split(",")}):
+        pages = failed = 0
+        start = time.perf_counter()
+        for page in iter_pages(pdf_paths, workers, args.chunk_size):
+            pages += 1
+            failed += page.error is not None
+        elapsed = time.perf_counter() - start
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"{workers:>7} {pages:>7} {failed:>7} {elapsed:>8.2f} {pages / elapsed:>9.1f} {peak_mb:>7.0f} MB")
+
+if __name__ == "__main__":
+    main()
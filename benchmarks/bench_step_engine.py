@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Per-turn overhead of the step engine against the LangGraph workflow it replaced.
+
+Rebuilds the previous two-node graph (process_input -> provide_guidance -> END)
+around the same step handlers, so both sides do identical tutoring work, and
+times a turn of each kind through graph.stream() and StepEngine.run(). Also
+reports the one-off cost of building and compiling the graph.
+
+Usage:
+    python benchmarks/bench_step_engine.py [--repeat 2000]
+"""
+
+import argparse
+import copy
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.essay_agent import EssayAgent, EssayState
+from agent.intent_router import classify_intent
+
+SENTENCE = "There was a touch of paternal contempt in it, even toward people he liked."
+
+TURNS = {
+    "intro": "I don't know",
+    "meaning_blocks": "(There was a touch of paternal contempt)(in it, even toward people he liked)",
+    "version": "v1: it had a large piece evil sorrow, also about dogs and boys",
+    "hint": "Please give me a hint"
+}
+
+def initial_state(message: str) -> EssayState:
+    return EssayState(
+        messages=[{"role": "user", "content": f'"{SENTENCE}"'}, {"role": "assistant", "content": "Welcome!"},
+                  {"role": "user", "content": message}],
+        current_meaning_block="", reconstruction_versions=[], accuracy_scores=[], original_text=SENTENCE,
+        sentence_id="", current_version=0, is_new_student=False, current_step="intro",
+        student_meaning_blocks="", confirmed_meaning_blocks=""
+    )
+
+def legacy_graph(agent: EssayAgent):
+    """The previous workflow, with its nodes delegating to the engine's handlers."""
+    from langgraph.graph import END, START, StateGraph
+
+    engine = agent.engine
+
+    def process_input(state: EssayState) -> EssayState:
+        message = state["messages"][-1]["content"]
+        intent = classify_intent(message)
+        transition = engine.match(state, intent, message)
+        if transition is None:
+            state["current_meaning_block"] = engine.fallback(state, intent, message)
+        else:
+            state["current_step"] = transition.target
+            state["current_meaning_block"] = transition.action(state, intent, message)
+        return state
+
+    def provide_guidance(state: EssayState) -> EssayState:
+        if state["current_meaning_block"]:
+            state["current_meaning_block"] = engine.after(state, state["current_meaning_block"])
+        return state
+
+    workflow = StateGraph(EssayState)
+    workflow.add_node("process_input", process_input)
+    workflow.add_node("provide_guidance", provide_guidance)
+    workflow.add_edge(START, "process_input")
+    workflow.add_edge("process_input", "provide_guidance")
+    workflow.add_edge("provide_guidance", END)
+    return workflow.compile()
+
+def timed(repeat: int, fn) -> float:
+    """Microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000, help="Turns timed per kind and implementation")
+    args = parser.parse_args()
+
+    agent = EssayAgent()
+    agent.llm_fallback = False
+    start = time.perf_counter()
+    graph = legacy_graph(agent)
+    print(f"Graph build and compile: {(time.perf_counter() - start) * 1000:.1f} ms (once per agent)\n")
+
+    def graph_turn(state: EssayState) -> str:
+        feedback = ""
+        for update in graph.stream(state):
+            feedback = list(update.values())[0].get("current_meaning_block", feedback)
+        return feedback
+
+    print(f"{'turn':<16}{'graph µs':>12}{'engine µs':>12}{'speedup':>10}")
+    for kind, message in TURNS.items():
+        state = initial_state(message)
+        if kind == "intro":
+            state["is_new_student"] = True
+        # Both implementations must give the same feedback
+        assert graph_turn(copy.deepcopy(state)) == agent.engine.run(copy.deepcopy(state)), kind
+        graph_us = timed(args.repeat, lambda: graph_turn(copy.deepcopy(state)))
+        engine_us = timed(args.repeat, lambda: agent.engine.run(copy.deepcopy(state)))
+        print(f"{kind:<16}{graph_us:>12.1f}{engine_us:>12.1f}{graph_us / engine_us:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Trajectory analytics benchmark on a synthetic attempt log.
+
+Writes a log of simulated version attempts (students improving on practice
+sentences, some of them stalling), then times loading it into columns and
+running the dashboard queries.
+
+Usage:
+    python benchmarks/bench_trajectories.py [--attempts 2000000] [--students 100000] [--sentences 50]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.trajectory_analytics import ATTEMPT_DTYPE, Trajectories
+from utils.trajectory_store import RULES
+
+def synthetic_attempts(attempts: int, students: int, sentences: int, seed: int = 0) -> np.ndarray:
+    """Simulate trajectories of 1-8 versions that improve at different rates (a fifth of them stall)."""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(1, 9, attempts // 4)
+    lengths = lengths[np.cumsum(lengths) <= attempts]
+    count = int(lengths.sum())
+    trajectory = np.repeat(np.arange(len(lengths)), lengths)
+    starts = np.cumsum(lengths) - lengths
+    version = np.arange(count) - starts[trajectory] + 1
+
+    student_keys = rng.integers(1, 2 ** 63, students, dtype=np.uint64)
+    sentence_keys = rng.integers(1, 2 ** 63, sentences, dtype=np.uint64)
+    gain = np.where(rng.random(len(lengths)) < 0.2, 1.0, rng.uniform(8, 25, len(lengths)))
+    started = rng.uniform(0, 30 * 86400, len(lengths))
+
+    records = np.zeros(count, dtype=ATTEMPT_DTYPE)
+    records["student"] = student_keys[rng.integers(0, students, len(lengths))][trajectory]
+    records["sentence"] = sentence_keys[rng.integers(0, sentences, len(lengths))][trajectory]
+    records["version"] = version
+    records["accuracy"] = np.clip(rng.uniform(10, 40, len(lengths))[trajectory] + gain[trajectory] * (version - 1)
+                                  + rng.normal(0, 3, count), 0, 100)
+    records["violations"] = rng.integers(0, 2 ** len(RULES), count) * (rng.random(count) < 0.3)
+    records["timestamp"] = started[trajectory] + version * rng.uniform(60, 600, count)
+    # The log is written in time order, interleaving all students
+    return records[np.argsort(records["timestamp"])]
+
+def timed(label: str, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<28} {(time.perf_counter() - start) * 1000:>9.1f} ms")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--attempts", type=int, default=2_000_000)
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--sentences", type=int, default=50)
+    args = parser.parse_args()
+
+    records = synthetic_attempts(args.attempts, args.students, args.sentences)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "trajectories.bin")
+        records.tofile(path)
+        print(f"{len(records)} attempts, {os.path.getsize(path) / 1e6:.0f} MB log\n")
+
+        trajectories = timed("load + group", lambda: Trajectories.load(path))
+        reach = timed("versions_to_reach(90)", trajectories.versions_to_reach)
+        rates = timed("violation_rates", trajectories.violation_rates)
+        stalled = timed("plateaus", trajectories.plateaus)
+        sentence = int(records["sentence"][0])
+        subset = timed("select one sentence", lambda: trajectories.select(sentence=sentence))
+        timed("summary of one sentence", subset.summary)
+
+    print(f"\n{trajectories.trajectory_count} trajectories, {reach['reach_rate']:.0%} reach 90% "
+          f"after {reach['mean_versions']:.2f} versions on average, {len(stalled)} plateaued")
+    print("violation rates: " + ", ".join(f"{rule}={rate:.1%}" for rule, rate in rates.items()))
+
+if __name__ == "__main__":
+    main()
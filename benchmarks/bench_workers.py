@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the multi-worker API mode.
+
+Starts `run.py` with 1, 2, 4, ... worker processes (up to the number of cores),
+drives /chat from several client processes with many interleaved sessions, and
+reports requests per second and scaling efficiency relative to one worker.
+
+Usage:
+    python benchmarks/bench_workers.py [--duration 10] [--clients 16] [--max-workers N]
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TURNS = [
+    "There was a touch of paternal contempt in it, even toward people he liked.",
+    "(There was a touch of paternal contempt) (in it, even toward people he liked)",
+    "v1. it had a large piece evil sorrow, also about dogs and boys",
+    "v2. it even had a little bit of bossy anger, also for men and women he thought were good",
+    "evaluate this version"
+]
+
+def wait_for_server(port: int, timeout: float = 30.0):
+    """Block until the API answers on the given port."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/docs")
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise Exception(f"Server on port {port} did not start within {timeout}s")
+
+def client_loop(args) -> int:
+    """Send chat turns for the given duration and return the number of completed requests."""
+    port, duration, sessions = args
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    session_ids = [uuid.uuid4().hex for _ in range(sessions)]
+    completed = 0
+    deadline = time.time() + duration
+    while time.time() < deadline:
+        session_id = session_ids[completed % sessions]
+        turn = TURNS[(completed // sessions) % len(TURNS)]
+        body = json.dumps({"session_id": session_id, "messages": [{"role": "user", "content": turn}]}).encode("utf-8")
+        conn.request("POST", "/chat", body, {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        response.read()
+        if response.status == 200:
+            completed += 1
+    conn.close()
+    return completed
+
+def run_with_workers(workers: int, duration: float, clients: int, port: int) -> float:
+    """Start the API with the given worker count and return the measured requests per second."""
+    env = dict(os.environ)
+    env["ESSAY_SESSION_DB"] = os.path.join(tempfile.mkdtemp(), "sessions.sqlite3")
+    server = subprocess.Popen(
+        [sys.executable, "run.py", "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers)],
+        cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_for_server(port)
+        with multiprocessing.Pool(clients) as pool:
+            start = time.time()
+            counts = pool.map(client_loop, [(port, duration, 8)] * clients)
+            elapsed = time.time() - start
+        return sum(counts) / elapsed
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--port", type=int, default=8101)
+    args = parser.parse_args()
+
+    worker_counts = []
+    workers = 1
+    while workers <= args.max_workers:
+        worker_counts.append(workers)
+        workers *= 2
+
+    baseline = None
+    print(f"{'workers':>8} {'req/s':>10} {'speedup':>8} {'efficiency':>10}")
+    for workers in worker_counts:
+        rps = run_with_workers(workers, args.duration, args.clients, args.port)
+        baseline = baseline or rps
+        speedup = rps / baseline
+        print(f"{workers:>8} {rps:>10.1f} {speedup:>8.2f} {speedup / workers:>10.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Grading accuracy versus latency on the golden grading set.
+
+Runs each grading backend over the labelled items in data/golden_grading.jsonl
+in parallel and reports its agreement with the labels, p50/p95 latency and cost
+per item, then names the fastest backend that meets the agreement target.
+Items that copy a reference reconstruction are held out, since the rules and
+vector backends score against those.
+
+Usage:
+    python benchmarks/eval_grading.py [--backends rules,vector,llm] [--concurrency 8] [--repeat 1]
+                                      [--target 0.85] [--cassette tests/cassettes/grading.json]
+                                      [--cassette-mode replay|record|auto] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.grading import GOLDEN_SET_PATH, GRADERS, LLMGrader, evaluate_grader, independent_items, load_golden_set
+from agent.reference_bank import load_reference_entries
+
+def build_grader(name: str, cassette: str = "", cassette_mode: str = "replay"):
+    """Create a backend by name, routing the LLM backend through a cassette if one is given."""
+    if name == "llm" and cassette:
+        from utils.llm_cassette import CassetteLLM
+
+        model = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
+        live_llm = None if cassette_mode == "replay" else LLMGrader(model).llm
+        return LLMGrader(model, llm=CassetteLLM(live_llm, cassette, mode=cassette_mode, model=model))
+    return GRADERS[name]()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--golden", default=GOLDEN_SET_PATH)
+    parser.add_argument("--backends", default="rules,vector,llm")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=1, help="Passes over the set, for steadier latencies")
+    parser.add_argument("--target", type=float, default=0.85, help="Agreement the chosen backend must reach")
+    parser.add_argument("--cassette", default="", help="Record/replay the LLM backend's calls in this cassette")
+    parser.add_argument("--cassette-mode", choices=["replay", "record", "auto"], default="auto")
+    parser.add_argument("--json", action="store_true", help="Print the reports as JSON")
+    args = parser.parse_args()
+
+    labelled = load_golden_set(args.golden)
+    items = independent_items(labelled, load_reference_entries())
+    if len(items) < len(labelled):
+        print(f"Holding out {len(labelled) - len(items)} items that copy reference reconstructions")
+    reports = []
+    for name in args.backends.split(","):
+        try:
+            grader = build_grader(name.strip(), args.cassette, args.cassette_mode)
+        except Exception as e:
+            print(f"Skipping backend {name}: {str(e)}")
+            continue
+        reports.append(evaluate_grader(grader, items, args.concurrency, args.repeat))
+        if isinstance(grader, LLMGrader) and hasattr(grader.llm, "save"):
+            grader.llm.save()
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        print(f"{len(items)} labelled items, concurrency {args.concurrency}, {args.repeat} pass(es)\n")
+        print(f"{'backend':<10} {'agreement':>9} {'p50 ms':>9} {'p95 ms':>9} {'$/item':>10} {'errors':>6}")
+        for report in reports:
+            print(f"{report['backend']:<10} {report['agreement']:>9.1%} {report['p50_ms']:>9.2f} "
+                  f"{report['p95_ms']:>9.2f} {report['cost_per_item']:>10.6f} {report['errors']:>6}")
+            if report["disagreements"]:
+                print(f"  disagrees on: {', '.join(report['disagreements'])}")
+
+    eligible = [r for r in reports if r["agreement"] >= args.target]
+    if eligible:
+        best = min(eligible, key=lambda r: (r["p95_ms"], r["cost_per_item"]))
+        print(f"\nFastest backend at {args.target:.0%} agreement or better: {best['backend']}")
+    else:
+        print(f"\nNo backend reaches {args.target:.0%} agreement")
+
+if __name__ == "__main__":
+    main()
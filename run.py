@@ -1,20 +1,151 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse
+from fastapi.routing import APIRoute
+from contextlib import asynccontextmanager
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, AsyncIterator, Callable, List, Dict, Optional, Tuple
 from agent.simple_essay_agent import SimpleEssayAgent
-import uvicorn
+from agent.budget import get_budget_manager
+from agent.final_summary import summary_inputs, summary_key, write_final_summary
+from agent.intent_router import classify_intent
+from agent.paragraph_session import ParagraphSession, SentencePreparation, get_sentence_preparer
+from agent.reference_bank import get_reference_bank
+from agent.skill_model import SkillProfile, get_skill_store, select_sentence
+from agent.sentence_index import normalize_sentence, sentence_id, split_sentences, strip_meaning_blocks
+from utils.session_store import SessionConflictError, get_session_store
+from utils.rate_limit import AdmissionController, AdmissionRejected
+from utils.jobs import JobQueueFull, get_job_manager, shutdown_job_manager
+from utils.ws_hub import ConnectionHub, HubFull
+from utils.trajectory_store import check_rules, get_trajectory_store, sentence_key, student_key
+from utils import fast_json, metrics
+from utils import profiler
+import argparse
+import asyncio
+import json
+import os
+import time
+
+class FastJSONRequest(Request):
+    """Request whose JSON body is parsed with orjson."""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = fast_json.loads(await self.body())
+        return self._json
+
+class FastJSONRoute(APIRoute):
+    """
+    Route that parses JSON request bodies with orjson.
+
+    Responses of endpoints with a response model are already encoded by
+    Pydantic's Rust core, so only the request side needs replacing.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            return await handler(FastJSONRequest(request.scope, request.receive))
+
+        return route_handler
+
+# Sessions idle for SESSION_TTL seconds and jobs untouched for JOB_TTL seconds are
+# deleted every PURGE_INTERVAL seconds by each worker (0 turns the purge off)
+SESSION_TTL = float(os.getenv("ESSAY_SESSION_TTL", str(7 * 86400)))
+JOB_TTL = float(os.getenv("ESSAY_JOB_TTL", "86400"))
+PURGE_INTERVAL = float(os.getenv("ESSAY_PURGE_INTERVAL", "3600"))
+
+def purge_expired() -> Dict[str, int]:
+    """Delete expired sessions and jobs from the session database, returning how many of each."""
+    purged = {"sessions": 0, "jobs": 0}
+    if SESSION_TTL > 0:
+        purged["sessions"] = get_session_store().purge(SESSION_TTL)
+    if JOB_TTL > 0:
+        purged["jobs"] = get_job_manager().store.purge(JOB_TTL)
+    return purged
+
+async def _purge_periodically():
+    while True:
+        await asyncio.sleep(PURGE_INTERVAL)
+        try:
+            purged = await run_in_threadpool(purge_expired)
+            if any(purged.values()):
+                print(f"Purged {purged['sessions']} expired sessions and {purged['jobs']} jobs")
+        except Exception as e:
+            print(f"Error purging expired sessions: {str(e)}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    purge_task = asyncio.create_task(_purge_periodically()) if PURGE_INTERVAL > 0 else None
+    try:
+        yield
+    finally:
+        if purge_task is not None:
+            purge_task.cancel()
+        shutdown_job_manager()
 
 app = FastAPI(
     title="Essay Writing Tutor API",
     description="API for essay writing assistance using simple essay engineering",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
+app.router.route_class = FastJSONRoute
+
+# Session state lives in a SQLite store shared by all worker processes
+DEFAULT_SESSION_ID = "default"
 
-# Initialize the simple essay agent
-essay_agent = SimpleEssayAgent()
+# Sentences of a paragraph prepared ahead of the one the student is working on
+PREFETCH_AHEAD = int(os.getenv("ESSAY_PREFETCH_AHEAD", "2"))
+
+# Rate limiting and load shedding for chat turns (limits apply per worker)
+admission = AdmissionController.from_env()
+
+# WebSocket sessions: ping after WS_HEARTBEAT seconds of silence, push a hint after
+# WS_HINT_AFTER seconds without an answer, close after WS_IDLE_TIMEOUT seconds idle
+WS_HEARTBEAT = float(os.getenv("ESSAY_WS_HEARTBEAT", "20"))
+WS_HINT_AFTER = float(os.getenv("ESSAY_WS_HINT_AFTER", "90"))
+WS_IDLE_TIMEOUT = float(os.getenv("ESSAY_WS_IDLE_TIMEOUT", "600"))
+WS_CLOSE_IDLE = 4408
+WS_CLOSE_REPLACED = 4409
+ws_hub = ConnectionHub(int(os.getenv("ESSAY_WS_MAX_CONNECTIONS", "1000")))
+
+# /chat/batch: most items per request, and turns of one batch processed at the same time
+BATCH_MAX_ITEMS = int(os.getenv("ESSAY_BATCH_MAX_ITEMS", "500"))
+BATCH_CONCURRENCY = int(os.getenv("ESSAY_BATCH_CONCURRENCY", "16"))
+
+# Runtime metrics read at scrape time
+metrics.REGISTRY.gauge("essay_sessions", "Tutoring sessions updated within the session TTL",
+                       callback=lambda: get_session_store().count(SESSION_TTL if SESSION_TTL > 0 else None))
+metrics.REGISTRY.gauge("essay_stored_sessions", "Tutoring sessions stored, including idle ones not purged yet",
+                       callback=lambda: get_session_store().count())
+metrics.REGISTRY.gauge("essay_session_state_avg_bytes", "Average stored state size per session in bytes",
+                       callback=lambda: get_session_store().average_state_bytes())
+metrics.REGISTRY.gauge("essay_queue_depth", "Chat turns waiting for an execution slot in this worker",
+                       callback=lambda: admission.queue_depth)
+metrics.REGISTRY.gauge("essay_pending_jobs", "Background jobs queued or running in this worker",
+                       callback=lambda: get_job_manager().pending)
+metrics.REGISTRY.gauge("essay_ws_sessions", "WebSocket sessions held open by this worker",
+                       callback=lambda: len(ws_hub))
+metrics.REGISTRY.gauge("essay_active_requests", "Chat turns being processed by this worker",
+                       callback=lambda: admission.active)
+
+# Opt-in profiling surface (ESSAY_PROFILING=1): per-request phase timings,
+# /admin/profile captures and SIGUSR2-triggered captures
+if profiler.profiling_enabled():
+    profiler.install_signal_handler()
+
+    @app.middleware("http")
+    async def record_request_timings(request: Request, call_next):
+        with profiler.request_timings(f"{request.method} {request.url.path}") as timings:
+            response = await call_next(request)
+        response.headers["Server-Timing"] = timings.server_timing_header()
+        return response
 
 # Add CORS middleware
 app.add_middleware(
@@ -25,27 +156,75 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress responses above a size threshold for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=int(os.getenv("ESSAY_GZIP_MIN_BYTES", "1024")))
+
 class Message(BaseModel):
     role: str = Field(..., description="The role of the message sender (user, assistant, or system)")
     content: str = Field(..., description="The content of the message")
 
 class ChatRequest(BaseModel):
     messages: List[Message] = Field(..., description="List of messages in the conversation")
+    session_id: Optional[str] = Field(None, description="Identifier of the tutoring session; requests without one share a default session")
 
-    class Config:
-        schema_extra = {
-            "example": {
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": "There was a touch of paternal contempt in it, even toward people he liked."
-                    }
-                ]
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "messages": [
+                {
+                    "role": "user",
+                    "content": "There was a touch of paternal contempt in it, even toward people he liked."
+                }
+            ]
         }
+    })
 
 class ChatResponse(BaseModel):
     response: str = Field(..., description="The AI's response to the chat request")
+    session_id: str = Field(..., description="Identifier of the tutoring session")
+
+async def _chat_turn(session_id: str, messages: List[Message]) -> Tuple[str, str]:
+    """
+    Apply one chat turn to a stored session under admission control.
+
+    Returns:
+        Tuple[str, str]: The routing branch and the tutor's reply
+
+    Raises:
+        AdmissionRejected: If the turn is rate limited or shed
+    """
+    in_progress = any(msg.role == "assistant" for msg in messages) or get_session_store().exists(session_id)
+    started = time.perf_counter()
+    # Version attempt of this turn, recorded once the session update has committed
+    attempts: List[Tuple[str, int, str]] = []
+
+    def handle_turn(state: Dict) -> Tuple[str, str]:
+        with profiler.phase("parsing"):
+            essay_agent = SimpleEssayAgent.from_dict(state)
+        with profiler.phase("agent"):
+            branch, response = _route_turn(essay_agent, messages, session_id)
+        attempts.clear()
+        if branch == "version" and essay_agent.current_sentence:
+            attempts.append((essay_agent.current_sentence, len(essay_agent.versions), messages[-1].content))
+        with profiler.phase("serialization"):
+            state.clear()
+            state.update(essay_agent.to_dict())
+        return branch, response
+
+    def apply_turn() -> Tuple[str, str]:
+        result = get_session_store().update(session_id, handle_turn)
+        # Recording writes SQLite and the trajectory log, so it stays off the event loop too
+        for sentence, version, reconstruction in attempts:
+            _record_attempt(session_id, sentence, version, reconstruction)
+        return result
+
+    try:
+        async with admission.admit(session_id, in_progress):
+            branch, response = await run_in_threadpool(apply_turn)
+    except AdmissionRejected as e:
+        metrics.REQUESTS_REJECTED.inc(status=str(e.status_code))
+        raise
+    metrics.REQUEST_LATENCY.observe(time.perf_counter() - started, branch=branch)
+    return branch, response
 
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
@@ -57,43 +236,532 @@ async def chat(request: ChatRequest):
     Returns:
         The AI's response to the chat request
     """
+    session_id = request.session_id or DEFAULT_SESSION_ID
     try:
-        # Process messages through the simple agent
-        for msg in request.messages:
-            essay_agent.add_message(msg.role, msg.content)
-        
-        # Get the latest user message
-        latest_message = request.messages[-1].content
-        
-        # Simple logic to determine response based on content
-        if "meaning blocks" in latest_message.lower() or "(" in latest_message and ")" in latest_message:
-            # User is providing meaning blocks
-            blocks = essay_agent.analyze_meaning_blocks(latest_message)
-            response = f"Thanks for your meaning blocks! I see you've identified {len(blocks)} blocks. Now try creating version 1 (v1) of your meaning reconstruction. Remember not to repeat words from the original."
-        
-        elif latest_message.lower().startswith("v") and any(char.isdigit() for char in latest_message):
-            # User is providing a version
-            version_num = len(essay_agent.versions) + 1
-            essay_agent.create_version(version_num, latest_message)
-            response = essay_agent.get_next_prompt()
-        
-        elif "evaluate" in latest_message.lower() or "accuracy" in latest_message.lower():
-            # User wants evaluation
-            if essay_agent.versions:
-                last_version = essay_agent.versions[-1]
-                response = f"Looking at {last_version}, I can see you're making progress. Let's continue improving. Try the next version!"
-            else:
-                response = "I don't see any versions to evaluate yet. Please provide a version first."
-        
-        else:
-            # Default response - treat as new sentence
-            essay_agent.current_sentence = latest_message
-            response = f"Great! Let's analyze this sentence: '{latest_message}'\n\nCan you break it into meaning blocks? Use parentheses to separate them, like: (block 1) (block 2)"
-        
-        return ChatResponse(response=response)
+        branch, response = await _chat_turn(session_id, request.messages)
+        return ChatResponse(response=response, session_id=session_id)
         
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail,
+                            headers={"Retry-After": e.retry_after_header})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+class BatchRequest(BaseModel):
+    items: List[ChatRequest] = Field(..., description="Chat turns to process, each with its own session")
+
+async def _batch_results(items: List[ChatRequest]):
+    """Run the turns of a batch concurrently and yield one NDJSON line per turn as each completes."""
+    done: asyncio.Queue = asyncio.Queue()
+    slots = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run_item(index: int, item: ChatRequest):
+        session_id = item.session_id or DEFAULT_SESSION_ID
+        result = {"index": index, "session_id": session_id}
+        try:
+            if not item.messages:
+                raise ValueError("The item has no messages")
+            async with slots:
+                branch, response = await _chat_turn(session_id, item.messages)
+            result.update(status=200, branch=branch, response=response)
+        except AdmissionRejected as e:
+            result.update(status=e.status_code, detail=e.detail, retry_after=e.retry_after_header)
+        except ValueError as e:
+            result.update(status=422, detail=str(e))
+        except Exception as e:
+            result.update(status=500, detail=str(e))
+        await done.put(result)
+
+    async def run_session(turns: List[Tuple[int, ChatRequest]]):
+        # Turns of one session apply in request order; sessions run concurrently
+        for index, item in turns:
+            await run_item(index, item)
+
+    sessions: Dict[str, List[Tuple[int, ChatRequest]]] = {}
+    for index, item in enumerate(items):
+        sessions.setdefault(item.session_id or DEFAULT_SESSION_ID, []).append((index, item))
+    tasks = [asyncio.create_task(run_session(turns)) for turns in sessions.values()]
+    try:
+        for _ in items:
+            yield fast_json.dumps(await done.get()) + b"\n"
+    finally:
+        for task in tasks:
+            task.cancel()
+
+@app.post("/chat/batch")
+async def chat_batch(request: BatchRequest):
+    """
+    Process many chat turns in one request, e.g. an LMS replaying its students' turns.
+
+    Turns of different sessions run concurrently; turns of the same session run in
+    the order given. Results stream back as NDJSON, one line per turn in completion
+    order, each with the turn's index in the request and its own status, so an
+    error or a slow turn never holds back the others.
+    """
+    if len(request.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"A batch holds at most {BATCH_MAX_ITEMS} items")
+    return StreamingResponse(_batch_results(request.items), media_type="application/x-ndjson")
+
+class TutoringChannel:
+    """
+    One student's session held open over a WebSocket.
+
+    The agent stays in memory between turns, so a turn costs a version check and a
+    save instead of loading and parsing the whole state. If another worker changed
+    the session meanwhile (e.g. a /chat request), the state is reloaded first.
+    """
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.agent: Optional[SimpleEssayAgent] = None
+        self.version = 0
+        self.hints_sent = 0
+
+    def load(self):
+        state, self.version = get_session_store().load(self.session_id)
+        self.agent = SimpleEssayAgent.from_dict(state)
+
+    def turn(self, content: str) -> Tuple[str, str]:
+        """Apply one student message and persist the session, returning the routing branch and the reply."""
+        store = get_session_store()
+        for attempt in range(store.max_retries):
+            if self.agent is None or store.version(self.session_id) != self.version:
+                self.load()
+            branch, response = _route_turn(self.agent, [Message(role="user", content=content)], self.session_id)
+            if store.save(self.session_id, self.agent.to_dict(), self.version):
+                self.version += 1
+                self.hints_sent = 0
+                if branch == "version" and self.agent.current_sentence:
+                    _record_attempt(self.session_id, self.agent.current_sentence, len(self.agent.versions), content)
+                return branch, response
+            # Lost a race with another writer: drop the local changes and replay on the stored state
+            self.agent = None
+            time.sleep(min(0.001 * (2 ** attempt), 0.05))
+        raise SessionConflictError(f"Could not update session {self.session_id} after {store.max_retries} attempts")
+
+    def next_hint(self) -> Optional[str]:
+        """The next guiding question for the sentence being worked on, if any is left."""
+        if self.agent is None or not self.agent.current_sentence:
+            return None
+        paragraph = self.agent.paragraph
+        if paragraph and not paragraph.finished:
+            text = paragraph.current_sentence.text
+        else:
+            text = strip_meaning_blocks(self.agent.current_sentence)
+        hints = get_sentence_preparer().get(text).hints
+        if self.hints_sent >= len(hints):
+            return None
+        self.hints_sent += 1
+        return hints[self.hints_sent - 1]
+
+async def _send_frame(websocket: WebSocket, frame: Dict):
+    await websocket.send_text(fast_json.dumps_str(frame))
+
+async def _ws_turn(websocket: WebSocket, channel: TutoringChannel, content: str):
+    """Run one turn and stream the reply back paragraph by paragraph, then a done frame."""
+    started = time.perf_counter()
+    try:
+        async with admission.admit(channel.session_id, True):
+            branch, response = await run_in_threadpool(channel.turn, content)
+    except AdmissionRejected as e:
+        metrics.REQUESTS_REJECTED.inc(status=str(e.status_code))
+        await _send_frame(websocket, {"type": "error", "status": e.status_code, "detail": e.detail,
+                                      "retry_after": e.retry_after_header})
+        return
+    except Exception as e:
+        await _send_frame(websocket, {"type": "error", "status": 500, "detail": str(e)})
+        return
+    parts = response.split("\n\n")
+    for i, part in enumerate(parts):
+        await _send_frame(websocket, {"type": "partial", "text": part + ("\n\n" if i < len(parts) - 1 else "")})
+    await _send_frame(websocket, {"type": "done", "branch": branch})
+    metrics.REQUEST_LATENCY.observe(time.perf_counter() - started, branch=branch)
+
+@app.websocket("/ws/{session_id}")
+async def tutoring_socket(websocket: WebSocket, session_id: str):
+    """
+    Stateful tutoring channel: one session per connection, a small frame per turn.
+
+    Client frames: {"type": "message", "content": "..."} carries only the new student
+    message; {"type": "ping"} and {"type": "pong"} keep the connection alive.
+    Server frames: "ready" on connect; "partial" pieces of a reply followed by
+    "done"; "hint" when the student has been silent on a step for a while;
+    "ping" heartbeats; "error". Idle connections are closed with code 4408, and a
+    connection replaced by a newer one for the same session with code 4409.
+    """
+    await websocket.accept()
+    try:
+        previous = ws_hub.connect(session_id, websocket)
+    except HubFull as e:
+        await websocket.close(code=1013, reason=str(e))
+        return
+    if previous is not None:
+        try:
+            await previous.close(code=WS_CLOSE_REPLACED, reason="Session opened elsewhere")
+        except Exception:
+            pass
+
+    channel = TutoringChannel(session_id)
+    try:
+        await run_in_threadpool(channel.load)
+        await _send_frame(websocket, {"type": "ready", "session_id": session_id,
+                                      "current_sentence": channel.agent.current_sentence})
+        loop = asyncio.get_running_loop()
+        last_seen = last_reply = last_sent = loop.time()
+        while True:
+            now = loop.time()
+            deadlines = [last_seen + WS_IDLE_TIMEOUT, last_sent + WS_HEARTBEAT]
+            if channel.agent.current_sentence:
+                deadlines.append(last_reply + WS_HINT_AFTER)
+            try:
+                raw = await asyncio.wait_for(websocket.receive_text(), max(0.0, min(deadlines) - now))
+            except asyncio.TimeoutError:
+                now = loop.time()
+                if now >= last_seen + WS_IDLE_TIMEOUT:
+                    await websocket.close(code=WS_CLOSE_IDLE, reason="Idle")
+                    return
+                if channel.agent.current_sentence and now >= last_reply + WS_HINT_AFTER:
+                    last_reply = now
+                    hint = await run_in_threadpool(channel.next_hint)
+                    if hint:
+                        await _send_frame(websocket, {"type": "hint", "text": hint})
+                        last_sent = now
+                        continue
+                if now >= last_sent + WS_HEARTBEAT:
+                    await _send_frame(websocket, {"type": "ping"})
+                    last_sent = now
+                continue
+
+            last_seen = loop.time()
+            try:
+                frame = fast_json.loads(raw)
+            except ValueError:
+                frame = None
+            kind = frame.get("type") if isinstance(frame, dict) else None
+            if kind == "message" and isinstance(frame.get("content"), str) and frame["content"].strip():
+                await _ws_turn(websocket, channel, frame["content"])
+                last_reply = last_sent = loop.time()
+            elif kind == "ping":
+                await _send_frame(websocket, {"type": "pong"})
+                last_sent = loop.time()
+            elif kind != "pong":
+                await _send_frame(websocket, {"type": "error", "status": 400,
+                                              "detail": "Expected a message, ping or pong frame"})
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: the connection was closed under us (e.g. replaced by a newer one)
+        pass
+    finally:
+        ws_hub.disconnect(session_id, websocket)
+
+class SentenceProgressItem(BaseModel):
+    index: int = Field(..., description="Position of the sentence in the paragraph")
+    text: str = Field(..., description="The sentence")
+    status: str = Field(..., description="pending, meaning_blocks, reconstruction or done")
+    versions: int = Field(..., description="Number of versions written")
+
+class ProgressResponse(BaseModel):
+    current: int = Field(..., description="Index of the sentence being worked on")
+    total: int = Field(..., description="Number of sentences")
+    completed: int = Field(..., description="Number of sentences done")
+    sentences: List[SentenceProgressItem]
+
+@app.get("/sessions/{session_id}/progress", response_model=ProgressResponse)
+def get_progress(session_id: str):
+    """Per-sentence progress of a session; single-sentence sessions count as a one-sentence paragraph."""
+    state, _ = get_session_store().load(session_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="Unknown session")
+    essay_agent = SimpleEssayAgent.from_dict(state)
+    if essay_agent.paragraph:
+        return essay_agent.paragraph.progress()
+    sentences = []
+    if essay_agent.current_sentence:
+        status = "reconstruction" if essay_agent.versions else ("meaning_blocks" if essay_agent.meaning_blocks else "pending")
+        sentences.append({"index": 0, "text": essay_agent.current_sentence, "status": status,
+                          "versions": len(essay_agent.versions)})
+    return {"current": 0, "total": len(sentences), "completed": 0, "sentences": sentences}
+
+@app.get("/sessions/{session_id}/skills")
+def get_skills(session_id: str):
+    """The student's skill profile and the practice sentence suggested next."""
+    profile = get_skill_store().get(session_id)
+    picked = select_sentence(profile)
+    suggestion = {"text": picked[0].text, "source": picked[0].source, "difficulty": picked[1]} if picked else None
+    return {**profile.summary(), "next_sentence": suggestion}
+
+@app.get("/sessions/{session_id}/usage")
+def get_usage(session_id: str, x_tenant_id: Optional[str] = Header(None)):
+    """LLM tokens, time and cost used by a session (and its tenant), their limits, and the current tier."""
+    return get_budget_manager().report(session_id, x_tenant_id)
+
+class JobResponse(BaseModel):
+    job_id: str = Field(..., description="Identifier of the job")
+    kind: str = Field(..., description="Kind of job, e.g. final_summary")
+    status: str = Field(..., description="queued, running, done, failed or cancelled")
+    progress: float = Field(..., description="Share of the work done, from 0 to 1")
+    message: str = Field("", description="What the job is doing")
+    result: Optional[Dict] = Field(None, description="The job's result once it is done")
+    error: Optional[str] = Field(None, description="Why the job failed")
+
+def _job_response(job: Dict) -> JobResponse:
+    return JobResponse(**job)
+
+def _summary_llm(model: str):
+    """Chat model for the final summaries, or None to explain progress from the reference estimates."""
+    if os.getenv("ESSAY_SUMMARY_LLM", "1") != "1":
+        return None
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(model=model, temperature=0.7)
+
+@app.post("/sessions/{session_id}/summary", response_model=JobResponse, status_code=202)
+def start_summary(session_id: str, x_tenant_id: Optional[str] = Header(None)):
+    """
+    Start writing the final summary of a session's versions as a background job.
+
+    Poll GET /jobs/{job_id} for progress and the result. Requesting the summary of
+    unchanged versions again returns the existing job. The LLM calls count against
+    the budgets of the session and of its tenant (X-Tenant-ID), and a session over
+    budget gets a smaller model or the reference estimates.
+    """
+    state, _ = get_session_store().load(session_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="Unknown session")
+    sentences = summary_inputs(state)
+    if not sentences:
+        raise HTTPException(status_code=409, detail="The session has no versions to summarize yet")
+    budget = get_budget_manager().session(session_id, x_tenant_id)
+    plan = budget.plan(os.getenv("OPENAI_MODEL", "gpt-4.1-mini"))
+    llm = _summary_llm(plan.model) if plan.allows_llm else None
+    model = plan.model if llm is not None else "reference"
+    try:
+        job = get_job_manager().submit("final_summary", summary_key(sentences, model), write_final_summary,
+                                       sentences, llm, model, budget)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return _job_response(job)
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+def get_job(job_id: str):
+    """Status, progress and (once done) result of a background job."""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return _job_response(job)
+
+@app.delete("/jobs/{job_id}", response_model=JobResponse)
+def cancel_job(job_id: str):
+    """Cancel a background job; a running job stops at its next progress checkpoint."""
+    job = get_job_manager().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return _job_response(job)
+
+@app.get("/metrics")
+def get_metrics():
+    """Runtime metrics in the Prometheus text exposition format."""
+    return Response(content=metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+def _check_admin(token: Optional[str]):
+    """Allow admin endpoints only when profiling is enabled and the admin token matches."""
+    if not profiler.profiling_enabled():
+        raise HTTPException(status_code=404, detail="Not Found")
+    expected = os.getenv("ESSAY_ADMIN_TOKEN")
+    if expected and token != expected:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.post("/admin/profile")
+def start_profile(seconds: float = 10.0, x_admin_token: Optional[str] = Header(None)):
+    """
+    Start a sampling profile of this worker.
+    
+    The collapsed stacks are written to ESSAY_PROFILE_DIR when the capture ends
+    and can be rendered with flamegraph.pl or speedscope.
+    """
+    _check_admin(x_admin_token)
+    if not 0 < seconds <= 300:
+        raise HTTPException(status_code=422, detail="seconds must be between 0 and 300")
+    try:
+        path = profiler.profiler.start(seconds)
+    except profiler.ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"path": path, "seconds": seconds, "pid": os.getpid()}
+
+@app.get("/admin/timings")
+def get_timings(x_admin_token: Optional[str] = Header(None)):
+    """Per-phase wall/CPU breakdowns of the most recent requests handled by this worker."""
+    _check_admin(x_admin_token)
+    return {"pid": os.getpid(), "requests": list(profiler.recent_timings)}
+
+def openapi_spec(server_url: str = "http://localhost:8001") -> Dict:
+    """OpenAPI description of the API (swagger.json), with the WebSocket channel documented as an upgrade."""
+    spec = dict(app.openapi())
+    spec["servers"] = [{"url": server_url, "description": "Local development server"}]
+    spec["paths"] = dict(spec["paths"])
+    spec["paths"]["/ws/{session_id}"] = {
+        "get": {
+            "summary": "Tutoring Socket",
+            "description": " ".join(tutoring_socket.__doc__.split()),
+            "operationId": "tutoring_socket_ws__session_id__get",
+            "parameters": [{"name": "session_id", "in": "path", "required": True,
+                            "schema": {"type": "string", "title": "Session Id"}}],
+            "responses": {"101": {"description": "Switching to the WebSocket protocol"}}
+        }
+    }
+    return spec
+
+def _record_attempt(session_id: str, sentence: str, version: int, reconstruction: str):
+    """Append a version attempt to the trajectory log read by the analytics dashboards and update the student's skill profile."""
+    try:
+        text = strip_meaning_blocks(sentence)
+        bank = get_reference_bank()
+        reference = bank.lookup(text) if bank else None
+        accuracy = reference.estimate_accuracy(reconstruction)[0] if reference and reference.ideas else float("nan")
+        violations = check_rules(reconstruction, text)
+        get_trajectory_store().append(student_key(session_id), sentence_key(sentence_id(text)), version,
+                                      accuracy, violations)
+        get_skill_store().record_version(session_id, text, accuracy, violations)
+    except Exception as e:
+        print(f"Error recording version attempt: {str(e)}")
+
+def _sentence_intro(paragraph: ParagraphSession) -> str:
+    """Introduce the paragraph sentence the student is starting on."""
+    sentence = paragraph.current_sentence
+    return f"Sentence {paragraph.current + 1} of {len(paragraph.sentences)}: '{sentence.text}'\n\n" + \
+        "Can you break it into meaning blocks? Use parentheses to separate them, like: (block 1) (block 2)"
+
+def _blocks_feedback(preparation: SentencePreparation, blocks: List[str]) -> str:
+    """Compare a paragraph sentence's meaning blocks with its prepared reference division, if it has one."""
+    if not preparation.meaning_blocks:
+        return ""
+    reference = " ".join(f"({block})" for block in preparation.meaning_blocks)
+    if [normalize_sentence(b) for b in blocks] == [normalize_sentence(b) for b in preparation.meaning_blocks]:
+        return f"That matches the reference division: {reference}\n\n"
+    rationale = f" {preparation.rationale}" if preparation.rationale else ""
+    return f"The reference division of this sentence is: {reference}.{rationale}\n\n"
+
+def _route_turn(essay_agent: SimpleEssayAgent, messages: List[Message],
+                session_id: Optional[str] = None) -> Tuple[str, str]:
+    """Apply one chat turn to a session's agent and return the routing branch and the tutor's reply."""
+    # Process messages through the simple agent
+    essay_agent.add_messages([(msg.role, msg.content) for msg in messages])
+    
+    # Get the latest user message
+    latest_message = messages[-1].content
+    paragraph = essay_agent.paragraph if essay_agent.paragraph and not essay_agent.paragraph.finished else None
+    preparer = get_sentence_preparer()
+    
+    # Route on the shared intent classifier
+    intent = classify_intent(latest_message)
+    if intent.name == "meaning_blocks":
+        # User is providing meaning blocks
+        blocks = essay_agent.analyze_meaning_blocks(latest_message)
+        branch = "meaning_blocks"
+        response = f"Thanks for your meaning blocks! I see you've identified {len(blocks)} blocks. Now try creating version 1 (v1) of your meaning reconstruction. Remember not to repeat words from the original."
+        if paragraph:
+            essay_agent.current_sentence = paragraph.current_sentence.text
+            paragraph.record_blocks([block.text for block in blocks])
+            preparation = preparer.get(paragraph.current_sentence.text)
+            response = _blocks_feedback(preparation, [block.text for block in blocks]) + response
+    
+    elif intent.name == "version":
+        # User is providing a version
+        branch = "version"
+        version_num = len(essay_agent.versions) + 1
+        essay_agent.create_version(version_num, latest_message)
+        if paragraph:
+            paragraph.record_version(essay_agent.versions[-1])
+        response = essay_agent.get_next_prompt()
+    
+    elif intent.name == "evaluate":
+        # User wants evaluation
+        branch = "evaluate"
+        if essay_agent.versions:
+            last_version = essay_agent.versions[-1]
+            response = f"Looking at {last_version}, I can see you're making progress. Let's continue improving. Try the next version!"
+        else:
+            response = "I don't see any versions to evaluate yet. Please provide a version first."
+    
+    elif intent.name in ("hint", "unsure") and essay_agent.current_sentence:
+        # User needs guidance on the current step
+        branch = "hint"
+        response = essay_agent.get_next_prompt()
+        if paragraph:
+            hints = preparer.get(paragraph.current_sentence.text).hints
+            if hints:
+                response += f"\n\nThink about this: {hints[min(len(essay_agent.versions), len(hints) - 1)]}"
+    
+    elif intent.name in ("hint", "unsure"):
+        # A request for help before any sentence: ask for one rather than take the request as the sentence
+        branch = "hint"
+        response = "Send me the sentence you'd like to work on, and we'll start by breaking it into meaning blocks."
+    
+    elif intent.name == "next_sentence" and paragraph:
+        # User moves on to the next sentence of the paragraph
+        branch = "next_sentence"
+        upcoming = paragraph.advance()
+        if upcoming is None:
+            essay_agent.start_sentence(None)
+            response = f"You've worked through all {len(paragraph.sentences)} sentences of the paragraph. Well done! Send me a new sentence or paragraph whenever you're ready."
+        else:
+            essay_agent.start_sentence(upcoming.text)
+            response = _sentence_intro(paragraph)
+    
+    elif intent.name == "next_sentence":
+        # Outside a paragraph: pick a practice sentence from the corpus at the student's level
+        branch = "next_sentence"
+        profile = get_skill_store().get(session_id) if session_id else SkillProfile()
+        picked = select_sentence(profile)
+        if picked is None:
+            response = "Send me the sentence you'd like to work on next."
+        else:
+            essay_agent.paragraph = None
+            essay_agent.start_sentence(picked[0].text)
+            response = f"Here's a sentence at your level: '{picked[0].text}'\n\n" + \
+                "Can you break it into meaning blocks? Use parentheses to separate them, like: (block 1) (block 2)"
+    
+    elif intent.name == "new_sentence" and len(split_sentences(latest_message)) > 1:
+        # A paragraph: work through it sentence by sentence
+        branch = "paragraph"
+        paragraph = ParagraphSession.from_text(latest_message)
+        essay_agent.paragraph = paragraph
+        essay_agent.start_sentence(paragraph.current_sentence.text)
+        response = f"Great! We'll work through this paragraph one sentence at a time.\n\n{_sentence_intro(paragraph)}"
+    
+    else:
+        # Default response - treat as new sentence
+        branch = "new_sentence"
+        essay_agent.paragraph = None
+        paragraph = None
+        essay_agent.current_sentence = latest_message
+        response = f"Great! Let's analyze this sentence: '{latest_message}'\n\nCan you break it into meaning blocks? Use parentheses to separate them, like: (block 1) (block 2)"
+    
+    # Prepare the current and upcoming sentences in the background while the student works
+    if paragraph and not paragraph.finished:
+        preparer.prefetch([paragraph.current_sentence.text] + paragraph.upcoming(PREFETCH_AHEAD))
+    
+    return branch, response
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8001) 
\ No newline at end of file
+    from utils.server import serve
+
+    parser = argparse.ArgumentParser(description="Run the Essay Writing Tutor API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8001")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1")),
+                        help="Number of worker processes; session state is shared through ESSAY_SESSION_DB")
+    parser.add_argument("--purge", action="store_true",
+                        help="Delete expired sessions and jobs once and exit (for cron)")
+    parser.add_argument("--openapi", metavar="PATH", help="Write the OpenAPI description (e.g. swagger.json) and exit")
+    args = parser.parse_args()
+    if args.openapi:
+        with open(args.openapi, "w") as f:
+            json.dump(openapi_spec(), f, indent=2)
+            f.write("\n")
+        print(f"Wrote {args.openapi}")
+        raise SystemExit(0)
+    if args.purge:
+        purged = purge_expired()
+        print(f"Purged {purged['sessions']} sessions and {purged['jobs']} jobs")
+        raise SystemExit(0)
+    serve("run:app", host=args.host, port=args.port, workers=args.workers)
@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pytest
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import agent.budget as budget
+import agent.skill_model as skill_model
+import utils.jobs as jobs
+import utils.session_store as session_store
+
+@pytest.fixture(autouse=True)
+def session_db(tmp_path_factory, monkeypatch):
+    """Keep the process-wide stores of every test in a temporary database instead of data/sessions.sqlite3."""
+    db_path = str(tmp_path_factory.mktemp("data") / "sessions.sqlite3")
+    monkeypatch.setenv("ESSAY_SESSION_DB", db_path)
+    for module, name in ((session_store, "_store"), (skill_model, "_store"), (budget, "_manager"), (jobs, "_manager")):
+        monkeypatch.setattr(module, name, None)
+    yield db_path
+    if jobs._manager is not None:
+        jobs._manager.shutdown()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Parallel, cached runner for the agent test suites.
+
+Runs the SimpleEssayAgent cases (tests/simple_agent_test.py) in a process pool
+and the EssayAgent conversations (tests/test_essay_agent.py) concurrently on
+asyncio, with the agent's LLM replayed from a cassette so no network is needed.
+Cases whose definition and dependencies are unchanged since they last passed
+are reported as cached instead of run. The EssayAgent cases build the reference
+bank from data/reference_answers.json first, and are skipped with the reason
+if it cannot be built.
+
+Usage:
+    python -m tests.runner [--suite all|simple|essay] [--workers 4] [--cassette-mode replay|record|auto]
+                           [--no-cache] [--log]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import glob
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+CASSETTE_PATH = os.path.join(PROJECT_ROOT, "tests", "cassettes", "essay_agent.json")
+CACHE_PATH = os.path.join(PROJECT_ROOT, ".test-cache", "results.json")
+
+# Harness runs are logged outside the tree unless asked to go into the committed log
+TEST_LOG_PATH = os.getenv("ESSAY_TEST_TRANSCRIPT_LOG", os.path.join(PROJECT_ROOT, ".test-cache", "transcripts.jsonl.gz"))
+COMMITTED_LOG_PATH = os.path.join(PROJECT_ROOT, "data", "transcripts.jsonl.gz")
+
+# Files whose content decides whether a suite's cached results are still valid. The
+# generated reference bank is left out: it is built from the two data files listed
+SUITE_DEPENDENCIES = {
+    "simple": ["agent/simple_essay_agent.py", "tests/simple_agent_test.py"],
+    "essay": [
+        "agent/*.py", "utils/*.py", "prompts/system_prompt.md", "data/practice_sentences.json",
+        "data/reference_answers.json", "tests/test_essay_agent.py",
+        os.path.relpath(CASSETTE_PATH, PROJECT_ROOT)
+    ]
+}
+
+def load_cases(suite: str) -> List[Dict]:
+    """Return the case definitions of a suite."""
+    if suite == "simple":
+        from tests.simple_agent_test import TEST_CASES
+        return TEST_CASES
+    from tests.test_essay_agent import ESSAY_CASES
+    return ESSAY_CASES
+
+def harness_log(committed: bool = False):
+    """Transcript log for harness runs: the test log, or the committed data/transcripts.jsonl.gz."""
+    from utils.transcript_log import TranscriptLog
+
+    path = COMMITTED_LOG_PATH if committed else TEST_LOG_PATH
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return TranscriptLog(path)
+
+def essay_skip_reason() -> Optional[str]:
+    """Build the reference bank the EssayAgent cases depend on; the reason to skip them if that fails."""
+    from agent.reference_bank import REFERENCE_ANSWERS_PATH, REFERENCE_BANK_PATH, ensure_reference_bank
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        built = ensure_reference_bank(os.path.join(PROJECT_ROOT, REFERENCE_BANK_PATH),
+                                      os.path.join(PROJECT_ROOT, REFERENCE_ANSWERS_PATH))
+    if built:
+        return None
+    return f"{REFERENCE_BANK_PATH} could not be built from {REFERENCE_ANSWERS_PATH}"
+
+def dependency_digest(patterns: List[str]) -> str:
+    """Hash the paths and contents of every file matching the patterns."""
+    digest = hashlib.sha1()
+    for pattern in patterns:
+        for path in sorted(glob.glob(os.path.join(PROJECT_ROOT, pattern))):
+            digest.update(os.path.relpath(path, PROJECT_ROOT).encode("utf-8"))
+            with open(path, "rb") as f:
+                digest.update(hashlib.sha1(f.read()).digest())
+    return digest.hexdigest()
+
+def case_digest(suite: str, case: Dict, dependencies: str) -> str:
+    """Content hash of a case: its definition plus the digest of the suite's dependencies."""
+    payload = json.dumps([suite, case, dependencies], sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def run_simple_case(case: Dict) -> Dict:
+    """Run one SimpleEssayAgent case (in a worker process), discarding its console output."""
+    from tests.simple_agent_test import SimpleAgentTester
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        return SimpleAgentTester().run_test_case(case["name"], case["inputs"], case["expected_behaviors"])
+
+async def run_essay_cases(cases: List[Dict], cassette_mode: str, concurrency: int) -> List[Dict]:
+    """Run EssayAgent conversations concurrently, with every LLM call going through the cassette."""
+    from agent.budget import BudgetManager
+    from agent.essay_agent import EssayAgent
+    from agent.skill_model import SkillStore
+    from tests.test_essay_agent import run_essay_case
+    from utils.llm_cassette import CassetteLLM, CassetteMissError
+
+    model = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
+    live_llm = None if cassette_mode == "replay" else EssayAgent().llm
+    cassette = CassetteLLM(live_llm, CASSETTE_PATH, mode=cassette_mode, model=model)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    stores_dir = tempfile.TemporaryDirectory()
+
+    def run_one(case: Dict) -> Dict:
+        agent = EssayAgent()
+        agent.llm = cassette
+        # Every run starts from new students and budgets, whatever earlier runs recorded
+        agent.budget = BudgetManager(os.path.join(stores_dir.name, "sessions.sqlite3"))
+        agent.skill_store = SkillStore(os.path.join(stores_dir.name, "sessions.sqlite3"))
+        try:
+            return run_essay_case(agent, case["name"], case["inputs"], case["expected_behaviors"])
+        except CassetteMissError as e:
+            return {"test_name": case["name"], "inputs": case["inputs"], "passed": False, "notes": [str(e)]}
+
+    async def run_limited(case: Dict) -> Dict:
+        async with semaphore:
+            return await asyncio.to_thread(run_one, case)
+
+    try:
+        return list(await asyncio.gather(*(run_limited(case) for case in cases)))
+    finally:
+        cassette.save()
+        stores_dir.cleanup()
+
+def run_suites(suites: List[str], workers: int = 4, cassette_mode: str = "replay", use_cache: bool = True,
+               cache_path: str = CACHE_PATH) -> List[Dict]:
+    """
+    Run the selected suites and return one result per case.
+
+    Cases with an unchanged content hash that passed before are reported as
+    cached instead of being run again.
+
+    Args:
+        suites: Suite names ("simple", "essay")
+        workers: Processes for the pure-Python cases, and concurrent conversations for the LLM ones
+        cassette_mode: Cassette mode for LLM calls (replay, record or auto)
+        use_cache: Skip unchanged cases that passed before
+        cache_path: Where the content hashes of passing cases are kept
+
+    Returns:
+        List[Dict]: Results with suite, test_name, passed, cached and notes
+    """
+    cache: Dict[str, str] = {}
+    if use_cache and os.path.exists(cache_path):
+        with open(cache_path) as f:
+            cache = json.load(f)
+
+    results: List[Dict] = []
+    pending: Dict[str, List[Dict]] = {}
+    digests: Dict[str, str] = {}
+    for suite in suites:
+        skip_reason = essay_skip_reason() if suite == "essay" else None
+        if skip_reason:
+            results += [{"suite": suite, "test_name": case["name"], "passed": True, "cached": False,
+                         "skipped": True, "notes": [skip_reason]} for case in load_cases(suite)]
+            continue
+        dependencies = dependency_digest(SUITE_DEPENDENCIES[suite])
+        for case in load_cases(suite):
+            key = f"{suite}:{case['name']}"
+            digests[key] = case_digest(suite, case, dependencies)
+            if use_cache and cache.get(key) == digests[key]:
+                results.append({"suite": suite, "test_name": case["name"], "passed": True, "cached": True, "notes": []})
+            else:
+                pending.setdefault(suite, []).append(case)
+
+    simple_cases = pending.get("simple", [])
+    pool: Optional[ProcessPoolExecutor] = None
+    if len(simple_cases) > 1 and workers > 1:
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(simple_cases)))
+        simple_futures = [pool.submit(run_simple_case, case) for case in simple_cases]
+    try:
+        essay_results = []
+        if pending.get("essay"):
+            # The agent prints debug output; keep the runner's report readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                essay_results = asyncio.run(run_essay_cases(pending["essay"], cassette_mode, workers))
+        if pool is not None:
+            simple_results = [future.result() for future in simple_futures]
+        else:
+            simple_results = [run_simple_case(case) for case in simple_cases]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    for suite, suite_results in (("simple", simple_results), ("essay", essay_results)):
+        for result in suite_results:
+            result.update({"suite": suite, "cached": False})
+            results.append(result)
+
+    if use_cache:
+        for result in results:
+            key = f"{result['suite']}:{result['test_name']}"
+            if result.get("skipped"):
+                continue
+            if result["passed"]:
+                cache[key] = digests[key]
+            else:
+                cache.pop(key, None)
+        directory = os.path.dirname(cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(cache_path, "w") as f:
+            json.dump(cache, f, indent=2, sort_keys=True)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suite", choices=["all", "simple", "essay"], default="all")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--cassette-mode", choices=["replay", "record", "auto"],
+                        default=os.getenv("ESSAY_CASSETTE_MODE", "replay"))
+    parser.add_argument("--no-cache", action="store_true", help="Run every case, even unchanged ones")
+    parser.add_argument("--log", action="store_true", help="Append the results to the test transcript log")
+    parser.add_argument("--commit-log", action="store_true",
+                        help="With --log, append to the committed data/transcripts.jsonl.gz instead")
+    args = parser.parse_args()
+
+    suites = ["simple", "essay"] if args.suite == "all" else [args.suite]
+    started = time.perf_counter()
+    results = run_suites(suites, args.workers, args.cassette_mode, use_cache=not args.no_cache)
+
+    for result in results:
+        if result.get("skipped"):
+            status = "⏭️ SKIPPED"
+        else:
+            status = "✅ CACHED" if result["cached"] else ("✅ PASSED" if result["passed"] else "❌ FAILED")
+        print(f"{status}: [{result['suite']}] {result['test_name']}")
+        for note in result.get("notes", []):
+            print(f"  Note: {note}")
+    failed = sum(1 for r in results if not r["passed"])
+    cached = sum(1 for r in results if r["cached"])
+    skipped = sum(1 for r in results if r.get("skipped"))
+    print(f"\n{len(results)} cases, {failed} failed, {cached} cached, {skipped} skipped, "
+          f"{time.perf_counter() - started:.2f}s")
+
+    if args.log:
+        from utils.transcript_log import records_from_dump
+
+        session = f"test-runner-{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        ran = [r for r in results if not r["cached"]]
+        log = harness_log(args.commit_log)
+        log.append(session, records_from_dump({"results": ran}), source="runner")
+        print(f"Results saved to {log.path} as {session}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@ Test script for the SimpleEssayAgent
 Simulates the essay engineering workflow with practice inputs and outputs
 """
 
-import json
+import argparse
 import sys
 import os
 from datetime import datetime
@@ -14,6 +14,8 @@ from typing import List, Dict, Any
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from agent.simple_essay_agent import SimpleEssayAgent
+from tests.runner import harness_log
+from utils.transcript_log import records_from_dump
 
 class SimpleAgentTester:
     def __init__(self):
@@ -100,71 +102,75 @@ class SimpleAgentTester:
             # Default response
             return "I understand. Please provide meaning blocks or a version to continue."
 
+# Test cases based on the essay engineering workflow
+TEST_CASES = [
+    {
+        "name": "Complete Essay Engineering Workflow",
+        "inputs": [
+            "There was a touch of paternal contempt in it, even toward people he liked.",
+            "(There was a touch of paternal contempt) (in it, even toward people he liked)",
+            "v1. it had a large piece evil sorrow, also about dogs and boys",
+            "v2. it even gave a major siren sound, and for women he hated",
+            "v3. it even had a little piece of monster man, also for acceptable girlfriends",
+            "v4. it even had a little bit of bossy professor, also for men and women he knew",
+            "v5. it even had a little bit of bossy anger, also for men and women he thought were good"
+        ],
+        "expected_behaviors": [
+            "analyze this sentence",
+            "meaning blocks",
+            "version 1",
+            "version 2", 
+            "version 3",
+            "version 4",
+            "version 5"
+        ]
+    },
+    {
+        "name": "Meaning Block Analysis Only",
+        "inputs": [
+            "The Mole had been working very hard all the morning, spring-cleaning his little home.",
+            "(The Mole had been working very hard) (all the morning) (spring-cleaning his little home)"
+        ],
+        "expected_behaviors": [
+            "analyze this sentence",
+            "meaning blocks"
+        ]
+    },
+    {
+        "name": "Version Creation Without Meaning Blocks",
+        "inputs": [
+            "Hello, I want to create a version",
+            "v1. this is my first attempt"
+        ],
+        "expected_behaviors": [
+            "analyze this sentence",
+            "version 1"
+        ]
+    },
+    {
+        "name": "Evaluation Request",
+        "inputs": [
+            "Please evaluate my work",
+            "v1. my reconstruction attempt",
+            "evaluate this version"
+        ],
+        "expected_behaviors": [
+            "analyze this sentence",
+            "version 1",
+            "making progress"
+        ]
+    }
+]
+
 def main():
+    parser = argparse.ArgumentParser(description="Run the SimpleEssayAgent test cases.")
+    parser.add_argument("--commit-log", action="store_true",
+                        help="Append the run to the committed data/transcripts.jsonl.gz instead of the test log")
+    args = parser.parse_args()
     tester = SimpleAgentTester()
     
-    # Test cases based on the essay engineering workflow
-    test_cases = [
-        {
-            "name": "Complete Essay Engineering Workflow",
-            "inputs": [
-                "There was a touch of paternal contempt in it, even toward people he liked.",
-                "(There was a touch of paternal contempt) (in it, even toward people he liked)",
-                "v1. it had a large piece evil sorrow, also about dogs and boys",
-                "v2. it even gave a major siren sound, and for women he hated",
-                "v3. it even had a little piece of monster man, also for acceptable girlfriends",
-                "v4. it even had a little bit of bossy professor, also for men and women he knew",
-                "v5. it even had a little bit of bossy anger, also for men and women he thought were good"
-            ],
-            "expected_behaviors": [
-                "analyze this sentence",
-                "meaning blocks",
-                "version 1",
-                "version 2", 
-                "version 3",
-                "version 4",
-                "version 5"
-            ]
-        },
-        {
-            "name": "Meaning Block Analysis Only",
-            "inputs": [
-                "The Mole had been working very hard all the morning, spring-cleaning his little home.",
-                "(The Mole had been working very hard) (all the morning) (spring-cleaning his little home)"
-            ],
-            "expected_behaviors": [
-                "analyze this sentence",
-                "meaning blocks"
-            ]
-        },
-        {
-            "name": "Version Creation Without Meaning Blocks",
-            "inputs": [
-                "Hello, I want to create a version",
-                "v1. this is my first attempt"
-            ],
-            "expected_behaviors": [
-                "analyze this sentence",
-                "version 1"
-            ]
-        },
-        {
-            "name": "Evaluation Request",
-            "inputs": [
-                "Please evaluate my work",
-                "v1. my reconstruction attempt",
-                "evaluate this version"
-            ],
-            "expected_behaviors": [
-                "analyze this sentence",
-                "version 1",
-                "making progress"
-            ]
-        }
-    ]
-    
     # Run all test cases
-    for test_case in test_cases:
+    for test_case in TEST_CASES:
         result = tester.run_test_case(
             test_case["name"],
             test_case["inputs"], 
@@ -172,30 +178,28 @@ def main():
         )
         tester.test_results.append(result)
     
-    # Save results to file
+    # Append results to the transcript log
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_file = f"test-data/simple-agent-test-{timestamp}.json"
-    
-    # Ensure test-data directory exists
-    os.makedirs("test-data", exist_ok=True)
-    
-    with open(output_file, 'w') as f:
-        json.dump({
-            "test_run": {
-                "timestamp": datetime.now().isoformat(),
-                "total_tests": len(tester.test_results),
-                "passed_tests": sum(1 for r in tester.test_results if r["passed"]),
-                "failed_tests": sum(1 for r in tester.test_results if not r["passed"])
-            },
-            "results": tester.test_results
-        }, f, indent=2)
+    session = f"simple-agent-test-{timestamp}"
+    run_data = {
+        "test_run": {
+            "timestamp": datetime.now().isoformat(),
+            "total_tests": len(tester.test_results),
+            "passed_tests": sum(1 for r in tester.test_results if r["passed"]),
+            "failed_tests": sum(1 for r in tester.test_results if not r["passed"])
+        },
+        "results": tester.test_results
+    }
+    log = harness_log(args.commit_log)
+    log.append(session, records_from_dump(run_data), source="simple_agent_test",
+               timestamp=run_data["test_run"]["timestamp"])
     
     # Print summary
     print(f"\n=== Test Summary ===")
     print(f"Total tests: {len(tester.test_results)}")
     print(f"Passed: {sum(1 for r in tester.test_results if r['passed'])}")
     print(f"Failed: {sum(1 for r in tester.test_results if not r['passed'])}")
-    print(f"Results saved to: {output_file}")
+    print(f"Results saved to: {log.path} (session {session})")
     
     # Print detailed results
     for result in tester.test_results:
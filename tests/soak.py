@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+In-process soak test of the API under parallel load.
+
+Drives the ASGI app through httpx's in-memory transport with many interleaved
+sessions for a set duration. Each session works through its own scripted
+conversation and sends the whole conversation with every turn, like a chat UI.
+Every reply and the final stored progress are checked against that session's
+own script, so a turn that reads or writes another session's state fails.
+RSS is sampled while the soak runs. The run fails when memory per session,
+stored state per session or tail latency goes past its limit, or when the
+p99 drifts upward between the first and the last time window.
+
+Usage:
+    python -m tests.soak [--duration 60] [--live 50] [--think 0.05]
+                         [--max-kb-per-session 32] [--max-p99-ms 500] [--max-p99-drift 3]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+# Versions written by every soak session after its sentence and meaning blocks
+SOAK_VERSIONS = 4
+
+@dataclass
+class SoakLimits:
+    """Thresholds a soak run must stay within."""
+    max_bytes_per_session: float = 32 * 1024  # RSS growth after warm-up, per session started
+    max_state_bytes: float = 4 * 1024  # Average stored state of a session
+    max_p99_ms: float = 500.0
+    max_p99_drift: float = 3.0  # p99 of the last window over p99 of the first
+    min_drift_ms: float = 50.0  # Smaller p99 increases are noise, whatever the ratio
+
+@dataclass
+class SoakReport:
+    """What a soak run measured."""
+    duration: float = 0.0
+    sessions_started: int = 0
+    sessions_finished: int = 0
+    turns: int = 0
+    errors: List[str] = field(default_factory=list)
+    isolation_failures: List[str] = field(default_factory=list)
+    rss_samples: List[Tuple[float, int, int]] = field(default_factory=list)  # (elapsed, rss bytes, sessions started)
+    latencies: List[Tuple[float, float]] = field(default_factory=list)  # (elapsed, seconds)
+    average_state_bytes: float = 0.0
+    warmup: float = 0.0
+    window: float = 5.0
+
+    def bytes_per_session(self) -> float:
+        """RSS growth per session started after warm-up."""
+        samples = [s for s in self.rss_samples if s[0] >= self.warmup] or self.rss_samples
+        if len(samples) < 2 or samples[-1][2] == samples[0][2]:
+            return 0.0
+        return max(samples[-1][1] - samples[0][1], 0) / (samples[-1][2] - samples[0][2])
+
+    def window_p99s(self) -> List[float]:
+        """p99 latency in seconds of each full time window after warm-up."""
+        windows: Dict[int, List[float]] = {}
+        for elapsed, latency in self.latencies:
+            if elapsed >= self.warmup:
+                windows.setdefault(int((elapsed - self.warmup) // self.window), []).append(latency)
+        full = int((self.duration - self.warmup) // self.window)
+        return [percentile(windows[i], 99) for i in sorted(windows) if i < max(full, 1)]
+
+    def p99(self) -> float:
+        return percentile([latency for _, latency in self.latencies], 99)
+
+    def failures(self, limits: SoakLimits) -> List[str]:
+        """Reasons the run fails the limits (empty if it passes)."""
+        failures = [f"error: {error}" for error in self.errors[:10]]
+        failures += [f"isolation: {failure}" for failure in self.isolation_failures[:10]]
+        if self.bytes_per_session() > limits.max_bytes_per_session:
+            failures.append(f"RSS grew {self.bytes_per_session():.0f} bytes per session "
+                            f"(limit {limits.max_bytes_per_session:.0f})")
+        if self.average_state_bytes > limits.max_state_bytes:
+            failures.append(f"stored state averages {self.average_state_bytes:.0f} bytes per session "
+                            f"(limit {limits.max_state_bytes:.0f})")
+        if self.p99() * 1000 > limits.max_p99_ms:
+            failures.append(f"p99 latency {self.p99() * 1000:.1f} ms (limit {limits.max_p99_ms:.0f})")
+        p99s = self.window_p99s()
+        if len(p99s) >= 2 and p99s[-1] > limits.max_p99_drift * p99s[0] \
+                and (p99s[-1] - p99s[0]) * 1000 > limits.min_drift_ms:
+            failures.append(f"p99 drifted from {p99s[0] * 1000:.1f} ms to {p99s[-1] * 1000:.1f} ms "
+                            f"(limit {limits.max_p99_drift:.1f}x)")
+        return failures
+
+    def summary(self) -> str:
+        rss_mb = [rss / 2 ** 20 for _, rss, _ in self.rss_samples]
+        return (f"{self.sessions_started} sessions ({self.sessions_finished} finished), {self.turns} turns "
+                f"in {self.duration:.1f}s; p50 {percentile([l for _, l in self.latencies], 50) * 1000:.1f} ms, "
+                f"p99 {self.p99() * 1000:.1f} ms, window p99s "
+                f"{', '.join(f'{p * 1000:.1f}' for p in self.window_p99s())} ms; "
+                f"RSS {rss_mb[0] if rss_mb else 0:.1f} -> {rss_mb[-1] if rss_mb else 0:.1f} MB, "
+                f"{self.bytes_per_session():.0f} bytes/session; state {self.average_state_bytes:.0f} bytes/session")
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+def session_script(number: int) -> List[Tuple[str, str]]:
+    """Turns of a soak session as (message, text expected in the reply)."""
+    sentence = f"Student {number} wrote that the old captain finally returned to his village."
+    script = [
+        (sentence, f"Let's analyze this sentence: '{sentence}'"),
+        (f"(Student {number} wrote that) (the old captain finally returned) (to his village.)",
+         "I see you've identified 3 blocks")
+    ]
+    for version in range(1, SOAK_VERSIONS + 1):
+        script.append((f"v{version}: Pupil {number} said the aged sailor came home at last, draft {version}",
+                       f"Thanks for version {version}."))
+    return script
+
+async def run_session(client: Any, number: int, report: SoakReport, started: float, think: float,
+                      stop_at: float):
+    """Work through one session's script and check it saw only its own state."""
+    session_id = f"soak-{number}"
+    conversation: List[Dict[str, str]] = []
+    for message, expected in session_script(number):
+        if time.monotonic() >= stop_at:
+            return
+        conversation.append({"role": "user", "content": message})
+        sent = time.monotonic()
+        response = await client.post("/chat", json={"session_id": session_id, "messages": conversation})
+        report.latencies.append((sent - started, time.monotonic() - sent))
+        report.turns += 1
+        if response.status_code != 200:
+            report.errors.append(f"{session_id}: {response.status_code} {response.text[:200]}")
+            return
+        body = response.json()
+        if body["session_id"] != session_id or expected not in body["response"]:
+            report.isolation_failures.append(f"{session_id}: expected {expected!r}, got {body['response'][:120]!r}")
+            return
+        conversation.append({"role": "assistant", "content": body["response"]})
+        await asyncio.sleep(random.uniform(0, 2 * think))
+
+    progress = (await client.get(f"/sessions/{session_id}/progress")).json()
+    sentences = progress.get("sentences", [])
+    if len(sentences) != 1 or f"Student {number} wrote" not in sentences[0]["text"] \
+            or sentences[0]["versions"] != SOAK_VERSIONS:
+        report.isolation_failures.append(f"{session_id}: stored progress {progress}")
+    report.sessions_finished += 1
+
+async def soak(app: Any, duration: float = 60.0, live: int = 50, think: float = 0.05,
+               warmup: Optional[float] = None, window: Optional[float] = None,
+               sample_interval: float = 0.5) -> SoakReport:
+    """
+    Run interleaved sessions against an ASGI app for `duration` seconds.
+
+    Args:
+        app: The ASGI app (run.app)
+        duration: Seconds to keep starting and running sessions
+        live: Sessions in progress at any time; a finished session is replaced by a new one
+        think: Mean pause in seconds between a reply and the session's next turn
+        warmup: Seconds excluded from the memory and drift measurements (default 20% of the run)
+        window: Length in seconds of the windows compared for latency drift (default half the measured run)
+        sample_interval: Seconds between RSS samples
+
+    Returns:
+        SoakReport: Turns, errors, isolation failures, latencies and RSS samples
+    """
+    import httpx
+    from utils.session_store import get_session_store
+
+    report = SoakReport(warmup=duration * 0.2 if warmup is None else warmup,
+                        window=(duration * 0.8) / 2 if window is None else window)
+    started = time.monotonic()
+    stop_at = started + duration
+    numbers = iter(range(1 << 62))
+
+    async def sample_rss():
+        while time.monotonic() < stop_at:
+            report.rss_samples.append((time.monotonic() - started, current_rss(), report.sessions_started))
+            await asyncio.sleep(sample_interval)
+
+    async def session_slot(client):
+        while time.monotonic() < stop_at:
+            report.sessions_started += 1
+            try:
+                await run_session(client, next(numbers), report, started, think, stop_at)
+            except Exception as e:
+                report.errors.append(f"{type(e).__name__}: {str(e)}")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://soak", timeout=60) as client:
+        await asyncio.gather(sample_rss(), *(session_slot(client) for _ in range(live)))
+    report.rss_samples.append((time.monotonic() - started, current_rss(), report.sessions_started))
+    report.duration = time.monotonic() - started
+    report.average_state_bytes = get_session_store().average_state_bytes()
+    return report
+
+def soak_admission():
+    """Admission control for a soak: queue everything, limit only concurrency, never rate limit."""
+    from utils.rate_limit import AdmissionController
+
+    return AdmissionController(max_concurrent=int(os.getenv("ESSAY_MAX_CONCURRENT", "32")), max_queue=1 << 20,
+                               queue_timeout=60, global_rate=1e9, global_burst=1e9,
+                               session_rate=1e9, session_burst=1e9)
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak the API in-process with interleaved sessions.")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds to run")
+    parser.add_argument("--live", type=int, default=50, help="Sessions in progress at any time")
+    parser.add_argument("--think", type=float, default=0.05, help="Mean seconds between a reply and the next turn")
+    parser.add_argument("--max-kb-per-session", type=float, default=SoakLimits.max_bytes_per_session / 1024,
+                        help="Most RSS growth per session started after warm-up")
+    parser.add_argument("--max-state-kb", type=float, default=SoakLimits.max_state_bytes / 1024)
+    parser.add_argument("--max-p99-ms", type=float, default=SoakLimits.max_p99_ms)
+    parser.add_argument("--max-p99-drift", type=float, default=SoakLimits.max_p99_drift)
+    args = parser.parse_args()
+
+    # Keep the soak's sessions, profiles and version log out of the real data
+    data_dir = tempfile.TemporaryDirectory()
+    os.environ["ESSAY_SESSION_DB"] = os.path.join(data_dir.name, "sessions.sqlite3")
+    os.environ["ESSAY_TRAJECTORY_LOG"] = os.path.join(data_dir.name, "trajectories.bin")
+    import run
+    run.admission = soak_admission()
+
+    report = asyncio.run(soak(run.app, args.duration, args.live, args.think))
+    print(report.summary())
+    failures = report.failures(SoakLimits(args.max_kb_per_session * 1024, args.max_state_kb * 1024,
+                                          args.max_p99_ms, args.max_p99_drift))
+    for failure in failures:
+        print(f"FAILED {failure}")
+    data_dir.cleanup()
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
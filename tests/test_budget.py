@@ -0,0 +1,73 @@
+import os
+import sys
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.budget import BudgetLimits, BudgetManager, llm_cost
+from agent.essay_agent import EssayAgent
+from agent.skill_model import SkillStore
+from utils.metrics import REGISTRY
+
+def make_manager(tmp_path, **limits):
+    return BudgetManager(str(tmp_path / "sessions.sqlite3"),
+                         session_limits=BudgetLimits(**limits.get("session", {"tokens": 1000})),
+                         tenant_limits=BudgetLimits(**limits.get("tenant", {"tokens": 1500})),
+                         soft_limit=0.8, small_model="gpt-4.1-nano")
+
+def test_sessions_and_tenants_downgrade_as_budgets_run_out(tmp_path):
+    manager = make_manager(tmp_path)
+    assert manager.plan("s1", "school-1", "gpt-4.1-mini").model == "gpt-4.1-mini"
+
+    manager.record("s1", "school-1", "gpt-4.1-mini", prompt_tokens=700, completion_tokens=100, seconds=1.5)
+    plan = manager.plan("s1", "school-1", "gpt-4.1-mini")
+    assert (plan.tier, plan.model) == ("small", "gpt-4.1-nano")
+    manager.record("s1", "school-1", "gpt-4.1-nano", prompt_tokens=200, completion_tokens=0)
+    assert not manager.plan("s1", "school-1", "gpt-4.1-mini").allows_llm
+
+    # Another session of the same school shares the tenant budget (1000 of 1500 tokens used)
+    assert manager.plan("s2", "school-1", "gpt-4.1-mini").tier == "full"
+    manager.record("s2", "school-1", "gpt-4.1-mini", prompt_tokens=300)
+    assert manager.plan("s2", "school-1", "gpt-4.1-mini").tier == "small"
+    assert manager.plan("s2", "school-2", "gpt-4.1-mini").tier == "full"
+
+    report = manager.report("s1", "school-1")
+    assert report["tier"] == "cached" and report["session"]["calls"] == 2
+    assert report["session"]["tokens"] == 1000 and report["tenant"]["tokens"] == 1300
+    assert abs(report["session"]["cost"] - llm_cost("gpt-4.1-mini", 700, 100) - llm_cost("gpt-4.1-nano", 200, 0)) < 1e-12
+    assert 'essay_tenant_llm_tokens_total{tenant="school-1"}' in REGISTRY.render()
+
+    # Tenant budgets start over with each window
+    manager.tenant_window = 1e-6
+    assert manager.usage("tenant", "school-1").tokens == 0
+
+class FakeLLM:
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+
+    def invoke(self, messages):
+        from langchain_core.messages import AIMessage
+
+        self.calls += 1
+        return AIMessage(content=f"{self.name} answer {self.calls}",
+                         usage_metadata={"input_tokens": 400, "output_tokens": 50, "total_tokens": 450})
+
+def test_agent_falls_back_to_smaller_model_then_cached_answers(tmp_path):
+    agent = EssayAgent()
+    agent.llm, agent.small_llm = FakeLLM("full"), FakeLLM("small")
+    agent.budget = make_manager(tmp_path, session={"tokens": 500}, tenant={})
+    agent.skill_store = SkillStore(str(tmp_path / "sessions.sqlite3"))
+    turns = [{"role": "user", "content": 'Let\'s work on "He had to leave it."'}, {"role": "assistant", "content": "Sure."}]
+
+    def ask(question):
+        return "".join(agent.get_response(turns + [{"role": "user", "content": question}],
+                                          session_id="dana", tenant_id="school-1")).strip()
+
+    assert ask("Why does the order of ideas matter?") == "full answer 1"
+    assert ask("Why does the order of ideas matter?") == "small answer 1"
+    assert agent.budget.usage("session", "dana").tokens == 900
+    # Out of budget: the same question gets the last answer, a new one the rule-based hints
+    assert ask("Why does the order of ideas matter?") == "small answer 1"
+    assert ask("Is a name a repeated word?").startswith("When looking for meaning blocks")
+    assert (agent.llm.calls, agent.small_llm.calls) == (1, 1)
@@ -0,0 +1,68 @@
+import asyncio
+import json
+import os
+import sys
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import run
+import utils.session_store as session_store
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_store, "_store", session_store.SessionStore(str(tmp_path / "sessions.sqlite3")))
+    with TestClient(run.app) as test_client:
+        yield test_client
+
+def test_batch_streams_results_in_completion_order(client, monkeypatch):
+    route_turn = run._route_turn
+
+    def slow_route(agent, messages, session_id=None):
+        if messages[-1].content.startswith("Slow"):
+            time.sleep(0.5)
+        return route_turn(agent, messages, session_id)
+    monkeypatch.setattr(run, "_route_turn", slow_route)
+
+    items = [
+        {"session_id": "slow", "messages": [{"role": "user", "content": "Slow students take their time."}]},
+        {"session_id": "ann", "messages": [{"role": "user", "content": "He had to leave it."}]},
+        {"session_id": "ann", "messages": [{"role": "user", "content": "(He had to) (leave it)"}]},
+        {"session_id": "empty", "messages": []}
+    ]
+    response = client.post("/chat/batch", json={"items": items})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    results = [json.loads(line) for line in response.text.splitlines()]
+
+    assert sorted(r["index"] for r in results) == [0, 1, 2, 3]
+    assert results[-1]["index"] == 0 and results[-1]["status"] == 200
+    by_index = {r["index"]: r for r in results}
+    assert by_index[3]["status"] == 422
+    # Turns of one session apply in order
+    assert [by_index[1]["branch"], by_index[2]["branch"]] == ["new_sentence", "meaning_blocks"]
+    assert [r["index"] for r in results if r["session_id"] == "ann"] == [1, 2]
+
+def test_batch_size_is_capped(client, monkeypatch):
+    monkeypatch.setattr(run, "BATCH_MAX_ITEMS", 1)
+    item = {"session_id": "a", "messages": [{"role": "user", "content": "He had to leave it."}]}
+    assert client.post("/chat/batch", json={"items": [item, item]}).status_code == 413
+
+def test_version_attempts_are_recorded_off_the_event_loop(client, monkeypatch):
+    recorded = []
+
+    def record_attempt(session_id, sentence, version, reconstruction):
+        try:
+            asyncio.get_running_loop()
+            recorded.append("event loop")
+        except RuntimeError:
+            recorded.append("thread")
+    monkeypatch.setattr(run, "_record_attempt", record_attempt)
+
+    turns = ["He had to leave it.", "(He had to) (leave it)", "v1: She must depart."]
+    for content in turns:
+        client.post("/chat", json={"session_id": "ann", "messages": [{"role": "user", "content": content}]})
+    assert recorded == ["thread"]
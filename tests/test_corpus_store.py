@@ -0,0 +1,64 @@
+import os
+import sys
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.corpus_store import CorpusStore, build_corpus
+
+DOCUMENTS = {
+    "bovary": ["Charles était là. Il ne disait rien.\nLa nuit tombait.", "Emma rêvait. Elle attendait!"],
+    "gatsby": ["In my younger and more vulnerable years my father gave me some advice."]
+}
+
+def test_units_slice_back_to_their_text(tmp_path):
+    manifest = build_corpus(DOCUMENTS, str(tmp_path))
+    assert manifest["units"]["page"]["count"] == 3
+    store = CorpusStore(str(tmp_path))
+    try:
+        sentences = [str(view, "utf-8") for _, view in store.iter_units("sentence")]
+        assert sentences == ["Charles était là.", "Il ne disait rien.", "La nuit tombait.", "Emma rêvait.",
+                             "Elle attendait!", DOCUMENTS["gatsby"][0]]
+        assert store.text(*store.span("page", 1)) == DOCUMENTS["bovary"][1]
+        assert store.text(*store.span("paragraph", 1)) == "La nuit tombait."
+
+        view = store.unit("sentence", 3)
+        assert isinstance(view, memoryview) and view.readonly
+        assert store.document_at(store.span("sentence", 5)[0]) == "gatsby"
+        assert str(store.document("bovary"), "utf-8") == "\n".join(DOCUMENTS["bovary"])
+        view.release()
+    finally:
+        store.close()
+
+def test_rebuild_swaps_in_a_complete_store(tmp_path):
+    build_corpus(DOCUMENTS, str(tmp_path))
+    build_corpus({"short": ["One sentence only."]}, str(tmp_path))
+    assert sorted(os.listdir(tmp_path)) == ["corpus.json", "corpus.offsets", "corpus.txt"]
+    store = CorpusStore(str(tmp_path))
+    assert store.documents == ["short"]
+    assert store.count("sentence") == 1
+    store.close()
+
+def test_replaced_store_is_closed_after_its_grace_period(tmp_path, monkeypatch):
+    import agent.corpus_store as corpus_store
+
+    root = str(tmp_path / "corpus")
+    monkeypatch.setattr(corpus_store, "CORPUS_DIR", root)
+    monkeypatch.setattr(corpus_store, "RELOAD_CHECK_SECONDS", 0)
+    monkeypatch.setattr(corpus_store, "RETIRE_AFTER_SECONDS", 0)
+    monkeypatch.setattr(corpus_store, "_default_store", None)
+    monkeypatch.setattr(corpus_store, "_retired", [])
+
+    corpus_store.publish_corpus(DOCUMENTS, root)
+    first = corpus_store.get_corpus_store()
+    view = first.unit("sentence", 0)
+    corpus_store.publish_corpus({"short": ["One sentence only."]}, root)
+    second = corpus_store.get_corpus_store()
+    assert second is not first and second.documents == ["short"]
+
+    # A view still in use keeps the replaced store open
+    assert not first._text_file.closed and bytes(view) == b"Charles \xc3\xa9tait l\xc3\xa0."
+    view.release()
+    assert corpus_store.get_corpus_store() is second
+    assert first._text_file.closed and corpus_store._retired == []
+    second.close()
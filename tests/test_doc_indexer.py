@@ -0,0 +1,82 @@
+import os
+import sys
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import agent.corpus_store as corpus_store
+import utils.pdf_utils as pdf_utils
+from agent.corpus_store import CorpusStore, current_corpus_dir
+from agent.doc_indexer import DocIndexer
+from agent.sentence_index import SentenceIndex
+
+def fake_pdfs(monkeypatch, extracted, calls=None):
+    """Read 'PDFs' as text files with pages separated by form feeds, counting extractions."""
+    def iter_pages(paths, workers=None):
+        if calls is not None:
+            calls.append(list(paths))
+        for path in paths:
+            extracted.append(os.path.basename(path))
+            with open(path) as f:
+                for i, text in enumerate(f.read().split("\f")):
+                    yield pdf_utils.PageText(path, i, text)
+    monkeypatch.setattr(pdf_utils, "iter_pages", iter_pages)
+
+def write(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+def test_sync_extracts_only_what_changed(tmp_path, monkeypatch):
+    extracted, calls = [], []
+    fake_pdfs(monkeypatch, extracted, calls)
+    docs, corpus, index_path = tmp_path / "docs", str(tmp_path / "corpus"), str(tmp_path / "index.jsonl")
+    docs.mkdir()
+    write(docs / "rubric.pdf", "Meaning blocks come first.\fThen write versions.")
+    write(docs / "rules.pdf", "Do not repeat any words.")
+    indexer = DocIndexer(str(docs), corpus, index_path)
+
+    first = indexer.sync()
+    assert first.added == ["rubric.pdf", "rules.pdf"] and sorted(extracted) == ["rubric.pdf", "rules.pdf"]
+    # Every new file goes through one process pool
+    assert len(calls) == 1
+    old_store = CorpusStore(current_corpus_dir(corpus))
+
+    extracted.clear()
+    write(docs / "rules.pdf", "Names may be repeated.")
+    write(docs / "gatsby.pdf", "In my younger and more vulnerable years my father gave me some advice.")
+    os.remove(docs / "rubric.pdf")
+    second = indexer.sync()
+    assert (second.added, second.changed, second.removed) == (["gatsby.pdf"], ["rules.pdf"], ["rubric.pdf"])
+    assert sorted(extracted) == ["gatsby.pdf", "rules.pdf"] and second.extracted == ["gatsby.pdf", "rules.pdf"]
+
+    # A worker that mapped the previous generation keeps reading it
+    assert old_store.text(*old_store.span("page", 1)) == "Then write versions."
+    old_store.close()
+    store = CorpusStore(current_corpus_dir(corpus))
+    assert store.documents == ["gatsby", "rules"]
+    store.close()
+    index = SentenceIndex()
+    index.load(index_path)
+    assert index.lookup("Names may be repeated.") is not None
+    assert index.lookup("Meaning blocks come first.") is None
+
+    extracted.clear()
+    third = indexer.sync()
+    assert not third.modified and third.generation is None and extracted == []
+
+def test_live_store_switches_to_new_generation(tmp_path, monkeypatch):
+    extracted = []
+    fake_pdfs(monkeypatch, extracted)
+    docs, corpus = tmp_path / "docs", str(tmp_path / "corpus")
+    docs.mkdir()
+    write(docs / "rules.pdf", "Do not repeat any words.")
+    monkeypatch.setattr(corpus_store, "CORPUS_DIR", corpus)
+    monkeypatch.setattr(corpus_store, "RELOAD_CHECK_SECONDS", 0)
+    monkeypatch.setattr(corpus_store, "_default_store", None)
+    indexer = DocIndexer(str(docs), corpus, str(tmp_path / "index.jsonl"))
+
+    indexer.sync()
+    assert corpus_store.get_corpus_store().documents == ["rules"]
+    write(docs / "versions.pdf", "Number every version.")
+    indexer.sync()
+    assert corpus_store.get_corpus_store().documents == ["rules", "versions"]
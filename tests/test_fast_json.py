@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import run
+import utils.session_store as session_store
+from utils import fast_json
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_store, "_store", session_store.SessionStore(str(tmp_path / "sessions.sqlite3")))
+    with TestClient(run.app) as test_client:
+        yield test_client
+
+def test_dumps_matches_standard_json():
+    state = {"current_sentence": "Emma rêvait — “toujours”.", "versions": ["v1. …"], "n": 3}
+    assert fast_json.loads(fast_json.dumps(state)) == state
+    assert fast_json.dumps_str(state).startswith('{"current_sentence":"Emma rêvait')
+
+def test_requests_parse_with_orjson_and_large_responses_are_compressed(client):
+    paragraph = " ".join(f"Sentence number {i} is about a long walk." for i in range(60))
+    reply = client.post("/chat", json={"session_id": "c", "messages": [{"role": "user", "content": paragraph}]},
+                        headers={"Accept-Encoding": "gzip"})
+    assert reply.status_code == 200 and reply.json()["session_id"] == "c"
+    assert "content-encoding" not in reply.headers
+
+    progress = client.get("/sessions/c/progress", headers={"Accept-Encoding": "gzip"})
+    assert progress.headers["content-encoding"] == "gzip"
+    assert progress.json()["total"] == 60
+
+    invalid = client.post("/chat", content=b'{"messages": [', headers={"Content-Type": "application/json"})
+    assert invalid.status_code == 422 and invalid.json()["detail"][0]["type"] == "json_invalid"
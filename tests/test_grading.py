@@ -0,0 +1,62 @@
+import os
+import sys
+
+import pytest
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.grading import (
+    LABELS, LLMGrader, RuleGrader, VectorGrader, evaluate_grader, independent_items, load_golden_set
+)
+from agent.reference_bank import load_reference_entries
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+@pytest.fixture(scope="module")
+def entries():
+    return load_reference_entries(os.path.join(DATA_DIR, "reference_answers.json"),
+                                  os.path.join(DATA_DIR, "practice_sentences.json"))
+
+@pytest.fixture(scope="module")
+def golden():
+    return load_golden_set(os.path.join(DATA_DIR, "golden_grading.jsonl"))
+
+def test_golden_set_is_well_formed(golden):
+    assert len({item["id"] for item in golden}) == len(golden)
+    assert {item["label"] for item in golden} == set(LABELS)
+    assert {item["task"] for item in golden} == {"blocks", "reconstruction"}
+
+def test_golden_set_is_independent_of_the_reference_answers(entries, golden):
+    assert independent_items(golden, entries) == golden
+    copied = dict(golden[0], input=f"v1. {entries[0].reconstructions[-1]['text']}", sentence=entries[0].text)
+    assert independent_items([copied], entries) == []
+
+def test_local_backends_meet_agreement_floor(entries, golden):
+    for grader in (RuleGrader(entries), VectorGrader(entries)):
+        report = evaluate_grader(grader, golden, concurrency=4, repeat=2)
+        assert report["errors"] == 0
+        assert report["agreement"] >= 0.75, report["disagreements"]
+        assert report["cost_per_item"] == 0.0
+        assert 0 < report["p50_ms"] <= report["p95_ms"]
+
+def test_repeated_words_make_a_reconstruction_wrong(entries, golden):
+    grader = RuleGrader(entries)
+    item = next(item for item in golden if item["id"] == "gatsby-v4")
+    assert grader.grade(item).label == "wrong"
+
+class FakeLLM:
+    """Returns a fixed verdict with token usage, like a chat model reply."""
+
+    def invoke(self, prompt):
+        from langchain_core.messages import AIMessage
+
+        return AIMessage(content='{"label": "wrong", "accuracy": 10}',
+                         usage_metadata={"input_tokens": 1000, "output_tokens": 20, "total_tokens": 1020})
+
+def test_llm_backend_reports_cost(golden):
+    report = evaluate_grader(LLMGrader("gpt-4.1-mini", llm=FakeLLM()), golden, concurrency=4)
+    wrong = sum(1 for item in golden if item["label"] == "wrong")
+    assert report["agreement"] == pytest.approx(wrong / len(golden))
+    assert report["tokens_per_item"] == 1020
+    assert report["cost_per_item"] == pytest.approx((1000 * 0.40 + 20 * 1.60) / 1_000_000)
@@ -0,0 +1,62 @@
+import os
+import sys
+
+import pytest
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.intent_router import classify_intent
+
+@pytest.mark.parametrize("message, expected", [
+    ("There was a touch of paternal contempt in it, even toward people he liked.", "new_sentence"),
+    ("(There was a touch of paternal contempt) (in it, even toward people he liked)", "meaning_blocks"),
+    ('("There was a touch) (of paternal contempt) (in it, even toward people he liked.)"', "meaning_blocks"),
+    ("v1. it had a large piece evil sorrow, also about dogs and boys", "version"),
+    ("v2: it even gave a major siren sound, and for women he hated", "version"),
+    ("V3 it even had a little piece of monster man (and more)", "version"),
+    ("evaluate this version", "evaluate"),
+    ("How accurate is my v2?", "evaluate"),
+    ("I don't know", "unsure"),
+    ("No, I have never used it", "unsure"),
+    ("Can I get a hint?", "hint"),
+    ("What are meaning blocks?", "hint"),
+    ("Next sentence, please", "next_sentence"),
+    ("I'm happy with v3, let's move on", "next_sentence"),
+    ("Hello, I want to create a version", "new_sentence"),
+])
+def test_classifies_recorded_turns(message, expected):
+    assert classify_intent(message).name == expected
+
+@pytest.mark.parametrize("sentence", [
+    "He could not help but smile at the thought of it, even then.",
+    "She gave the grade of the road a long look before she started up it.",
+    "The Rat tried to explain, but the Mole was not sure what he meant.",
+    "It was the first time anyone had asked him for an example of courage.",
+    "They had to move on before the river rose over the meadow.",
+])
+def test_literary_sentences_with_keywords_are_new_sentences(sentence):
+    intent = classify_intent(sentence)
+    assert intent.name == "new_sentence"
+    assert intent.confidence == 0.6
+
+@pytest.mark.parametrize("message, expected", [
+    ("I don't know how to do this.", "unsure"),
+    ("I need some help with this sentence.", "hint"),
+    ("Please evaluate my last version for accuracy.", "evaluate"),
+    ("I would like to move on to the next sentence.", "next_sentence"),
+    ("(The Mole had been working very hard all the morning, spring-cleaning his little home.)", "meaning_blocks"),
+])
+def test_requests_phrased_as_sentences_are_not_new_sentences(message, expected):
+    assert classify_intent(message).name == expected
+
+def test_digits_alone_do_not_mean_reconstruction():
+    intent = classify_intent("The Mole worked for 3 hours in his little home.")
+    assert intent.name == "new_sentence"
+    assert intent.scores["version"] == 0.0
+
+def test_confidence_reflects_strength_of_evidence():
+    two_blocks = classify_intent("(a touch of contempt) (even toward friends)")
+    one_block = classify_intent("(a touch of contempt, even toward friends)")
+    assert one_block.name == "meaning_blocks"
+    assert two_blocks.confidence > one_block.confidence
@@ -0,0 +1,92 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.final_summary import FINAL_QUESTIONS, summary_inputs, summary_key, write_final_summary
+from agent.simple_essay_agent import SimpleEssayAgent
+from utils.jobs import JobManager, JobQueueFull, JobStore
+
+GATSBY = "There was a touch of paternal contempt in it, even toward people he liked."
+
+def wait_for(manager: JobManager, job_id: str, timeout: float = 5.0):
+    deadline = time.time() + timeout
+    job = manager.get(job_id)
+    while job["status"] in ("queued", "running") and time.time() < deadline:
+        time.sleep(0.01)
+        job = manager.get(job_id)
+    return job
+
+@pytest.fixture
+def manager(tmp_path):
+    job_manager = JobManager(JobStore(str(tmp_path / "jobs.sqlite3")), max_workers=1, max_pending=2)
+    yield job_manager
+    job_manager.shutdown()
+
+def test_final_summary_job_is_cached_by_input(manager):
+    agent = SimpleEssayAgent()
+    agent.current_sentence = GATSBY
+    agent.create_version(1, "His tone sounded somewhat unfriendly.")
+    agent.create_version(2, "His manner carried some fatherly scorn, showing up also with those this man found likeable.")
+    sentences = summary_inputs(agent.to_dict())
+
+    job = manager.submit("final_summary", summary_key(sentences), write_final_summary, sentences)
+    done = wait_for(manager, job["job_id"])
+    assert done["status"] == "done" and done["progress"] == 1.0
+    summary = done["result"]["summary"]
+    assert "v1. His tone sounded somewhat unfriendly.\nv2. His manner" in summary
+    assert summary.endswith(FINAL_QUESTIONS)
+
+    again = manager.submit("final_summary", summary_key(sentences), write_final_summary, sentences)
+    assert again["job_id"] == job["job_id"]
+
+def test_cancel_stops_a_running_job_and_pool_is_bounded(manager):
+    started, release = threading.Event(), threading.Event()
+
+    def slow(job):
+        job.report(0.1, "started")
+        started.set()
+        release.wait(5)
+        job.report(0.5, "halfway")
+        return {"finished": True}
+
+    running = manager.submit("slow", "a", slow)
+    started.wait(5)
+    queued = manager.submit("slow", "b", slow)
+    with pytest.raises(JobQueueFull):
+        manager.submit("slow", "c", slow)
+
+    assert manager.cancel(queued["job_id"])["status"] == "cancelled"
+    manager.cancel(running["job_id"])
+    release.set()
+    assert wait_for(manager, running["job_id"])["status"] == "cancelled"
+    assert manager.cancel("missing") is None
+
+def test_jobs_of_stopped_workers_are_not_reused(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    # A worker that crashed left its job queued
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    orphan = store.create("slow", "a")
+    store._connect().execute("UPDATE jobs SET owner_pid = ? WHERE job_id = ?", (dead.pid, orphan["job_id"]))
+
+    manager = JobManager(store, max_workers=1)
+    job = manager.submit("slow", "a", lambda job: {"finished": True})
+    assert job["job_id"] != orphan["job_id"]
+    assert store.get(orphan["job_id"])["status"] == "failed"
+    assert wait_for(manager, job["job_id"])["status"] == "done"
+
+    # A worker that shuts down fails what it leaves behind
+    release = threading.Event()
+    manager.submit("slow", "b", lambda job: release.wait(5) and {})
+    queued = manager.submit("slow", "c", lambda job: {})
+    manager.shutdown()
+    release.set()
+    assert store.get(queued["job_id"])["status"] == "failed"
+    assert manager.store.find_reusable("slow", "c") is None
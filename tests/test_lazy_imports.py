@@ -0,0 +1,25 @@
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_PREFIXES = ("langchain", "langgraph", "openai", "dotenv", "PyPDF2", "uvicorn")
+
+def _loaded_heavy_modules(statement: str):
+    """Run an import statement in a fresh interpreter and list the heavy modules it loaded."""
+    code = (
+        f"{statement}\n"
+        "import sys\n"
+        f"print(','.join(sorted(m for m in sys.modules if m.startswith({HEAVY_PREFIXES!r}))))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return [m for m in result.stdout.strip().split(",") if m]
+
+def test_core_modules_import_without_llm_libraries():
+    assert _loaded_heavy_modules("import agent") == []
+    assert _loaded_heavy_modules("from agent import SimpleEssayAgent") == []
+    assert _loaded_heavy_modules("import agent.essay_agent") == []
+    assert _loaded_heavy_modules("import utils.prompt_utils") == []
+    assert _loaded_heavy_modules("import run") == []
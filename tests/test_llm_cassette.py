@@ -0,0 +1,62 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from utils.llm_cassette import CassetteLLM, CassetteMissError
+
+class FakeLLM:
+    """Chat model stand-in that counts its calls."""
+    model_name = "fake-model"
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        return HumanMessage(content=f"answer {self.calls}")
+
+    async def ainvoke(self, prompt):
+        return self.invoke(prompt)
+
+def test_record_then_replay(tmp_path):
+    path = str(tmp_path / "cassette.json")
+    live = FakeLLM()
+    recorder = CassetteLLM(live, path, mode="auto")
+    prompt = [SystemMessage(content="Be brief."), HumanMessage(content="Hello")]
+    assert recorder.invoke(prompt).content == "answer 1"
+    assert recorder.invoke(prompt).content == "answer 1"
+    assert live.calls == 1
+    recorder.save()
+
+    # Replay needs no live model; equivalent prompt shapes share a key
+    replayer = CassetteLLM(None, path, mode="replay", model="fake-model")
+    assert replayer.invoke([("system", "Be brief."), {"role": "human", "content": "Hello"}]).content == "answer 1"
+    assert asyncio.run(replayer.ainvoke(prompt)).content == "answer 1"
+    with pytest.raises(CassetteMissError):
+        replayer.invoke("Something else")
+
+def test_record_mode_refreshes_entries(tmp_path):
+    path = str(tmp_path / "cassette.json")
+    live = FakeLLM()
+    CassetteLLM(live, path, mode="auto").invoke("Hi")
+    recorder = CassetteLLM(live, path, mode="record")
+    assert recorder.invoke("Hi").content == "answer 2"
+    recorder.save()
+    assert CassetteLLM(None, path, model="fake-model").invoke("Hi").content == "answer 2"
+
+def test_runner_skips_unchanged_passing_cases(tmp_path):
+    from tests.runner import run_suites
+
+    cache_path = str(tmp_path / "results.json")
+    first = run_suites(["simple"], workers=1, cache_path=cache_path)
+    assert not any(result["cached"] for result in first)
+    second = run_suites(["simple"], workers=1, cache_path=cache_path)
+    passed = {r["test_name"] for r in first if r["passed"]}
+    assert {r["test_name"] for r in second if r["cached"]} == passed
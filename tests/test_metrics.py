@@ -0,0 +1,34 @@
+import os
+import sys
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.metrics import Registry
+
+def test_render_prometheus_text_format():
+    registry = Registry()
+    requests = registry.counter("demo_requests_total", "Requests", ["branch"])
+    latency = registry.histogram("demo_latency_seconds", "Latency", ["branch"], buckets=(0.1, 1.0))
+    registry.gauge("demo_sessions", "Sessions", callback=lambda: 3)
+
+    requests.inc(branch="version")
+    requests.inc(2, branch="version")
+    latency.observe(0.05, branch="version")
+    latency.observe(0.5, branch="version")
+    latency.observe(5, branch="version")
+
+    text = registry.render()
+    assert "# TYPE demo_requests_total counter" in text
+    assert 'demo_requests_total{branch="version"} 3' in text
+    assert 'demo_latency_seconds_bucket{branch="version",le="0.1"} 1' in text
+    assert 'demo_latency_seconds_bucket{branch="version",le="1"} 2' in text
+    assert 'demo_latency_seconds_bucket{branch="version",le="+Inf"} 3' in text
+    assert 'demo_latency_seconds_count{branch="version"} 3' in text
+    assert "demo_sessions 3" in text
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    counter = registry.counter("demo_total", "Demo", ["cache"])
+    counter.inc(cache='a"b')
+    assert 'demo_total{cache="a\\"b"} 1' in registry.render()
@@ -0,0 +1,17 @@
+import json
+import os
+import sys
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import run
+
+SWAGGER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "swagger.json")
+
+def test_swagger_json_matches_the_app():
+    with open(SWAGGER_PATH) as f:
+        committed = json.load(f)
+    # Regenerate with: python run.py --openapi swagger.json
+    assert committed == json.loads(json.dumps(run.openapi_spec()))
+    assert "session_id" in committed["components"]["schemas"]["ChatRequest"]["properties"]
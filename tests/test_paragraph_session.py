@@ -0,0 +1,71 @@
+import os
+import sys
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.paragraph_session import GENERIC_HINTS, ParagraphSession, SentencePreparer
+from agent.reference_bank import ReferenceBank, build_reference_bank
+from agent.simple_essay_agent import SimpleEssayAgent
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+MOLE = "The Mole had been working very hard all the morning, spring-cleaning his little home."
+GATSBY = "There was a touch of paternal contempt in it, even toward people he liked."
+PARAGRAPH = f"{MOLE} He had to leave it. {GATSBY}"
+
+def test_paragraph_progress_round_trips_with_agent_state():
+    agent = SimpleEssayAgent()
+    agent.paragraph = ParagraphSession.from_text(PARAGRAPH)
+    assert [s.text for s in agent.paragraph.sentences] == [MOLE, "He had to leave it.", GATSBY]
+    agent.paragraph.record_blocks([MOLE])
+    agent.paragraph.record_version("v1. The Mole was busy.")
+    assert agent.paragraph.advance().text == "He had to leave it."
+    assert agent.paragraph.upcoming(2) == [GATSBY]
+
+    restored = SimpleEssayAgent.from_dict(agent.to_dict())
+    progress = restored.paragraph.progress()
+    assert progress["current"] == 1 and progress["completed"] == 1
+    assert [s["status"] for s in progress["sentences"]] == ["done", "pending", "pending"]
+    assert progress["sentences"][0]["versions"] == 1
+
+def test_preparer_prefetches_in_background(tmp_path):
+    path = str(tmp_path / "reference_bank.sqlite3")
+    build_reference_bank(path, os.path.join(DATA_DIR, "reference_answers.json"),
+                         os.path.join(DATA_DIR, "practice_sentences.json"))
+    bank = ReferenceBank(path)
+    preparer = SentencePreparer(max_workers=2, bank=bank)
+    try:
+        preparer.prefetch([GATSBY, "He had to leave it."])
+        preparation = preparer.get(GATSBY, timeout=5)
+        assert preparation.source == "reference"
+        assert preparation.meaning_blocks == [GATSBY]
+        assert preparation.hints[0].startswith("How strong")
+        assert preparer.get("He had to leave it.", timeout=5).hints == GENERIC_HINTS
+    finally:
+        preparer.shutdown()
+        bank.close()
+
+def test_chat_turns_walk_through_a_paragraph():
+    from run import Message, _route_turn
+
+    agent = SimpleEssayAgent()
+    branch, response = _route_turn(agent, [Message(role="user", content=PARAGRAPH)])
+    assert branch == "paragraph"
+    assert "Sentence 1 of 3" in response
+    assert agent.current_sentence == MOLE
+
+    branch, response = _route_turn(agent, [Message(role="user", content=f"My meaning blocks: ({MOLE})")])
+    assert branch == "meaning_blocks"
+    assert response.startswith("That matches the reference division")
+    assert agent.current_sentence == MOLE
+
+    _route_turn(agent, [Message(role="user", content="v1. The Mole was busy tidying.")])
+    branch, response = _route_turn(agent, [Message(role="user", content="next sentence")])
+    assert branch == "next_sentence"
+    assert "Sentence 2 of 3" in response
+    assert agent.versions == [] and agent.current_sentence == "He had to leave it."
+
+    _route_turn(agent, [Message(role="user", content="next sentence")])
+    branch, response = _route_turn(agent, [Message(role="user", content="move on")])
+    assert "all 3 sentences" in response
+    assert agent.paragraph.progress()["completed"] == 3
@@ -0,0 +1,37 @@
+import os
+import sys
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.pdf_utils as pdf_utils
+from utils.pdf_utils import extract_pdf_pages, iter_pdf_pages
+
+RULES_PDF = os.path.join("docs", "Rule, meaning blocks (may 20).pdf")
+
+def test_parallel_pages_arrive_in_order():
+    serial = [page.text for page in iter_pdf_pages(RULES_PDF, workers=1)]
+    parallel = list(iter_pdf_pages(RULES_PDF, workers=2, chunk_size=3))
+    assert [page.page for page in parallel] == list(range(len(serial)))
+    assert [page.text for page in parallel] == serial
+    assert all(page.error is None for page in parallel)
+
+def test_failed_page_does_not_drop_the_document(monkeypatch, tmp_path):
+    page_text = pdf_utils._page_text
+    calls = []
+    def flaky(page):
+        calls.append(page)
+        if len(calls) == 2:
+            raise ValueError("bad content stream")
+        return page_text(page)
+    monkeypatch.setattr(pdf_utils, "_page_text", flaky)
+
+    pages = list(iter_pdf_pages(RULES_PDF, workers=1))
+    assert pages[1].error == "ValueError: bad content stream" and pages[1].text == ""
+    assert all(page.error is None and page.text for page in pages[:1] + pages[2:])
+
+    missing = list(iter_pdf_pages(str(tmp_path / "missing.pdf"), workers=1))
+    assert len(missing) == 1 and missing[0].page is None and "FileNotFoundError" in missing[0].error
+    # extract_pdf_pages reports the failed page and keeps the rest
+    calls.clear()
+    assert len(extract_pdf_pages(RULES_PDF, workers=1)) == len(pages)
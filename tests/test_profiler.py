@@ -0,0 +1,42 @@
+import os
+import sys
+import threading
+import time
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.profiler import SamplingProfiler, phase, recent_timings, request_timings
+
+def _busy_wait(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+def test_capture_collapses_stacks_of_other_threads():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_wait, args=(stop,))
+    worker.start()
+    try:
+        stacks = SamplingProfiler(interval=0.001).capture(0.1)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert any(stack.endswith("test_profiler.py:_busy_wait") for stack in stacks)
+    assert all(count > 0 for count in stacks.values())
+
+def test_phases_accumulate_per_request():
+    with phase("ignored"):
+        pass
+
+    with request_timings("POST /chat") as timings:
+        with phase("agent"):
+            time.sleep(0.01)
+        with phase("agent"):
+            time.sleep(0.01)
+
+    assert set(timings.phases) == {"agent"}
+    assert timings.phases["agent"][0] >= 0.02
+    assert timings.wall >= timings.phases["agent"][0]
+    assert recent_timings[-1]["name"] == "POST /chat"
+    assert "agent;dur=" in timings.server_timing_header()
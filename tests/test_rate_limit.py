@@ -0,0 +1,110 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.rate_limit import AdmissionController, AdmissionRejected, TokenBucket
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def test_token_bucket_refills_over_time():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=2.0, clock=clock)
+
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == pytest.approx(0.5)
+
+    clock.now = 0.5
+    assert bucket.try_acquire() == 0.0
+
+def test_session_rate_limit_returns_429():
+    controller = AdmissionController(session_rate=1.0, session_burst=1.0)
+
+    async def scenario():
+        async with controller.admit("s1", in_progress=False):
+            pass
+        async with controller.admit("s1", in_progress=True):
+            pass
+
+    with pytest.raises(AdmissionRejected) as excinfo:
+        asyncio.run(scenario())
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.retry_after_header == "1"
+
+def test_in_progress_sessions_are_served_first_and_displace_new_ones():
+    controller = AdmissionController(max_concurrent=1, max_queue=2, session_burst=10)
+    order = []
+
+    async def turn(session_id: str, in_progress: bool, gate: asyncio.Event = None):
+        try:
+            async with controller.admit(session_id, in_progress):
+                order.append(session_id)
+                if gate is not None:
+                    await gate.wait()
+        except AdmissionRejected as e:
+            order.append(f"{session_id}:{e.status_code}")
+
+    async def scenario():
+        gate = asyncio.Event()
+        running = asyncio.create_task(turn("busy", True, gate))
+        await asyncio.sleep(0)
+        new_a = asyncio.create_task(turn("new-a", False))
+        new_b = asyncio.create_task(turn("new-b", False))
+        await asyncio.sleep(0)
+        active = asyncio.create_task(turn("active", True))
+        await asyncio.sleep(0)
+        assert controller.queue_depth == 2
+        gate.set()
+        await asyncio.gather(running, new_a, new_b, active)
+
+    asyncio.run(scenario())
+    assert order == ["busy", "new-b:503", "active", "new-a"]
+    assert controller.active == 0
+
+def test_global_rejection_does_not_spend_the_session_token():
+    controller = AdmissionController(global_rate=1.0, global_burst=1.0, session_rate=0.001, session_burst=1.0)
+
+    async def turn(session_id: str):
+        async with controller.admit(session_id, in_progress=False):
+            pass
+
+    asyncio.run(turn("s1"))
+    with pytest.raises(AdmissionRejected) as excinfo:
+        asyncio.run(turn("s2"))
+    assert excinfo.value.status_code == 503
+    # s2 was turned away by the global bucket, so its own token is still there
+    assert controller._session_buckets["s2"].wait_time() == 0.0
+
+def test_shed_turn_gets_its_rate_tokens_back():
+    controller = AdmissionController(max_concurrent=1, max_queue=0, global_rate=0.001, global_burst=2.0,
+                                     session_rate=0.001, session_burst=1.0)
+
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def busy():
+            async with controller.admit("busy", in_progress=True):
+                await gate.wait()
+
+        running = asyncio.create_task(busy())
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected, match="Request queue is full"):
+            async with controller.admit("shed", in_progress=False):
+                pass
+        gate.set()
+        await running
+
+    asyncio.run(scenario())
+    # Neither the session's token nor the global one was spent on the shed turn
+    assert controller._session_buckets["shed"].wait_time() == 0.0
+    assert controller.global_bucket.wait_time() == 0.0
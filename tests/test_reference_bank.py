@@ -0,0 +1,83 @@
+import os
+import sys
+
+import pytest
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.reference_bank import ReferenceBank, build_reference_bank
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+MOLE = "The Mole had been working very hard all the morning, spring-cleaning his little home."
+GATSBY = "There was a touch of paternal contempt in it, even toward people he liked."
+
+@pytest.fixture(scope="module")
+def bank(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("bank") / "reference_bank.sqlite3")
+    count = build_reference_bank(
+        path,
+        answers_path=os.path.join(DATA_DIR, "reference_answers.json"),
+        practice_path=os.path.join(DATA_DIR, "practice_sentences.json")
+    )
+    assert count == 2
+    reference_bank = ReferenceBank(path)
+    yield reference_bank
+    reference_bank.close()
+
+def test_lookup_by_sentence(bank):
+    entry = bank.lookup("  “the mole had been working very hard all the morning, spring-cleaning his little home”")
+    assert entry is not None
+    assert entry.meaning_blocks == [MOLE]
+    assert len(entry.reconstructions) == 4
+    assert bank.lookup("A sentence nobody practises.") is None
+
+def test_blocks_match_and_common_mistake(bank):
+    entry = bank.lookup(MOLE)
+    assert entry.blocks_match(f"({MOLE[:-1]})")
+    split = "(The Mole had been working very hard) (all the morning) (spring-cleaning his little home)"
+    assert not entry.blocks_match(split)
+    assert entry.find_mistake("blocks", split) is not None
+
+def test_reference_versions_keep_their_accuracy(bank):
+    entry = bank.lookup(GATSBY)
+    for version in entry.reconstructions:
+        accuracy, _ = entry.estimate_accuracy(f"v1. {version['text']}")
+        assert accuracy >= version["accuracy"]
+
+def test_accuracy_grows_with_covered_ideas(bank):
+    entry = bank.lookup(GATSBY)
+    low, missing = entry.estimate_accuracy("v1. He was rude")
+    high, _ = entry.estimate_accuracy("v3. His manner showed slight fatherly scorn toward friends")
+    assert low < high
+    assert missing
+    assert entry.find_mistake("reconstruction", "v2. it even gave a major siren sound, and for women he hated")
+
+def test_default_bank_is_built_on_first_use_and_reloaded_after_a_rebuild(tmp_path, monkeypatch):
+    import agent.reference_bank as reference_bank
+
+    path = str(tmp_path / "reference_bank.sqlite3")
+    monkeypatch.setattr(reference_bank, "REFERENCE_BANK_PATH", path)
+    monkeypatch.setattr(reference_bank, "REFERENCE_ANSWERS_PATH", os.path.join(DATA_DIR, "reference_answers.json"))
+    monkeypatch.setattr(reference_bank, "RELOAD_CHECK_SECONDS", 0)
+    for name, value in (("_default_bank", None), ("_default_version", None), ("_last_check", 0.0)):
+        monkeypatch.setattr(reference_bank, name, value)
+
+    first = reference_bank.get_reference_bank()
+    assert first is not None and first.lookup(MOLE) is not None
+    assert reference_bank.get_reference_bank() is first
+
+    os.remove(path)
+    build_reference_bank(path, answers_path=os.path.join(DATA_DIR, "reference_answers.json"))
+    os.utime(path, ns=(1, 1))
+    assert reference_bank.get_reference_bank() is not first
+
+def test_lookup_cache_is_bounded(tmp_path):
+    path = str(tmp_path / "reference_bank.sqlite3")
+    build_reference_bank(path, answers_path=os.path.join(DATA_DIR, "reference_answers.json"))
+    bank = ReferenceBank(path, max_cached_entries=3)
+    for number in range(10):
+        assert bank.lookup(f"Student sentence number {number}.") is None
+    assert bank.lookup(MOLE) is not None
+    assert len(bank._cache) == 3
+    bank.close()
@@ -0,0 +1,92 @@
+import os
+import sys
+
+import pytest
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.sentence_index import (
+    SentenceIndex, SentenceRecord, extract_quoted_sentence, sentence_id, split_sentences
+)
+
+PRACTICE_SENTENCES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  "data", "practice_sentences.json")
+
+def test_extract_picks_longest_quoted_span():
+    message = 'I read "The Mole had been working very hard all the morning." and "it was" good'
+    assert extract_quoted_sentence(message) == "The Mole had been working very hard all the morning."
+
+def test_extract_curly_quotes_and_meaning_blocks():
+    assert extract_quoted_sentence("“There was a touch of paternal contempt in it.”") == \
+        "There was a touch of paternal contempt in it."
+    blocks = '("There was a touch) (of paternal contempt) (in it, even toward people he liked.)"'
+    assert extract_quoted_sentence(blocks) == \
+        "There was a touch of paternal contempt in it, even toward people he liked."
+
+def test_extract_ignores_short_quotes():
+    assert extract_quoted_sentence('what does "paternal" mean?') == ""
+
+def test_sentence_id_is_stable_across_formatting():
+    assert sentence_id("There was a touch of paternal contempt in it.") == \
+        sentence_id("  “there was a touch of  paternal contempt in it”  ")
+    assert sentence_id("one sentence") != sentence_id("another sentence")
+
+def test_practice_sentences_resolve_to_meaning_blocks():
+    index = SentenceIndex()
+    index.load_practice_sentences(PRACTICE_SENTENCES)
+    record = index.lookup("the mole had been working very hard all the morning, spring-cleaning his little home")
+    assert record is not None
+    assert record.meaning_blocks
+    assert index.lookup("A sentence nobody indexed.") is None
+
+def test_corpus_keeps_curated_records(tmp_path):
+    index = SentenceIndex()
+    text = "There was a touch of paternal contempt in it."
+    index.add(SentenceRecord(id=sentence_id(text), text=text, meaning_blocks=[text]))
+    index.add_corpus("gatsby", "He smiled. There was a touch of paternal contempt in it.")
+    assert len(index) == 2
+    assert index.lookup(text).meaning_blocks == [text]
+
+    path = str(tmp_path / "index.jsonl")
+    index.save(path)
+    loaded = SentenceIndex()
+    loaded.load(path)
+    assert loaded.lookup("He smiled.").source == "gatsby"
+
+def test_split_sentences_handles_abbreviations_and_quotes():
+    text = 'Mr. Gatsby waved. "Come in," he said. Then he left!  Nobody followed.'
+    assert split_sentences(text) == [
+        "Mr. Gatsby waved.", '"Come in," he said.', "Then he left!", "Nobody followed."
+    ]
+
+def test_session_switches_to_a_newly_introduced_sentence():
+    from agent.essay_agent import EssayAgent
+
+    agent = EssayAgent()
+    turns = [{"role": "user", "content": 'Let\'s work on "There was a touch of paternal contempt in it."'},
+             {"role": "assistant", "content": "Can you break it into meaning blocks?"}]
+    assert agent._resolve_sentence(turns, "s1").text == "There was a touch of paternal contempt in it."
+
+    turns += [{"role": "user", "content": "(There was a touch) (of paternal contempt in it)"}]
+    assert agent._resolve_sentence(turns, "s1").text == "There was a touch of paternal contempt in it."
+
+    turns += [{"role": "user", "content": "He could not help but smile at the thought of it, even then."}]
+    assert agent._resolve_sentence(turns, "s1").text == "He could not help but smile at the thought of it, even then."
+    turns += [{"role": "user", "content": "v1: He smiled anyway when he thought about it."}]
+    assert agent._resolve_sentence(turns, "s1").text == "He could not help but smile at the thought of it, even then."
+
+@pytest.mark.parametrize("request_message", [
+    "I need some help with this sentence.",
+    "Please evaluate my last version for accuracy.",
+    "I would like to move on to the next sentence.",
+    "I think this sentence is about a lot of small duties.",
+])
+def test_requests_leave_the_session_sentence_unchanged(request_message):
+    from agent.essay_agent import EssayAgent
+
+    agent = EssayAgent()
+    turns = [{"role": "user", "content": 'Let\'s work on "There was a touch of paternal contempt in it."'},
+             {"role": "assistant", "content": "Can you break it into meaning blocks?"},
+             {"role": "user", "content": request_message}]
+    assert agent._resolve_sentence(turns, "s1").text == "There was a touch of paternal contempt in it."
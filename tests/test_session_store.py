@@ -0,0 +1,73 @@
+import multiprocessing
+import os
+import sys
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.simple_essay_agent import SimpleEssayAgent
+from utils.session_store import SessionStore
+
+def _increment_many(args):
+    """Increment a shared counter from a separate process."""
+    db_path, times = args
+    store = SessionStore(db_path)
+    for _ in range(times):
+        store.update("shared", lambda state: state.update(count=state.get("count", 0) + 1))
+
+def test_round_trip_agent_state(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.sqlite3"))
+    agent = SimpleEssayAgent()
+    agent.add_message("user", "There was a touch of paternal contempt in it, even toward people he liked.")
+    agent.analyze_meaning_blocks("(There was a touch of paternal contempt) (in it, even toward people he liked)")
+    agent.create_version(1, "it had a large piece evil sorrow")
+
+    store.update("s1", lambda state: state.update(agent.to_dict()))
+    state, version = store.load("s1")
+    restored = SimpleEssayAgent.from_dict(state)
+
+    assert version == 1
+    assert restored.to_dict() == agent.to_dict()
+    assert store.count() == 1
+
+def test_stale_version_is_rejected(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.sqlite3"))
+    store.update("s1", lambda state: state.update(step=1))
+    state, version = store.load("s1")
+
+    assert store.save("s1", {"step": 2}, version)
+    assert not store.save("s1", {"step": 3}, version)
+    assert store.load("s1")[0] == {"step": 2}
+
+def test_no_lost_updates_across_processes(tmp_path):
+    db_path = str(tmp_path / "sessions.sqlite3")
+    SessionStore(db_path)
+    with multiprocessing.Pool(4) as pool:
+        pool.map(_increment_many, [(db_path, 50)] * 4)
+
+    assert SessionStore(db_path).load("shared")[0]["count"] == 200
+
+def test_purge_expired_deletes_idle_sessions_and_jobs(tmp_path, monkeypatch):
+    import time
+    import run
+    import utils.jobs as jobs
+    import utils.session_store as session_store
+
+    db_path = str(tmp_path / "sessions.sqlite3")
+    store = SessionStore(db_path)
+    monkeypatch.setattr(session_store, "_store", store)
+    monkeypatch.setattr(jobs, "_manager", jobs.JobManager(jobs.JobStore(db_path)))
+    for session_id in ("idle", "active"):
+        store.update(session_id, lambda state: state.update(step=1))
+    old_job = jobs.get_job_manager().store.create("summary", "old")
+    recent_job = jobs.get_job_manager().store.create("summary", "recent")
+    store._connect().execute("UPDATE sessions SET updated_at = ? WHERE session_id = 'idle'",
+                             (time.time() - run.SESSION_TTL - 1,))
+    store._connect().execute("UPDATE jobs SET updated_at = ? WHERE job_id = ?",
+                             (time.time() - run.JOB_TTL - 1, old_job["job_id"]))
+
+    assert (store.count(), store.count(run.SESSION_TTL)) == (2, 1)
+    assert run.purge_expired() == {"sessions": 1, "jobs": 1}
+    assert not store.exists("idle") and store.exists("active")
+    assert jobs.get_job_manager().store.get(old_job["job_id"]) is None
+    assert jobs.get_job_manager().store.get(recent_job["job_id"]) is not None
@@ -0,0 +1,73 @@
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import agent.skill_model as skill_model
+import run
+import utils.session_store as session_store
+import utils.trajectory_store as trajectory_store
+from agent.sentence_index import SentenceIndex, SentenceRecord, sentence_id
+from agent.skill_model import SkillProfile, SkillStore, select_sentence, sentence_difficulty
+
+EASY = "The dog ran to the park to play with his ball."
+MEDIUM = "The old captain, who had sailed for many years, finally returned to his village."
+HARD = ("Notwithstanding considerable institutional resistance, the committee's comprehensive "
+        "recommendations, which emphasized transparency, were eventually implemented.")
+
+def make_index(*texts, blocks=()):
+    index = SentenceIndex()
+    for text in texts:
+        index.add(SentenceRecord(id=sentence_id(text), text=text, source="gatsby",
+                                 meaning_blocks=list(blocks) if text == MEDIUM else []))
+    return index
+
+def test_level_follows_accuracy_and_picks_matching_sentences(tmp_path):
+    assert sentence_difficulty(EASY) < sentence_difficulty(MEDIUM) < sentence_difficulty(HARD)
+    store = SkillStore(str(tmp_path / "skills.sqlite3"))
+    assert store.get("alice").is_new
+
+    for version in range(8):
+        store.record_version("alice", HARD, accuracy=95.0)
+    strong = store.get("alice")
+    assert strong.versions == 8 and strong.sentences == 1 and strong.level > 0.3
+    for version in range(8):
+        store.record_version("bob", MEDIUM, accuracy=10.0, violations=0b1)
+    weak = store.get("bob")
+    assert weak.level < 0.3 and weak.summary()["violation_rates"]["repeated_words"] == 1.0
+
+    # Each gets the closest sentence to their level that they have not just worked on
+    index = make_index(EASY, MEDIUM, HARD)
+    assert select_sentence(weak, index, window=1)[0].text == EASY
+    assert select_sentence(strong, index, window=1)[0].text == MEDIUM
+    assert select_sentence(SkillProfile(recent=[sentence_id(t) for t in (EASY, MEDIUM, HARD)]), index) is None
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    db = str(tmp_path / "sessions.sqlite3")
+    monkeypatch.setattr(session_store, "_store", session_store.SessionStore(db))
+    monkeypatch.setattr(skill_model, "_store", SkillStore(db))
+    monkeypatch.setattr(trajectory_store, "_store", trajectory_store.TrajectoryStore(str(tmp_path / "trajectories.bin")))
+    monkeypatch.setattr(skill_model, "get_sentence_index", lambda: make_index(EASY, MEDIUM, HARD, blocks=["The old captain"]))
+    with TestClient(run.app) as test_client:
+        yield test_client
+
+def test_versions_update_skills_and_next_sentence_is_adaptive(client):
+    def chat(content):
+        response = client.post("/chat", json={"messages": [{"role": "user", "content": content}], "session_id": "carol"})
+        assert response.status_code == 200
+        return response.json()["response"]
+
+    chat(MEDIUM)
+    chat("(The old captain,) (who had sailed for many years,) (finally returned to his village.)")
+    chat("v1: A seasoned mariner came home after decades at sea")
+    skills = client.get("/sessions/carol/skills").json()
+    assert skills["versions"] == 1 and skills["sentences"] == 1
+    assert skills["next_sentence"]["text"] != MEDIUM
+
+    reply = chat("next sentence")
+    assert reply.startswith(f"Here's a sentence at your level: '{skills['next_sentence']['text']}'")
@@ -0,0 +1,43 @@
+import asyncio
+import os
+import sys
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import agent.skill_model as skill_model
+import run
+import utils.session_store as session_store
+import utils.trajectory_store as trajectory_store
+from agent.simple_essay_agent import SimpleEssayAgent
+from tests.soak import SoakLimits, soak, soak_admission
+
+# Raise for a longer soak, e.g. ESSAY_SOAK_SECONDS=120
+SOAK_SECONDS = float(os.getenv("ESSAY_SOAK_SECONDS", "5"))
+
+def test_resent_conversation_is_stored_once():
+    agent = SimpleEssayAgent()
+    conversation = []
+    for turn in range(60):
+        conversation.append(("user", f"turn {turn}"))
+        agent.add_messages(conversation)
+        conversation.append(("assistant", f"reply {turn}"))
+    history = [(m.role, m.content) for m in agent.conversation_history]
+    assert history == conversation[-SimpleEssayAgent.max_history - 1:-1]
+
+    # A turn repeating the previous message is still a new turn
+    agent.add_messages([("user", "turn 59")])
+    assert [m.content for m in agent.conversation_history[-2:]] == ["turn 59", "turn 59"]
+
+def test_interleaved_sessions_stay_isolated_and_bounded(tmp_path, monkeypatch):
+    db = str(tmp_path / "sessions.sqlite3")
+    monkeypatch.setattr(session_store, "_store", session_store.SessionStore(db))
+    monkeypatch.setattr(skill_model, "_store", skill_model.SkillStore(db))
+    monkeypatch.setattr(trajectory_store, "_store", trajectory_store.TrajectoryStore(str(tmp_path / "trajectories.bin")))
+    monkeypatch.setattr(run, "admission", soak_admission())
+
+    report = asyncio.run(soak(run.app, duration=SOAK_SECONDS, live=50))
+    print(report.summary())
+    assert report.sessions_finished >= 50 and report.turns > 6 * 50
+    # A few seconds cannot tell a slow drift from one pause, so only a large p99 increase counts here
+    assert report.failures(SoakLimits(max_p99_ms=1000, min_drift_ms=250)) == []
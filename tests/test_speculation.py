@@ -0,0 +1,66 @@
+import os
+import sys
+import threading
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.reference_bank import ReferenceBank, build_reference_bank
+from agent.sentence_index import sentence_id
+from agent.speculation import Speculator, forbidden_words
+from utils.prefetch import PrefetchCache
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+GATSBY = "There was a touch of paternal contempt in it, even toward people he liked."
+
+def test_lexicon():
+    lexicon = forbidden_words("The Mole had been working very hard all the morning.")
+    assert {"working", "hard", "morning"} <= lexicon
+    assert "mole" not in lexicon and "the" not in lexicon
+
+def test_next_step_is_prepared_in_background(tmp_path):
+    path = str(tmp_path / "reference_bank.sqlite3")
+    build_reference_bank(path, os.path.join(DATA_DIR, "reference_answers.json"),
+                         os.path.join(DATA_DIR, "practice_sentences.json"))
+    bank = ReferenceBank(path)
+    speculator = Speculator(bank=bank)
+    try:
+        assert speculator.predict("meaning_blocks") == "reconstruction"
+        speculator.speculate(GATSBY, "meaning_blocks")
+        assert (sentence_id(GATSBY), "reconstruction") in speculator._cache
+
+        context = speculator.context(GATSBY, "reconstruction")
+        assert context.reference is not None and context.reference.meaning_blocks == [GATSBY]
+        assert context.repeated_words("v1. It had even more contempt, even so") == ["even", "contempt"]
+        assert speculator.context(GATSBY, "reconstruction") is context
+    finally:
+        speculator.shutdown()
+        bank.close()
+
+def test_unpredicted_steps_do_not_wait_behind_speculation():
+    release = threading.Event()
+    cache = PrefetchCache("test", max_workers=1)
+    try:
+        cache.prefetch("slow", release.wait, 5)
+        cache.prefetch("queued", lambda: "background")
+        # A miss and a prefetch still queued are both computed on the caller's thread
+        assert cache.get("miss", lambda: "here") == "here"
+        assert cache.get("queued", lambda: "foreground") == "foreground"
+        assert not release.is_set()
+    finally:
+        release.set()
+        cache.shutdown()
+
+def test_contexts_are_dropped_when_the_bank_is_rebuilt(monkeypatch):
+    import agent.speculation as speculation
+
+    banks = [object(), object()]
+    monkeypatch.setattr(speculation, "get_reference_bank", lambda: banks[0])
+    monkeypatch.setattr(speculation, "build_step_context", lambda text, step, bank: (text, step, bank))
+    speculator = Speculator()
+    try:
+        assert speculator.context(GATSBY, "reconstruction")[2] is banks[0]
+        banks.pop(0)
+        assert speculator.context(GATSBY, "reconstruction")[2] is banks[0]
+    finally:
+        speculator.shutdown()
@@ -0,0 +1,67 @@
+import os
+import sys
+
+import pytest
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.essay_agent import EssayAgent
+from agent.step_engine import StepEngine, Transition
+
+def make_state(step="intro", message="", **overrides):
+    state = {"messages": [{"role": "user", "content": message}] if message else [], "current_step": step,
+             "current_meaning_block": ""}
+    state.update(overrides)
+    return state
+
+def test_first_matching_transition_fires():
+    engine = StepEngine([
+        Transition("blocks", "meaning_blocks", lambda s, i, m: i.name == "meaning_blocks", lambda s, i, m: "blocks"),
+        Transition("also_blocks", "feedback", lambda s, i, m: i.name == "meaning_blocks", lambda s, i, m: "never"),
+        Transition("version", "reconstruction", lambda s, i, m: i.name == "version", lambda s, i, m: "version")
+    ], fallback=lambda s, i, m: f"fallback for {i.name}", after=lambda s, feedback: feedback.upper())
+
+    state = make_state(message="(He had to) (leave it)")
+    assert engine.run(state) == "BLOCKS" and state["current_step"] == "meaning_blocks"
+    assert engine.run(state, "v1: He was obliged to go.") == "VERSION"
+    assert state["current_step"] == "reconstruction" and state["current_meaning_block"] == "VERSION"
+    assert engine.run(state, "I don't know") == "FALLBACK FOR UNSURE" and state["current_step"] == "reconstruction"
+    assert engine.run(make_state()) == ""
+
+    with pytest.raises(Exception, match="unknown steps: grading"):
+        StepEngine([Transition("grade", "grading", lambda s, i, m: True, lambda s, i, m: "")], fallback=None)
+
+class FakeLLM:
+    def __init__(self):
+        self.prompts = []
+
+    def invoke(self, messages):
+        from langchain_core.messages import AIMessage
+
+        self.prompts.append(messages)
+        return AIMessage(content="Meaning blocks group words that carry one idea.")
+
+def test_only_open_questions_fall_through_to_the_llm():
+    agent = EssayAgent()
+    agent.llm = FakeLLM()
+    quote = '"He had to leave it."'
+    turns = [{"role": "user", "content": f"Let's work on {quote}"}, {"role": "assistant", "content": "Sure."}]
+
+    def reply(content):
+        return "".join(agent.get_response(turns + [{"role": "user", "content": content}])).strip()
+
+    assert reply("v1: She must depart.").startswith("Your reconstruction is about")
+    assert reply("(He had to)(leave it)").startswith("Thanks")
+    assert reply("Please give me a hint").startswith("When looking for meaning blocks")
+    assert reply("What are the meaning blocks here?").startswith("When looking for meaning blocks")
+    assert agent.llm.prompts == []
+
+    assert reply("Why does the order of ideas matter?") == "Meaning blocks group words that carry one idea."
+    (system, context, *history), = agent.llm.prompts
+    assert system == ("system", agent.system_prompt) and quote[1:-1] in context[1]
+    assert history[-1] == ("user", "Why does the order of ideas matter?")
+
+    agent.llm_fallback = False
+    assert reply("Why does the order of ideas matter?").startswith("When looking for meaning blocks")
+    assert len(agent.llm.prompts) == 1
@@ -0,0 +1,69 @@
+import math
+import os
+import sys
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.trajectory_analytics import Trajectories
+from utils.trajectory_store import RULES, TrajectoryStore, check_rules
+
+GATSBY = "There was a touch of paternal contempt in it, even toward people he liked."
+
+def _write_log(path):
+    store = TrajectoryStore(path)
+    attempts = [
+        # student 1 reaches 90% on its third version, interleaved with student 2
+        (1, 7, 1, 40.0, 0, 1.0), (2, 7, 1, 30.0, 1, 2.0), (1, 7, 2, 70.0, 0, 3.0),
+        (2, 7, 2, 31.0, 1, 4.0), (1, 7, 3, 95.0, 0, 5.0), (2, 7, 3, 32.0, 3, 6.0),
+        # student 1 on another sentence reaches 90% right away
+        (1, 8, 1, 90.0, 4, 7.0)
+    ]
+    store.append_many(attempts)
+    store.append(3, 8, 1, float("nan"), 0, 8.0)
+    store.close()
+
+def test_versions_to_reach(tmp_path):
+    path = str(tmp_path / "trajectories.bin")
+    _write_log(path)
+    trajectories = Trajectories.load(path)
+    assert len(trajectories) == 8
+    assert trajectories.trajectory_count == 4
+    reach = trajectories.versions_to_reach(90)
+    assert reach["reach_rate"] == 0.5
+    assert reach["mean_versions"] == 2.0
+
+    only_sentence = trajectories.select(sentence=7).versions_to_reach(90)
+    assert only_sentence["trajectories"] == 2
+    assert only_sentence["mean_versions"] == 3.0
+
+def test_violation_rates_and_plateaus(tmp_path):
+    path = str(tmp_path / "trajectories.bin")
+    _write_log(path)
+    trajectories = Trajectories.load(path)
+    rates = trajectories.violation_rates()
+    assert math.isclose(rates["repeated_words"], 3 / 8)
+    assert math.isclose(rates["copied_phrase"], 1 / 8)
+    assert math.isclose(rates["too_short"], 1 / 8)
+
+    stalled = trajectories.plateaus(window=3, min_gain=5)
+    assert list(stalled["student"]) == [2]
+    assert stalled["attempts"][0] == 3
+
+def test_partial_record_and_empty_log(tmp_path):
+    path = str(tmp_path / "trajectories.bin")
+    _write_log(path)
+    with open(path, "ab") as f:
+        f.write(b"\x00" * 5)
+    assert len(Trajectories.load(path)) == 8
+    empty = Trajectories.load(str(tmp_path / "missing.bin"))
+    assert empty.summary()["attempts"] == 0
+
+def test_check_rules():
+    assert check_rules("v4. His manner carried some fatherly scorn, also for friends.", GATSBY) == 0
+    repeated = check_rules("v1. he showed paternal contempt in it", GATSBY)
+    assert repeated & (1 << RULES.index("repeated_words"))
+    assert repeated & (1 << RULES.index("copied_phrase"))
+    assert check_rules("v2. scorn", GATSBY) == 1 << RULES.index("too_short")
+    # Names may be repeated
+    assert check_rules("v1. Mole was tidying", "The Mole had been working very hard.") == 0
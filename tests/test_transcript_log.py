@@ -0,0 +1,69 @@
+import gzip
+import json
+import os
+import sys
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.transcript_log import TranscriptLog, convert_dumps, records_from_dump
+
+def _turn(text):
+    return {"kind": "turn", "input": text, "response": f"reply to {text}"}
+
+def test_append_and_stream_by_session(tmp_path):
+    log = TranscriptLog(str(tmp_path / "transcripts.jsonl.gz"))
+    log.append("a", [_turn("one"), _turn("two")], source="test", timestamp="2025-06-01T10:00:00")
+    log.append("b", [_turn("x" * 200000)], source="test", timestamp="2025-06-02T10:00:00")
+    log.append("a", [_turn("three")], source="test", timestamp="2025-06-03T10:00:00")
+
+    assert [r["input"] for r in log.iter_records(session="a")] == ["one", "two", "three"]
+    assert [e["session"] for e in log.entries(since="2025-06-02")] == ["b", "a"]
+    assert [e["session"] for e in log.entries(until="2025-06-02")] == ["a"]
+    # A record spanning several read chunks comes back whole
+    assert len(next(log.iter_records(session="b"))["input"]) == 200000
+
+    # The log is an ordinary multi-member gzip file
+    with gzip.open(log.path, "rt") as f:
+        assert len([json.loads(line) for line in f]) == 4
+
+def test_rebuild_index(tmp_path):
+    log = TranscriptLog(str(tmp_path / "transcripts.jsonl.gz"))
+    log.append("a", [_turn("one")], source="test", timestamp="2025-06-01T10:00:00")
+    log.append("b", [_turn("two"), _turn("three")], source="other", timestamp="2025-06-02T10:00:00")
+    before = log.entries()
+    os.remove(log.index_path)
+    assert log.rebuild_index() == 2
+    assert log.entries() == before
+
+def test_records_from_dump_formats():
+    conversation = {"timestamp": "t", "model": "gpt-4o",
+                    "interactions": [{"step": "greeting", "input": "hi", "response": "hello"}]}
+    assert records_from_dump(conversation) == [
+        {"kind": "turn", "model": "gpt-4o", "step": "greeting", "input": "hi", "response": "hello"}
+    ]
+    test_run = {
+        "test_run": {"timestamp": "t", "total_tests": 1},
+        "results": [{"test_name": "flow", "inputs": ["s", "(b)"], "expected_behaviors": ["analyze"],
+                     "actual_responses": ["analyze s", "ok"], "agent_state": [{}, {}], "passed": True}]
+    }
+    records = records_from_dump(test_run)
+    turns = [r for r in records if r["kind"] == "turn"]
+    assert [t["input"] for t in turns] == ["s", "(b)"]
+    assert turns[1]["expected"] is None
+    assert [r for r in records if r["kind"] == "run"][0]["passed"] is True
+
+def test_convert_skips_duplicate_runs(tmp_path):
+    dump = {"timestamp": "2025-05-17T17:14:40", "model": "gpt-4o",
+            "interactions": [{"step": "s", "input": "i", "response": "r"}]}
+    paths = []
+    for name in ("conversation_1.json", "conversation_2.json", "correct_response_1.json"):
+        path = tmp_path / name
+        path.write_text(json.dumps(dump))
+        paths.append(str(path))
+    log = TranscriptLog(str(tmp_path / "transcripts.jsonl.gz"))
+    assert convert_dumps(paths, log, remove=True) == 1
+    assert convert_dumps([], log) == 0
+    # Labelled responses stay as fixtures
+    assert [os.path.exists(path) for path in paths] == [False, False, True]
+    assert [r["session"] for r in log.iter_records()] == ["conversation_1"]
@@ -0,0 +1,66 @@
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import run
+import utils.session_store as session_store
+from agent.paragraph_session import GENERIC_HINTS
+
+SENTENCE = "He had to leave it."
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_store, "_store", session_store.SessionStore(str(tmp_path / "sessions.sqlite3")))
+    with TestClient(run.app) as test_client:
+        yield test_client
+
+def receive_reply(websocket):
+    text = ""
+    frame = websocket.receive_json()
+    while frame["type"] == "partial":
+        text += frame["text"]
+        frame = websocket.receive_json()
+    return text, frame
+
+def test_turns_are_small_frames_on_a_held_session(client):
+    with client.websocket_connect("/ws/alice") as websocket:
+        assert websocket.receive_json() == {"type": "ready", "session_id": "alice", "current_sentence": None}
+        websocket.send_json({"type": "message", "content": SENTENCE})
+        text, done = receive_reply(websocket)
+        assert done == {"type": "done", "branch": "new_sentence"}
+        assert text.startswith(f"Great! Let's analyze this sentence: '{SENTENCE}'\n\nCan you break it")
+
+        websocket.send_text("not json")
+        assert websocket.receive_json()["status"] == 400
+        websocket.send_json({"type": "ping"})
+        assert websocket.receive_json() == {"type": "pong"}
+
+        # Reconnecting takes the session over, with its state
+        with client.websocket_connect("/ws/alice") as newer:
+            assert newer.receive_json()["current_sentence"] == SENTENCE
+            with pytest.raises(WebSocketDisconnect) as closed:
+                websocket.receive_json()
+            assert closed.value.code == run.WS_CLOSE_REPLACED
+    assert session_store.get_session_store().load("alice")[0]["current_sentence"] == SENTENCE
+
+def test_silent_student_gets_hints_then_pings_then_eviction(client, monkeypatch):
+    monkeypatch.setattr(run, "WS_HINT_AFTER", 0.05)
+    monkeypatch.setattr(run, "WS_HEARTBEAT", 0.2)
+    monkeypatch.setattr(run, "WS_IDLE_TIMEOUT", 1.0)
+    with client.websocket_connect("/ws/bob") as websocket:
+        websocket.receive_json()
+        websocket.send_json({"type": "message", "content": SENTENCE})
+        receive_reply(websocket)
+        hints = [websocket.receive_json() for _ in GENERIC_HINTS]
+        assert hints == [{"type": "hint", "text": hint} for hint in GENERIC_HINTS]
+        assert websocket.receive_json() == {"type": "ping"}
+        with pytest.raises(WebSocketDisconnect) as closed:
+            while True:
+                websocket.receive_json()
+        assert closed.value.code == run.WS_CLOSE_IDLE
@@ -0,0 +1,26 @@
+import os
+import sys
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.reference_bank import ReferenceEntry
+from agent.speculation import StepContext
+from utils.trajectory_store import RULES, check_rules
+from utils.word_rules import forbidden_words, repeated_words
+
+GATSBY = "There was a touch of paternal contempt in it, even toward people he liked."
+
+def test_function_words_and_names_may_be_repeated():
+    assert repeated_words(GATSBY, "v1. It had a bit of fatherly scorn, even for friends") == ["even"]
+    assert repeated_words("The Mole had been working very hard.", "Version 2: The Mole had been tidying.") == []
+    assert repeated_words(GATSBY, "v3. spring-cleaning at 9 a.m. with people") == ["people"]
+
+def test_tutor_grader_and_analytics_apply_the_same_rule():
+    context = StepContext("gatsby", GATSBY, "reconstruction", lexicon=forbidden_words(GATSBY))
+    entry = ReferenceEntry("gatsby", GATSBY)
+    for version in ("v1. it had a large piece of evil sorrow", "v2. it had paternal contempt for people",
+                    "v3. His manner carried some fatherly scorn, also for friends."):
+        expected = repeated_words(GATSBY, version)
+        assert context.repeated_words(version) == entry.repeated_words(version) == expected
+        assert bool(check_rules(version, GATSBY) & (1 << RULES.index("repeated_words"))) == bool(expected)
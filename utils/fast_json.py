@@ -0,0 +1,23 @@
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library
+    orjson = None
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def dumps_str(obj: Any) -> str:
+    """Serialize to compact JSON text."""
+    return dumps(obj).decode("utf-8")
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parse JSON, with orjson when it is installed (its errors subclass json.JSONDecodeError)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,302 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from utils.session_store import DEFAULT_DB_PATH
+
+# Lifecycle of a job; the last three are final
+JOB_STATES = ("queued", "running", "done", "failed", "cancelled")
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested."""
+
+class JobQueueFull(Exception):
+    """Raised when a worker already has its maximum number of pending jobs."""
+
+_COLUMNS = ("job_id", "kind", "cache_key", "status", "progress", "message", "result", "error",
+            "cancel_requested", "created_at", "updated_at")
+
+class JobStore:
+    """
+    Job records shared by every worker process through the session database.
+
+    A job runs in the worker that accepted it, but its status, progress and result
+    live in SQLite, so any worker can answer a progress poll or take a cancellation.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connect().execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                cache_key TEXT NOT NULL,
+                status TEXT NOT NULL,
+                progress REAL NOT NULL DEFAULT 0,
+                message TEXT NOT NULL DEFAULT '',
+                result TEXT,
+                error TEXT,
+                cancel_requested INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                owner_pid INTEGER
+            )"""
+        )
+        columns = {row[1] for row in self._connect().execute("PRAGMA table_info(jobs)")}
+        if "owner_pid" not in columns:
+            # Databases created before jobs recorded the process running them
+            self._connect().execute("ALTER TABLE jobs ADD COLUMN owner_pid INTEGER")
+        self._connect().execute("CREATE INDEX IF NOT EXISTS jobs_cache_key ON jobs (kind, cache_key)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return the connection owned by the calling thread."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row_to_job(row) -> Dict[str, Any]:
+        job = dict(zip(_COLUMNS, row))
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def create(self, kind: str, cache_key: str) -> Dict[str, Any]:
+        """Create a queued job, owned by the calling process."""
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        self._connect().execute(
+            """INSERT INTO jobs (job_id, kind, cache_key, status, created_at, updated_at, owner_pid)
+               VALUES (?, ?, ?, 'queued', ?, ?, ?)""",
+            (job_id, kind, cache_key, now, now, os.getpid())
+        )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job, or None if it does not exist."""
+        row = self._connect().execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def find_reusable(self, kind: str, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the newest job for the same input that finished or is still going, if any.
+
+        A queued or running job whose process has died never finishes, so it is
+        marked failed and skipped instead.
+        """
+        rows = self._connect().execute(
+            f"""SELECT {', '.join(_COLUMNS)}, owner_pid FROM jobs
+                WHERE kind = ? AND cache_key = ? AND status IN ('queued', 'running', 'done') AND cancel_requested = 0
+                ORDER BY created_at DESC""",
+            (kind, cache_key)
+        ).fetchall()
+        for row in rows:
+            job, owner_pid = self._row_to_job(row[:-1]), row[-1]
+            if job["status"] == "done" or _process_alive(owner_pid):
+                return job
+            self.fail_unfinished("The worker running this job stopped", job_id=job["job_id"])
+        return None
+
+    def update(self, job_id: str, **fields):
+        """Update some fields of a job."""
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"])
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        self._connect().execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*fields.values(), job_id))
+
+    def request_cancel(self, job_id: str) -> bool:
+        """Ask a queued or running job to stop. Returns False if the job is unknown or already final."""
+        cursor = self._connect().execute(
+            "UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE job_id = ? AND status IN ('queued', 'running')",
+            (time.time(), job_id)
+        )
+        return cursor.rowcount == 1
+
+    def fail_unfinished(self, error: str, owner_pid: Optional[int] = None, job_id: Optional[str] = None) -> int:
+        """Mark the queued and running jobs of a process, or one such job, failed; returns how many."""
+        where, value = ("job_id = ?", job_id) if job_id is not None else ("owner_pid = ?", owner_pid)
+        cursor = self._connect().execute(
+            f"UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE {where} AND status IN ('queued', 'running')",
+            (error, time.time(), value)
+        )
+        return cursor.rowcount
+
+    def cancel_requested(self, job_id: str) -> bool:
+        row = self._connect().execute("SELECT cancel_requested FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def purge(self, max_age_seconds: float) -> int:
+        """Delete jobs that have not been updated recently, returning how many were deleted."""
+        cursor = self._connect().execute(
+            "DELETE FROM jobs WHERE updated_at < ?", (time.time() - max_age_seconds,))
+        return cursor.rowcount
+
+def _process_alive(pid: Optional[int]) -> bool:
+    """Whether a process of this host is still running (the job database is a local file)."""
+    if pid is None:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class JobContext:
+    """Handle passed to a running job for reporting progress and noticing cancellation."""
+
+    def __init__(self, store: JobStore, job_id: str):
+        self.store = store
+        self.job_id = job_id
+
+    def report(self, progress: float, message: str = ""):
+        """
+        Record the job's progress (0 to 1).
+
+        Raises:
+            JobCancelled: If cancellation was requested, so the job stops at this checkpoint
+        """
+        self.check_cancelled()
+        self.store.update(self.job_id, progress=max(0.0, min(1.0, progress)), message=message)
+
+    def check_cancelled(self):
+        if self.store.cancel_requested(self.job_id):
+            raise JobCancelled(f"Job {self.job_id} was cancelled")
+
+class JobManager:
+    """
+    Runs long tasks (e.g. final summaries) as background jobs on a bounded thread pool.
+
+    Submitting returns at once with a job record to poll. Identical inputs (same
+    kind and cache key) reuse the job that is running or already finished instead
+    of computing the result again.
+    """
+
+    def __init__(self, store: Optional[JobStore] = None, max_workers: int = 2, max_pending: int = 100):
+        """
+        Initialize the manager.
+
+        Args:
+            store: Where job records live, defaults to the session database
+            max_workers: Jobs running at the same time in this worker
+            max_pending: Jobs queued or running in this worker before new ones are refused
+        """
+        self.store = store or JobStore(os.getenv("ESSAY_SESSION_DB", DEFAULT_DB_PATH))
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Jobs queued or running in this worker."""
+        with self._lock:
+            return len(self._futures)
+
+    def submit(self, kind: str, cache_key: str, fn: Callable[..., Any], *args) -> Dict[str, Any]:
+        """
+        Start a job, or return the existing job for the same input.
+
+        Args:
+            kind: Kind of job, e.g. "final_summary"
+            cache_key: Content hash of the job's input
+            fn: Called as fn(context, *args) on a worker thread; returns a JSON-serializable result
+            args: Further arguments for fn
+
+        Returns:
+            Dict[str, Any]: The job record
+
+        Raises:
+            JobQueueFull: If this worker has max_pending jobs queued or running
+        """
+        existing = self.store.find_reusable(kind, cache_key)
+        if existing is not None:
+            return existing
+        with self._lock:
+            if len(self._futures) >= self.max_pending:
+                raise JobQueueFull(f"{len(self._futures)} jobs are already pending")
+            job = self.store.create(kind, cache_key)
+            future = self._executor.submit(self._run, job["job_id"], fn, args)
+            self._futures[job["job_id"]] = future
+        future.add_done_callback(lambda _: self._forget(job["job_id"]))
+        return job
+
+    def _forget(self, job_id: str):
+        with self._lock:
+            self._futures.pop(job_id, None)
+
+    def _run(self, job_id: str, fn: Callable[..., Any], args: tuple):
+        context = JobContext(self.store, job_id)
+        try:
+            context.check_cancelled()
+            self.store.update(job_id, status="running")
+            result = fn(context, *args)
+            context.check_cancelled()
+            self.store.update(job_id, status="done", progress=1.0, message="", result=result)
+        except JobCancelled:
+            self.store.update(job_id, status="cancelled", message="Cancelled")
+        except Exception as e:
+            print(f"Error in job {job_id}: {str(e)}")
+            self.store.update(job_id, status="failed", error=str(e))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job record, or None if the job does not exist."""
+        return self.store.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a job. Queued jobs never start; running jobs stop at their next progress report.
+
+        Returns:
+            Optional[Dict[str, Any]]: The job record, or None if the job does not exist
+        """
+        if self.store.request_cancel(job_id):
+            with self._lock:
+                future = self._futures.get(job_id)
+            if future is not None and future.cancel():
+                self.store.update(job_id, status="cancelled", message="Cancelled")
+        return self.store.get(job_id)
+
+    def shutdown(self, wait: bool = False):
+        """Stop the pool; jobs left queued or running here are marked failed, so no request waits on them."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        self.store.fail_unfinished("The worker shut down before the job finished", owner_pid=os.getpid())
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+def get_job_manager() -> JobManager:
+    """Return the process-wide job manager, creating it on first use."""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = JobManager(
+                    max_workers=int(os.getenv("ESSAY_JOB_WORKERS", "2")),
+                    max_pending=int(os.getenv("ESSAY_JOB_QUEUE", "100"))
+                )
+    return _manager
+
+def shutdown_job_manager():
+    """Shut down the process-wide job manager, if it was started."""
+    global _manager
+    with _manager_lock:
+        if _manager is not None:
+            _manager.shutdown()
+            _manager = None
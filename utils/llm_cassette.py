@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from utils.metrics import record_cache_lookup
+
+# Replay only (misses are errors), record every call, or replay hits and record misses
+CASSETTE_MODES = ("replay", "record", "auto")
+
+class CassetteMissError(Exception):
+    """Raised in replay mode when a prompt has no recorded response."""
+
+def _normalize_messages(prompt: Any) -> List[Tuple[str, str]]:
+    """Turn the prompt shapes chat models accept into (role, content) pairs."""
+    if isinstance(prompt, str):
+        return [("human", prompt)]
+    messages = []
+    for message in prompt:
+        if isinstance(message, dict):
+            messages.append((message["role"], message["content"]))
+        elif isinstance(message, (tuple, list)):
+            messages.append((message[0], message[1]))
+        else:
+            messages.append((message.type, message.content))
+    return messages
+
+class CassetteLLM:
+    """
+    Chat-model wrapper that records responses to a JSON cassette and replays them.
+
+    Drop-in for the agent's model (`agent.llm = CassetteLLM(agent.llm, path)`):
+    invoke, ainvoke and stream are keyed by a hash of the model name and the
+    prompt, so a recorded suite runs deterministically and without network.
+    """
+
+    def __init__(self, llm: Any, path: str, mode: str = "replay", model: Optional[str] = None):
+        """
+        Initialize the cassette.
+
+        Args:
+            llm: The wrapped chat model; only called when recording
+            path: JSON file holding the recorded responses
+            mode: One of CASSETTE_MODES
+            model: Model name used in the keys, defaults to the wrapped model's model_name
+        """
+        if mode not in CASSETTE_MODES:
+            raise Exception(f"Unknown cassette mode {mode!r}, expected one of {CASSETTE_MODES}")
+        self.llm = llm
+        self.path = path
+        self.mode = mode
+        self.model = model or getattr(llm, "model_name", None) or getattr(llm, "model", "unknown")
+        self.hits = 0
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self._entries = json.load(f)
+
+    def key(self, prompt: Any) -> str:
+        """Cassette key of a prompt."""
+        payload = json.dumps([self.model, _normalize_messages(prompt)], ensure_ascii=False)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def _lookup(self, prompt: Any) -> Tuple[str, Optional[Dict]]:
+        key = self.key(prompt)
+        entry = None if self.mode == "record" else self._entries.get(key)
+        record_cache_lookup("llm_cassette", entry is not None)
+        if entry is not None:
+            self.hits += 1
+            return key, entry
+        if self.mode == "replay":
+            raise CassetteMissError(f"No recorded response in {self.path} for prompt {key}; record it with mode 'auto'")
+        return key, None
+
+    def _store(self, key: str, prompt: Any, response: str, usage: Optional[Dict] = None) -> Dict:
+        entry = {"model": self.model, "messages": _normalize_messages(prompt), "response": response}
+        if usage:
+            entry["usage"] = dict(usage)
+        with self._lock:
+            self._entries[key] = entry
+            self.recorded += 1
+        return entry
+
+    @staticmethod
+    def _message(entry: Dict):
+        from langchain_core.messages import AIMessage
+
+        if entry.get("usage"):
+            return AIMessage(content=entry["response"], usage_metadata=entry["usage"])
+        return AIMessage(content=entry["response"])
+
+    def invoke(self, prompt: Any, *args, **kwargs):
+        key, entry = self._lookup(prompt)
+        if entry is None:
+            message = self.llm.invoke(prompt, *args, **kwargs)
+            entry = self._store(key, prompt, message.content, getattr(message, "usage_metadata", None))
+        return self._message(entry)
+
+    async def ainvoke(self, prompt: Any, *args, **kwargs):
+        key, entry = self._lookup(prompt)
+        if entry is None:
+            message = await self.llm.ainvoke(prompt, *args, **kwargs)
+            entry = self._store(key, prompt, message.content, getattr(message, "usage_metadata", None))
+        return self._message(entry)
+
+    def stream(self, prompt: Any, *args, **kwargs) -> Iterator:
+        from langchain_core.messages import AIMessageChunk
+
+        key, entry = self._lookup(prompt)
+        if entry is not None:
+            yield AIMessageChunk(content=entry["response"])
+            return
+        parts = []
+        for chunk in self.llm.stream(prompt, *args, **kwargs):
+            parts.append(chunk.content)
+            yield chunk
+        self._store(key, prompt, "".join(parts))
+
+    def save(self):
+        """Write newly recorded responses back to the cassette."""
+        if not self.recorded:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._entries, f, indent=2, sort_keys=True, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
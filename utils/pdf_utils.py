@@ -1,6 +1,165 @@
 import os
-from typing import Dict
-from PyPDF2 import PdfReader
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Pages extracted per task sent to a worker process
+PAGE_CHUNK_SIZE = 8
+
+@dataclass
+class PageText:
+    """Text of one page of a PDF, or why it could not be extracted."""
+    document: str  # Path of the PDF
+    page: Optional[int]  # 0-based page number; None when the PDF itself could not be read
+    text: str = ""
+    error: Optional[str] = None
+
+# PDF this process read last, as (path, modification time, reader)
+_reader_cache: Optional[Tuple[str, int, object]] = None
+
+def _open_reader(pdf_path: str):
+    """Return a reader for a PDF, reusing the last one so consecutive chunks skip re-parsing it."""
+    global _reader_cache
+    from PyPDF2 import PdfReader
+
+    mtime = os.stat(pdf_path).st_mtime_ns
+    if _reader_cache is None or _reader_cache[:2] != (pdf_path, mtime):
+        _reader_cache = (pdf_path, mtime, PdfReader(pdf_path))
+    return _reader_cache[2]
+
+def _page_text(page) -> str:
+    return page.extract_text() or ""
+
+def _extract_chunk(pdf_path: str, start: int, end: int) -> List[Tuple[str, Optional[str]]]:
+    """Extract pages [start, end) of a PDF, returning (text, error) per page; runs in a worker process."""
+    reader = _open_reader(pdf_path)
+    results = []
+    for i in range(start, end):
+        try:
+            results.append((_page_text(reader.pages[i]), None))
+        except Exception as e:
+            results.append(("", f"{type(e).__name__}: {e}"))
+    return results
+
+def _chunks(pdf_paths: Iterable[str], chunk_size: int) -> Iterator[Tuple[str, int, int, Optional[str]]]:
+    """Split PDFs into (path, start, end, error) page ranges; error is set for PDFs that cannot be read."""
+    for pdf_path in pdf_paths:
+        try:
+            count = len(_open_reader(pdf_path).pages)
+        except Exception as e:
+            yield pdf_path, 0, 0, f"{type(e).__name__}: {e}"
+            continue
+        for start in range(0, count, chunk_size):
+            yield pdf_path, start, min(start + chunk_size, count), None
+
+def _chunk_pages(chunk: Tuple[str, int, int, Optional[str]], results) -> Iterator[PageText]:
+    pdf_path, start, end, error = chunk
+    if error is not None:
+        yield PageText(pdf_path, None, error=error)
+        return
+    if isinstance(results, Future):
+        try:
+            results = results.result()
+        except Exception as e:
+            # The worker died (e.g. the PDF library crashed on a page): fail this chunk only
+            results = [("", f"{type(e).__name__}: {e}")] * (end - start)
+    for i, (text, page_error) in enumerate(results):
+        yield PageText(pdf_path, start + i, text, page_error)
+
+def iter_pages(pdf_paths: Iterable[str], workers: Optional[int] = None,
+               chunk_size: int = PAGE_CHUNK_SIZE) -> Iterator[PageText]:
+    """
+    Extract the pages of PDFs in parallel, yielding them in order as they are ready.
+
+    Pages are extracted in chunks on a process pool. At most two chunks per worker
+    are in flight, so memory stays bounded however many PDFs are processed. A page
+    that fails is yielded with its error instead of ending the document, and a PDF
+    that cannot be opened at all yields one PageText with page None.
+
+    Args:
+        pdf_paths: PDFs to extract, in output order
+        workers: Worker processes, defaults to ESSAY_PDF_WORKERS or the CPU count; 1 extracts in this process
+        chunk_size: Pages per task sent to a worker
+
+    Yields:
+        PageText: Every page of every PDF, in order
+    """
+    workers = workers or int(os.getenv("ESSAY_PDF_WORKERS", str(os.cpu_count() or 1)))
+    chunks = _chunks(pdf_paths, chunk_size)
+    if workers <= 1:
+        for chunk in chunks:
+            yield from _chunk_pages(chunk, _extract_chunk(*chunk[:3]) if chunk[3] is None else None)
+        return
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    in_flight = deque()
+    try:
+        for chunk in chunks:
+            in_flight.append((chunk, executor.submit(_extract_chunk, *chunk[:3]) if chunk[3] is None else None))
+            while len(in_flight) >= 2 * workers:
+                yield from _chunk_pages(*in_flight.popleft())
+        while in_flight:
+            yield from _chunk_pages(*in_flight.popleft())
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def iter_pdf_pages(pdf_path: str, workers: Optional[int] = None,
+                   chunk_size: int = PAGE_CHUNK_SIZE) -> Iterator[PageText]:
+    """Extract the pages of one PDF in parallel, in order (see iter_pages)."""
+    return iter_pages([pdf_path], workers, chunk_size)
+
+def iter_pdf_directory(docs_dir: str = "docs", workers: Optional[int] = None,
+                       chunk_size: int = PAGE_CHUNK_SIZE) -> Iterator[PageText]:
+    """Extract the pages of every PDF in a directory, sorted by file name, sharing one process pool."""
+    pdf_paths = [os.path.join(docs_dir, filename) for filename in sorted(os.listdir(docs_dir))
+                 if filename.lower().endswith(".pdf")]
+    return iter_pages(pdf_paths, workers, chunk_size)
+
+def extract_pdf_pages(pdf_path: str, workers: Optional[int] = None) -> List[str]:
+    """
+    Extract the text of each page of a PDF file.
+    
+    Pages that fail are reported and left empty, so one bad page does not lose the document.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        workers: Worker processes (see iter_pages)
+        
+    Returns:
+        List[str]: Text of each page, in order
+    """
+    pages = []
+    for page in iter_pdf_pages(pdf_path, workers):
+        if page.page is None:
+            raise Exception(page.error)
+        if page.error:
+            print(f"Error extracting page {page.page + 1} of {pdf_path}: {page.error}")
+        pages.append(page.text)
+    return pages
+
+def extract_pages_by_document(pdf_paths: Iterable[str], workers: Optional[int] = None) -> Dict[str, List[str]]:
+    """
+    Extract the text of each page of several PDFs, sharing one process pool.
+
+    Failed pages are reported and left empty; a PDF that cannot be read is reported and left out.
+
+    Args:
+        pdf_paths: Paths of the PDF files
+        workers: Worker processes (see iter_pages)
+
+    Returns:
+        Dict[str, List[str]]: Path of each readable PDF mapped to the text of its pages, in order
+    """
+    documents = {}
+    for page in iter_pages(pdf_paths, workers):
+        if page.page is None:
+            print(f"Error extracting {page.document}: {page.error}")
+            continue
+        if page.error:
+            print(f"Error extracting page {page.page + 1} of {page.document}: {page.error}")
+        documents.setdefault(page.document, []).append(page.text)
+    return documents
 
 def convert_pdf_to_text(pdf_path: str) -> str:
     """
@@ -13,11 +172,7 @@ def convert_pdf_to_text(pdf_path: str) -> str:
         str: Extracted text from the PDF
     """
     try:
-        reader = PdfReader(pdf_path)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-        return text.strip()
+        return "\n".join(extract_pdf_pages(pdf_path)).strip()
     except Exception as e:
         print(f"Error converting PDF {pdf_path}: {str(e)}")
         return ""
@@ -33,12 +188,15 @@ def load_pdf_contexts(docs_dir: str = "docs") -> Dict[str, str]:
         Dict[str, str]: Dictionary mapping PDF filenames to their text content
     """
     pdf_contexts = {}
+    texts = {}
+    for page in iter_pdf_directory(docs_dir):
+        if page.error:
+            where = f"page {page.page + 1} of " if page.page is not None else ""
+            print(f"Error converting PDF {where}{page.document}: {page.error}")
+        texts.setdefault(os.path.basename(page.document), []).append(page.text)
+    for filename, pages in texts.items():
+        text = "\n".join(pages).strip()
+        if text:
+            pdf_contexts[filename] = text
     
-    for filename in os.listdir(docs_dir):
-        if filename.lower().endswith('.pdf'):
-            pdf_path = os.path.join(docs_dir, filename)
-            text = convert_pdf_to_text(pdf_path)
-            if text:
-                pdf_contexts[filename] = text
-    
-    return pdf_contexts 
\ No newline at end of file
+    return pdf_contexts
@@ -0,0 +1,97 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Optional
+
+from utils.metrics import record_cache_lookup
+
+class PrefetchCache:
+    """
+    Bounded cache of values computed ahead of time in background threads.
+
+    prefetch() starts computing a value without waiting for it; get() returns it,
+    waiting if it is still in flight or computing it on the calling thread if it was
+    never prefetched, so a caller never queues behind background work.
+    Values are kept per key (least recently used dropped) and a get() counts as a
+    cache hit when the value was ready.
+    """
+
+    def __init__(self, name: str, max_workers: int = 2, max_cached: int = 1000):
+        """
+        Initialize the cache.
+
+        Args:
+            name: Cache name used in the cache hit/miss metrics
+            max_workers: Threads computing values in the background
+            max_cached: Values kept in memory
+        """
+        self.name = name
+        self.max_cached = max_cached
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-prefetch")
+        self._futures: "OrderedDict[Hashable, Future]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _submit(self, key: Hashable, fn: Callable, args: tuple) -> Future:
+        """Return the future of a key, submitting fn(*args) if needed (caller holds the lock)."""
+        future = self._futures.get(key)
+        if future is None:
+            future = self._executor.submit(fn, *args)
+            self._futures[key] = future
+            if len(self._futures) > self.max_cached:
+                self._futures.popitem(last=False)
+        else:
+            self._futures.move_to_end(key)
+        return future
+
+    def prefetch(self, key: Hashable, fn: Callable, *args):
+        """Start computing fn(*args) for a key in the background, unless it is cached or in flight."""
+        with self._lock:
+            self._submit(key, fn, args)
+
+    def get(self, key: Hashable, fn: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """
+        Return the value of a key, computing fn(*args) here if it was never prefetched.
+
+        A computation that failed is dropped from the cache and its exception raised.
+        """
+        with self._lock:
+            future = self._futures.get(key)
+            ready = future is not None and future.done()
+            if future is not None and future.cancel():
+                # Prefetched but still queued behind other background work: compute it here instead
+                future = None
+            computing = future is None
+            if computing:
+                # Other callers of the key wait on this future instead of computing it again
+                future = Future()
+                future.set_running_or_notify_cancel()
+                self._futures[key] = future
+                if len(self._futures) > self.max_cached:
+                    self._futures.popitem(last=False)
+            else:
+                self._futures.move_to_end(key)
+        record_cache_lookup(self.name, ready)
+        if computing:
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+        try:
+            return future.result(timeout)
+        except Exception:
+            with self._lock:
+                if self._futures.get(key) is future:
+                    del self._futures[key]
+            raise
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._futures
+
+    def clear(self):
+        """Forget every value; computations in flight finish but are not kept."""
+        with self._lock:
+            self._futures.clear()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
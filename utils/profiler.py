@@ -0,0 +1,184 @@
+import collections
+import contextvars
+import os
+import signal
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Optional
+from utils.metrics import REGISTRY
+
+PHASE_LATENCY = REGISTRY.histogram(
+    "essay_phase_duration_seconds", "Wall time per request phase (recorded while profiling is enabled)", ["phase"])
+
+PROFILE_DIR = os.getenv("ESSAY_PROFILE_DIR", "profiles")
+
+def profiling_enabled() -> bool:
+    """Profiling is opt-in through ESSAY_PROFILING=1."""
+    return os.getenv("ESSAY_PROFILING", "").lower() in ("1", "true", "yes")
+
+class ProfilerBusyError(Exception):
+    """Raised when a capture is requested while another one is running."""
+
+class SamplingProfiler:
+    """
+    Low-overhead wall-clock sampling profiler for a live worker.
+
+    A background thread snapshots the stacks of all other threads every
+    `interval` seconds via sys._current_frames() and aggregates them into
+    collapsed stacks ("frame;frame;frame count"), the input format of
+    flamegraph.pl, speedscope and similar tools.
+    """
+
+    def __init__(self, interval: float = 0.005, output_dir: str = PROFILE_DIR):
+        self.interval = interval
+        self.output_dir = output_dir
+        self._lock = threading.Lock()
+        self._running = False
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self, seconds: float) -> str:
+        """
+        Start a capture in the background.
+
+        Args:
+            seconds: Capture duration
+
+        Returns:
+            str: Path of the collapsed-stack file written when the capture finishes
+        """
+        with self._lock:
+            if self._running:
+                raise ProfilerBusyError("A profile capture is already running")
+            self._running = True
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"profile-{time.strftime('%Y%m%d_%H%M%S')}-{os.getpid()}.folded")
+        thread = threading.Thread(target=self._capture, args=(seconds, path), name="essay-profiler", daemon=True)
+        thread.start()
+        return path
+
+    def capture(self, seconds: float) -> Dict[str, int]:
+        """Sample for the given number of seconds and return the collapsed stack counts."""
+        own_id = threading.get_ident()
+        stacks: Dict[str, int] = collections.Counter()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stacks[self._collapse(frame)] += 1
+            time.sleep(self.interval)
+        return dict(stacks)
+
+    def _capture(self, seconds: float, path: str):
+        try:
+            stacks = self.capture(seconds)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w") as f:
+                for stack, count in sorted(stacks.items()):
+                    f.write(f"{stack} {count}\n")
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error capturing profile {path}: {str(e)}")
+        finally:
+            self._running = False
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(frames))
+
+class RequestTimings:
+    """Wall and CPU time spent in each phase of one request (CPU is measured on the thread running the phase)."""
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self.phases: Dict[str, List[float]] = {}
+        self.wall = 0.0
+
+    def add(self, phase: str, wall: float, cpu: float):
+        totals = self.phases.setdefault(phase, [0.0, 0.0])
+        totals[0] += wall
+        totals[1] += cpu
+
+    def to_dict(self) -> Dict:
+        attributed = sum(wall for wall, _ in self.phases.values())
+        return {
+            "name": self.name,
+            "wall_ms": round(self.wall * 1000, 3),
+            "unattributed_ms": round(max(0.0, self.wall - attributed) * 1000, 3),
+            "phases": {
+                phase: {"wall_ms": round(wall * 1000, 3), "cpu_ms": round(cpu * 1000, 3)}
+                for phase, (wall, cpu) in self.phases.items()
+            }
+        }
+
+    def server_timing_header(self) -> str:
+        """Render the phases as an HTTP Server-Timing header value."""
+        parts = [f"{phase};dur={wall * 1000:.2f}" for phase, (wall, _) in self.phases.items()]
+        parts.append(f"total;dur={self.wall * 1000:.2f}")
+        return ", ".join(parts)
+
+_current_timings: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar(
+    "essay_request_timings", default=None
+)
+
+# Most recent per-request breakdowns, newest last
+recent_timings: Deque[Dict] = collections.deque(maxlen=200)
+
+@contextmanager
+def request_timings(name: str) -> Iterator[RequestTimings]:
+    """Collect phase timings for the request running in the with-block."""
+    timings = RequestTimings(name)
+    token = _current_timings.set(timings)
+    wall_start = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        timings.wall = time.perf_counter() - wall_start
+        _current_timings.reset(token)
+        recent_timings.append(timings.to_dict())
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Attribute the wall and CPU time of the with-block to a phase of the current request.
+
+    This is a no-op outside request_timings(), so instrumented code costs almost
+    nothing when profiling is disabled.
+    """
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - wall_start
+        timings.add(name, wall, time.thread_time() - cpu_start)
+        PHASE_LATENCY.observe(wall, phase=name)
+
+profiler = SamplingProfiler()
+
+def install_signal_handler(seconds: float = 30.0, signum: int = getattr(signal, "SIGUSR2", 0)):
+    """Start a capture of the given length whenever the process receives signum (SIGUSR2 by default)."""
+    if not signum:
+        return
+
+    def handle(_signum, _frame):
+        try:
+            path = profiler.start(seconds)
+            print(f"Profiling for {seconds}s, writing {path}")
+        except ProfilerBusyError as e:
+            print(str(e))
+
+    signal.signal(signum, handle)
@@ -1,6 +1,15 @@
 from typing import Dict
 from .pdf_utils import load_pdf_contexts
 
+def _load_contexts() -> Dict[str, str]:
+    """Document texts from the memory-mapped corpus store, or extracted from the PDFs if it has not been built."""
+    from agent.corpus_store import get_corpus_store
+
+    store = get_corpus_store()
+    if store is None:
+        return load_pdf_contexts()
+    return {name: str(store.document(name), "utf-8") for name in store.documents}
+
 def get_system_prompt_with_contexts() -> str:
     """
     Generate the system prompt with PDF contexts included.
@@ -9,7 +18,7 @@ def get_system_prompt_with_contexts() -> str:
         str: System prompt with PDF contexts
     """
     # Load PDF contexts
-    pdf_contexts = load_pdf_contexts()
+    pdf_contexts = _load_contexts()
     
     # Base system prompt
     base_prompt = """You are Essay Engineering Tutor, an expert reading-comprehension and essay-writing coach.
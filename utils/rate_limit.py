@@ -0,0 +1,236 @@
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Callable, List
+
+# Queue priorities: lower values are served first
+PRIORITY_IN_PROGRESS = 0
+PRIORITY_NEW = 1
+
+class AdmissionRejected(Exception):
+    """Raised when a request is rejected by rate limiting or load shedding."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        """Retry-After value in whole seconds, as required by HTTP."""
+        return str(max(1, math.ceil(self.retry_after)))
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` tokens per second up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._clock = clock
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens from the bucket if enough are available.
+
+        Args:
+            tokens: Number of tokens to take
+
+        Returns:
+            float: 0.0 if the tokens were taken, otherwise the seconds until they will be available
+        """
+        with self._lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """Seconds until `tokens` will be available (0.0 if they are now), without taking them."""
+        with self._lock:
+            self._refill()
+            return max(0.0, (tokens - self.tokens) / self.rate)
+
+    def refund(self, tokens: float = 1.0):
+        """Give back tokens taken for a request that was not served."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + tokens)
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+class AdmissionController:
+    """
+    Admission control for chat turns within one worker process.
+
+    Requests first pass a global and a per-session token bucket (429 when a
+    session is too chatty, 503 when the worker as a whole is over its rate).
+    Admitted requests then take one of `max_concurrent` execution slots, waiting
+    in a bounded priority queue when all slots are busy. Sessions that are already
+    in progress are queued ahead of new sessions and may displace a waiting new
+    session when the queue is full, so active students keep flat latency during a
+    burst of new arrivals.
+    """
+
+    def __init__(self, max_concurrent: int = 32, max_queue: int = 128, queue_timeout: float = 10.0,
+                 global_rate: float = 200.0, global_burst: float = 400.0,
+                 session_rate: float = 2.0, session_burst: float = 5.0,
+                 max_tracked_sessions: int = 10000):
+        """
+        Initialize the admission controller.
+
+        Args:
+            max_concurrent: Number of turns processed at the same time
+            max_queue: Number of turns allowed to wait for a slot
+            queue_timeout: Seconds a turn may wait before it is shed with a 503
+            global_rate: Sustained turns per second accepted by this worker
+            global_burst: Burst size of the global bucket
+            session_rate: Sustained turns per second accepted per session
+            session_burst: Burst size of each session bucket
+            max_tracked_sessions: Number of session buckets kept in memory (least recently used are dropped)
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.session_rate = session_rate
+        self.session_burst = session_burst
+        self.max_tracked_sessions = max_tracked_sessions
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self._session_buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._active = 0
+        self._waiters: List[list] = []
+        self._seq = itertools.count()
+        self._service_time = 0.5
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """Create a controller configured from ESSAY_* environment variables."""
+        return cls(
+            max_concurrent=int(os.getenv("ESSAY_MAX_CONCURRENT", "32")),
+            max_queue=int(os.getenv("ESSAY_MAX_QUEUE", "128")),
+            queue_timeout=float(os.getenv("ESSAY_QUEUE_TIMEOUT", "10")),
+            global_rate=float(os.getenv("ESSAY_GLOBAL_RATE", "200")),
+            global_burst=float(os.getenv("ESSAY_GLOBAL_BURST", "400")),
+            session_rate=float(os.getenv("ESSAY_SESSION_RATE", "2")),
+            session_burst=float(os.getenv("ESSAY_SESSION_BURST", "5"))
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of turns waiting for an execution slot."""
+        return len(self._waiters)
+
+    @property
+    def active(self) -> int:
+        """Number of turns currently being processed."""
+        return self._active
+
+    @asynccontextmanager
+    async def admit(self, session_id: str, in_progress: bool):
+        """
+        Hold an execution slot for one chat turn.
+
+        Args:
+            session_id: Identifier of the session making the request
+            in_progress: Whether the session already has state (queued ahead of new sessions)
+
+        Raises:
+            AdmissionRejected: If the request is rate limited or shed
+        """
+        session_bucket = self._check_rate(session_id)
+        try:
+            await self._acquire(PRIORITY_IN_PROGRESS if in_progress else PRIORITY_NEW)
+        except AdmissionRejected:
+            # A shed turn was never served, so it does not count against the rate limits
+            session_bucket.refund()
+            self.global_bucket.refund()
+            raise
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._service_time = 0.9 * self._service_time + 0.1 * (time.monotonic() - started)
+            self._release()
+
+    def _check_rate(self, session_id: str) -> TokenBucket:
+        """Apply the per-session and global token buckets, returning the session's bucket."""
+        bucket = self._session_buckets.get(session_id)
+        if bucket is None:
+            bucket = TokenBucket(self.session_rate, self.session_burst)
+            self._session_buckets[session_id] = bucket
+            if len(self._session_buckets) > self.max_tracked_sessions:
+                self._session_buckets.popitem(last=False)
+        else:
+            self._session_buckets.move_to_end(session_id)
+
+        # Check both buckets before taking from either, so a rejected turn costs nothing
+        wait = bucket.wait_time()
+        if wait > 0:
+            raise AdmissionRejected(429, "Too many requests for this session", wait)
+        wait = self.global_bucket.try_acquire()
+        if wait > 0:
+            raise AdmissionRejected(503, "Server is at capacity", wait)
+        bucket.try_acquire()
+        return bucket
+
+    def _retry_estimate(self) -> float:
+        """Rough number of seconds until the queue drains."""
+        return self._service_time * (len(self._waiters) + 1) / self.max_concurrent
+
+    async def _acquire(self, priority: int):
+        """Take an execution slot, waiting in the priority queue if necessary."""
+        if self._active < self.max_concurrent and not self._waiters:
+            self._active += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            worst = max(self._waiters) if self._waiters else None
+            if worst is None or worst[0] <= priority:
+                raise AdmissionRejected(503, "Request queue is full", self._retry_estimate())
+            # Displace the most recently queued lower-priority request
+            self._waiters.remove(worst)
+            heapq.heapify(self._waiters)
+            worst[2].set_exception(AdmissionRejected(503, "Request queue is full", self._retry_estimate()))
+
+        future = asyncio.get_running_loop().create_future()
+        entry = [priority, next(self._seq), future]
+        heapq.heappush(self._waiters, entry)
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._discard(entry)
+            raise AdmissionRejected(503, "Timed out waiting in the request queue", self._retry_estimate())
+        except asyncio.CancelledError:
+            self._discard(entry)
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # The slot was handed over just before the cancellation
+                self._release()
+            raise
+
+    def _discard(self, entry: list):
+        """Remove a waiter that gave up."""
+        if entry in self._waiters:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+
+    def _release(self):
+        """Hand the slot to the next waiter, or free it."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active -= 1
@@ -0,0 +1,35 @@
+import asyncio
+import socket
+import uvicorn
+from uvicorn.protocols.http.auto import AutoHTTPProtocol
+
+class NoDelayHTTPProtocol(AutoHTTPProtocol):
+    """
+    HTTP protocol that always disables Nagle's algorithm on client connections.
+
+    With more than one worker, uvicorn binds the listening socket itself and the
+    accepted sockets report proto 0, so asyncio skips TCP_NODELAY. Responses are
+    then held back by delayed ACKs (~40 ms per keep-alive request).
+    """
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        sock = transport.get_extra_info("socket")
+        if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+            try:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            except OSError:
+                pass
+        super().connection_made(transport)
+
+def serve(app: str, host: str = "0.0.0.0", port: int = 8001, workers: int = 1):
+    """
+    Run an ASGI app with one or more uvicorn worker processes.
+
+    Args:
+        app: Import string of the ASGI app (e.g. "run:app"), required for multiple workers
+        host: Interface to bind
+        port: Port to bind
+        workers: Number of worker processes
+    """
+    uvicorn.run(app, host=host, port=port, workers=workers,
+                http="utils.server:NoDelayHTTPProtocol")
@@ -0,0 +1,185 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+from utils import fast_json
+from utils.profiler import phase
+
+DEFAULT_DB_PATH = os.path.join("data", "sessions.sqlite3")
+
+class SessionConflictError(Exception):
+    """Raised when a session could not be updated after repeated write conflicts."""
+
+class SessionStore:
+    """
+    Session state shared by every worker process through a local SQLite file.
+
+    Each session is stored as a JSON document with a version counter. Writers use
+    optimistic concurrency (compare-and-swap on the version), so any worker can
+    serve any session without sticky routing and without holding a database lock
+    while the agent is working on a turn.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, max_retries: int = 20):
+        """
+        Initialize the session store.
+
+        Args:
+            db_path: Path to the SQLite database file shared by all workers
+            max_retries: Number of attempts made by update() on write conflicts
+        """
+        self.db_path = db_path
+        self.max_retries = max_retries
+        self._local = threading.local()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return the connection owned by the calling thread."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        """Create the sessions table if it does not exist yet."""
+        self._connect().execute(
+            """CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._connect().execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at)")
+
+    def load(self, session_id: str) -> Tuple[Dict[str, Any], int]:
+        """
+        Load a session.
+
+        Args:
+            session_id: Identifier of the session
+
+        Returns:
+            Tuple[Dict[str, Any], int]: The session state and its version (0 if the session is new)
+        """
+        row = self._connect().execute(
+            "SELECT state, version FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return {}, 0
+        return fast_json.loads(row[0]), row[1]
+
+    def version(self, session_id: str) -> int:
+        """Return the version of a session (0 if it is new), without loading its state."""
+        row = self._connect().execute(
+            "SELECT version FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def exists(self, session_id: str) -> bool:
+        """Return True if the session has stored state."""
+        return self._connect().execute(
+            "SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone() is not None
+
+    def save(self, session_id: str, state: Dict[str, Any], version: int) -> bool:
+        """
+        Save a session if nobody else has written it since it was loaded.
+
+        Args:
+            session_id: Identifier of the session
+            state: JSON-serializable session state
+            version: Version returned by load()
+
+        Returns:
+            bool: True if the write succeeded, False on a version conflict
+        """
+        payload = fast_json.dumps_str(state)
+        conn = self._connect()
+        if version == 0:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO sessions (session_id, state, version, updated_at) VALUES (?, ?, 1, ?)",
+                (session_id, payload, time.time())
+            )
+        else:
+            cursor = conn.execute(
+                "UPDATE sessions SET state = ?, version = version + 1, updated_at = ? WHERE session_id = ? AND version = ?",
+                (payload, time.time(), session_id, version)
+            )
+        return cursor.rowcount == 1
+
+    def update(self, session_id: str, fn: Callable[[Dict[str, Any]], Any]) -> Any:
+        """
+        Apply fn to a session's state and persist the result, retrying on conflicts.
+
+        fn receives the current state dictionary, mutates it in place and returns the
+        value to hand back to the caller. It may be called more than once.
+
+        Args:
+            session_id: Identifier of the session
+            fn: Function applied to the session state
+
+        Returns:
+            Any: The value returned by the successful call to fn
+        """
+        for attempt in range(self.max_retries):
+            with phase("session_load"):
+                state, version = self.load(session_id)
+            result = fn(state)
+            with phase("session_save"):
+                saved = self.save(session_id, state, version)
+            if saved:
+                return result
+            time.sleep(min(0.001 * (2 ** attempt), 0.05))
+        raise SessionConflictError(f"Could not update session {session_id} after {self.max_retries} attempts")
+
+    def delete(self, session_id: str):
+        """Delete a session."""
+        self._connect().execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def purge(self, max_age_seconds: float) -> int:
+        """
+        Delete sessions that have not been updated recently.
+
+        Args:
+            max_age_seconds: Sessions idle for longer than this are deleted
+
+        Returns:
+            int: Number of deleted sessions
+        """
+        cursor = self._connect().execute(
+            "DELETE FROM sessions WHERE updated_at < ?", (time.time() - max_age_seconds,)
+        )
+        return cursor.rowcount
+
+    def count(self, max_age_seconds: Optional[float] = None) -> int:
+        """Return the number of stored sessions, or of those updated within max_age_seconds."""
+        if max_age_seconds is None:
+            return self._connect().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM sessions WHERE updated_at >= ?", (time.time() - max_age_seconds,)
+        ).fetchone()[0]
+
+    def average_state_bytes(self) -> float:
+        """Return the average serialized size of a session's state in bytes."""
+        value = self._connect().execute("SELECT AVG(LENGTH(state)) FROM sessions").fetchone()[0]
+        return float(value or 0.0)
+
+_store: Optional[SessionStore] = None
+_store_lock = threading.Lock()
+
+def get_session_store() -> SessionStore:
+    """Return the process-wide session store, creating it on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SessionStore(os.getenv("ESSAY_SESSION_DB", DEFAULT_DB_PATH))
+    return _store
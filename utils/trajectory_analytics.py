@@ -0,0 +1,149 @@
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from utils.trajectory_store import DEFAULT_LOG_PATH, RECORD, RULES
+
+# Column layout of the attempt log, matching utils.trajectory_store.RECORD
+ATTEMPT_DTYPE = np.dtype([
+    ("student", "<u8"),
+    ("sentence", "<u8"),
+    ("version", "<u2"),
+    ("accuracy", "<f4"),
+    ("violations", "<u4"),
+    ("timestamp", "<f8")
+])
+assert ATTEMPT_DTYPE.itemsize == RECORD.size
+
+class Trajectories:
+    """
+    Columnar view of version attempts, grouped into trajectories.
+
+    A trajectory is the sequence of attempts one student made on one sentence.
+    Attempts are sorted once by (student, sentence) into contiguous column arrays,
+    so that every query is a handful of vectorized passes. The sort is stable and
+    the log is written in time order, so each trajectory stays chronological.
+    """
+
+    def __init__(self, attempts: np.ndarray, presorted: bool = False):
+        """
+        Build the columns.
+
+        Args:
+            attempts: Structured array of ATTEMPT_DTYPE records (or a dict of its columns)
+            presorted: Whether the attempts are already grouped by (student, sentence)
+        """
+        columns = {name: np.asarray(attempts[name]) for name in ATTEMPT_DTYPE.names}
+        if not presorted:
+            order = np.lexsort((columns["sentence"], columns["student"]))
+            columns = {name: column[order] for name, column in columns.items()}
+        self.columns = columns
+        self.student = columns["student"]
+        self.sentence = columns["sentence"]
+        self.accuracy = columns["accuracy"]
+        self.violations = columns["violations"]
+        boundary = np.ones(len(self.student), dtype=bool)
+        boundary[1:] = (self.student[1:] != self.student[:-1]) | (self.sentence[1:] != self.sentence[:-1])
+        self.starts = np.flatnonzero(boundary)
+        self.ends = np.append(self.starts[1:], len(self.student))
+        # 1-based position of each attempt within its trajectory
+        self.position = np.arange(len(self.student)) - np.repeat(self.starts, self.ends - self.starts) + 1
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_LOG_PATH) -> "Trajectories":
+        """Map an attempt log into columns (a partially written last record is ignored)."""
+        count = os.path.getsize(path) // ATTEMPT_DTYPE.itemsize if os.path.exists(path) else 0
+        if count == 0:
+            return cls(np.zeros(0, dtype=ATTEMPT_DTYPE))
+        return cls(np.memmap(path, dtype=ATTEMPT_DTYPE, mode="r", shape=(count,)))
+
+    def __len__(self) -> int:
+        return len(self.student)
+
+    @property
+    def trajectory_count(self) -> int:
+        return len(self.starts)
+
+    def select(self, sentence: Optional[int] = None, students: Optional[List[int]] = None) -> "Trajectories":
+        """Restrict to one sentence key and/or a set of student keys (e.g. a class)."""
+        mask = np.ones(len(self), dtype=bool)
+        if sentence is not None:
+            mask &= self.sentence == sentence
+        if students is not None:
+            mask &= np.isin(self.student, np.asarray(students, dtype=np.uint64))
+        return Trajectories({name: column[mask] for name, column in self.columns.items()}, presorted=True)
+
+    def versions_to_reach(self, threshold: float = 90.0) -> Dict[str, float]:
+        """
+        How many versions students need to reach an accuracy threshold.
+
+        Returns:
+            Dict[str, float]: Number of trajectories, share that reached the threshold,
+            and the mean and median number of versions it took them
+        """
+        reached = np.flatnonzero(self.accuracy >= threshold)
+        # Hits are in trajectory order, so the first hit of each trajectory is where
+        # the trajectory number changes
+        trajectory = np.searchsorted(self.starts, reached, side="right") - 1
+        first = np.ones(len(reached), dtype=bool)
+        first[1:] = trajectory[1:] != trajectory[:-1]
+        versions = self.position[reached[first]]
+        total = self.trajectory_count
+        return {
+            "trajectories": total,
+            "reach_rate": len(versions) / total if total else 0.0,
+            "mean_versions": float(versions.mean()) if len(versions) else float("nan"),
+            "median_versions": float(np.median(versions)) if len(versions) else float("nan")
+        }
+
+    def violation_rates(self) -> Dict[str, float]:
+        """Share of attempts breaking each method rule."""
+        if not len(self):
+            return {rule: 0.0 for rule in RULES}
+        return {rule: float(np.count_nonzero(self.violations & (1 << bit))) / len(self) for bit, rule in enumerate(RULES)}
+
+    def plateaus(self, window: int = 3, min_gain: float = 5.0, threshold: float = 90.0) -> np.ndarray:
+        """
+        Trajectories that stopped improving before reaching the threshold.
+
+        A trajectory has plateaued when its best accuracy over its last `window`
+        attempts is less than `min_gain` points above the accuracy it had when that
+        window started.
+
+        Returns:
+            np.ndarray: One row per plateaued trajectory with its student, sentence,
+            number of attempts and latest accuracy
+        """
+        accuracy = self.accuracy
+        lengths = self.ends - self.starts
+        candidates = lengths >= window
+        last = self.ends[candidates] - 1
+        window_start = last - window + 1
+        # Best accuracy reached after the window started, one gather per offset
+        best = np.max(np.stack([accuracy[window_start + offset] for offset in range(1, window)]), axis=0) \
+            if window > 1 else accuracy[last]
+        stalled = (best - accuracy[window_start] < min_gain) & (accuracy[last] < threshold)
+        rows = last[stalled]
+        result = np.zeros(len(rows), dtype=[("student", "<u8"), ("sentence", "<u8"),
+                                            ("attempts", "<i8"), ("accuracy", "<f4")])
+        result["student"] = self.student[rows]
+        result["sentence"] = self.sentence[rows]
+        result["attempts"] = self.position[rows]
+        result["accuracy"] = accuracy[rows]
+        return result
+
+    def summary(self, threshold: float = 90.0) -> Dict:
+        """Dashboard summary: attempts, versions to reach the threshold, rule violations and plateaus."""
+        return {
+            "attempts": len(self),
+            "versions_to_reach": self.versions_to_reach(threshold),
+            "violation_rates": self.violation_rates(),
+            "plateaued_trajectories": int(len(self.plateaus(threshold=threshold)))
+        }
+
+if __name__ == "__main__":
+    log_path = sys.argv[1] if len(sys.argv) > 1 else os.getenv("ESSAY_TRAJECTORY_LOG", DEFAULT_LOG_PATH)
+    print(json.dumps(Trajectories.load(log_path).summary(), indent=2))
@@ -0,0 +1,100 @@
+import hashlib
+import os
+import struct
+import threading
+import time
+from typing import Iterable, Optional, Tuple
+
+from utils.word_rules import repeated_words, strip_version_label, words
+
+DEFAULT_LOG_PATH = os.path.join("data", "trajectories.bin")
+
+# Method rules a reconstruction can break, one bit each in the violations mask
+RULES = ("repeated_words", "copied_phrase", "too_short")
+
+# One fixed-width little-endian record per version attempt:
+# student key, sentence key, version number, accuracy (NaN if unknown), violations mask, timestamp
+RECORD = struct.Struct("<QQHfId")
+
+def student_key(session_id: str) -> int:
+    """64-bit key of a student (session), so records stay fixed-width."""
+    return int(hashlib.sha1(session_id.encode("utf-8")).hexdigest()[:16], 16)
+
+def sentence_key(sentence_id: str) -> int:
+    """64-bit key of a sentence from its hex sentence ID."""
+    return int(sentence_id, 16)
+
+def check_rules(reconstruction: str, original: str) -> int:
+    """
+    Check a reconstruction against the method rules.
+
+    Args:
+        reconstruction: The student's version, with or without its version label
+        original: The sentence being reconstructed
+
+    Returns:
+        int: Bit mask of the broken rules, bit i set for RULES[i]
+    """
+    original_words = words(original)
+    version_words = words(strip_version_label(reconstruction))
+
+    violations = 0
+    if repeated_words(original, reconstruction):
+        violations |= 1 << RULES.index("repeated_words")
+    original_trigrams = set(zip(original_words, original_words[1:], original_words[2:]))
+    if original_trigrams & set(zip(version_words, version_words[1:], version_words[2:])):
+        violations |= 1 << RULES.index("copied_phrase")
+    if len(version_words) < 3:
+        violations |= 1 << RULES.index("too_short")
+    return violations
+
+class TrajectoryStore:
+    """
+    Append-only log of version attempts shared by every worker process.
+
+    Each attempt is one fixed-width binary record appended with a single O_APPEND
+    write, so workers never interleave partial records and the log can be mapped
+    straight into columns for analytics (see utils.trajectory_analytics).
+    """
+
+    def __init__(self, path: str = DEFAULT_LOG_PATH):
+        self.path = path
+        self._fd: Optional[int] = None
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _write(self, data: bytes):
+        with self._lock:
+            if self._fd is None:
+                self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            os.write(self._fd, data)
+
+    def append(self, student: int, sentence: int, version: int, accuracy: float = float("nan"),
+               violations: int = 0, timestamp: Optional[float] = None):
+        """Record one version attempt."""
+        self._write(RECORD.pack(student, sentence, version, accuracy, violations,
+                                time.time() if timestamp is None else timestamp))
+
+    def append_many(self, attempts: Iterable[Tuple[int, int, int, float, int, float]]):
+        """Record (student, sentence, version, accuracy, violations, timestamp) attempts in one write."""
+        self._write(b"".join(RECORD.pack(*attempt) for attempt in attempts))
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+_store: Optional[TrajectoryStore] = None
+_store_lock = threading.Lock()
+
+def get_trajectory_store() -> TrajectoryStore:
+    """Return the process-wide trajectory log, creating it on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = TrajectoryStore(os.getenv("ESSAY_TRAJECTORY_LOG", DEFAULT_LOG_PATH))
+    return _store
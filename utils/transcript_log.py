@@ -0,0 +1,275 @@
+import argparse
+import fcntl
+import glob
+import hashlib
+import json
+import os
+import zlib
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+DEFAULT_LOG_PATH = os.path.join("data", "transcripts.jsonl.gz")
+
+# Bytes decompressed per step by the streaming readers
+READ_CHUNK = 64 * 1024
+
+# File name prefixes of the per-run JSON dumps the test harnesses used to write
+DUMP_PREFIXES = (
+    "conversation_", "correct_response_", "partially_correct_response_", "wrong_response_",
+    "test_results_", "error_test_results_", "simple-agent-test-"
+)
+# Dumps whose file name labels the tutor's response; they are kept as fixtures when converting
+LABELLED_PREFIXES = ("correct_response_", "partially_correct_response_", "wrong_response_")
+
+def records_digest(records: List[Dict]) -> str:
+    """Content hash of a transcript's records, independent of its session name and timestamp."""
+    return hashlib.sha1(json.dumps(records, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+class TranscriptLog:
+    """
+    Append-only, gzip-compressed JSON-lines log of tutoring transcripts.
+
+    Every appended transcript (one test run or conversation) becomes its own gzip
+    member, so the file stays a valid .jsonl.gz that zcat and gzip.open read in
+    full, while a sidecar index of (session, timestamp, byte range) lets readers
+    seek straight to the transcripts they need. Appends take an exclusive file
+    lock, so several harnesses can write to the same log.
+    """
+
+    def __init__(self, path: str = DEFAULT_LOG_PATH):
+        """
+        Initialize the log.
+
+        Args:
+            path: Path of the compressed log; the index is stored next to it with an .idx suffix
+        """
+        self.path = path
+        self.index_path = path + ".idx"
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def append(self, session: str, records: List[Dict], source: str = "", timestamp: Optional[str] = None) -> Dict:
+        """
+        Append one transcript.
+
+        Args:
+            session: Identifier of the conversation or test run
+            records: The transcript's records (turns, run summaries), written one JSON line each
+            source: Harness or directory the transcript comes from
+            timestamp: ISO timestamp of the transcript, defaults to now
+
+        Returns:
+            Dict: The index entry of the transcript
+        """
+        timestamp = timestamp or datetime.now().isoformat()
+        lines = "".join(
+            json.dumps({"session": session, "timestamp": timestamp, "source": source, **record}, ensure_ascii=False) + "\n"
+            for record in records
+        ).encode("utf-8")
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        member = compressor.compress(lines) + compressor.flush()
+        entry = {
+            "session": session,
+            "timestamp": timestamp,
+            "source": source,
+            "records": len(records),
+            "digest": records_digest(records),
+            "length": len(member)
+        }
+
+        with open(self.path, "ab") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0, os.SEEK_END)
+                entry["offset"] = f.tell()
+                f.write(member)
+                f.flush()
+                with open(self.index_path, "a") as index:
+                    index.write(json.dumps(entry) + "\n")
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return entry
+
+    def entries(self, session: Optional[str] = None, since: Optional[str] = None,
+                until: Optional[str] = None) -> List[Dict]:
+        """
+        List indexed transcripts, optionally filtered.
+
+        Args:
+            session: Only transcripts of this session
+            since: Only transcripts with an ISO timestamp at or after this one
+            until: Only transcripts with an ISO timestamp before this one
+
+        Returns:
+            List[Dict]: Index entries in append order
+        """
+        if not os.path.exists(self.index_path):
+            return []
+        result = []
+        with open(self.index_path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if session is not None and entry["session"] != session:
+                    continue
+                if since is not None and entry["timestamp"] < since:
+                    continue
+                if until is not None and entry["timestamp"] >= until:
+                    continue
+                result.append(entry)
+        return result
+
+    def iter_records(self, session: Optional[str] = None, since: Optional[str] = None,
+                     until: Optional[str] = None) -> Iterator[Dict]:
+        """Stream the records of the matching transcripts, decompressing only their byte ranges."""
+        entries = self.entries(session, since, until)
+        if not entries:
+            return
+        with open(self.path, "rb") as f:
+            for entry in entries:
+                f.seek(entry["offset"])
+                yield from _iter_member_lines(f, entry["length"])
+
+    def rebuild_index(self) -> int:
+        """
+        Rebuild the index by scanning the log, e.g. after a crash between a write and its index line.
+
+        Returns:
+            int: Number of transcripts found
+        """
+        entries = []
+        offset = 0
+        with open(self.path, "rb") as f:
+            data = f.read()
+        while offset < len(data):
+            decompressor = zlib.decompressobj(31)
+            lines = decompressor.decompress(data[offset:])
+            length = len(data) - offset - len(decompressor.unused_data)
+            records = [json.loads(line) for line in lines.decode("utf-8").splitlines() if line.strip()]
+            if records:
+                envelope = {key: records[0][key] for key in ("session", "timestamp", "source")}
+                for record in records:
+                    del record["session"], record["timestamp"], record["source"]
+                entries.append({
+                    **envelope,
+                    "records": len(records),
+                    "digest": records_digest(records),
+                    "length": length,
+                    "offset": offset
+                })
+            offset += length
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as index:
+            index.writelines(json.dumps(entry) + "\n" for entry in entries)
+        os.replace(tmp_path, self.index_path)
+        return len(entries)
+
+def _iter_member_lines(f, length: int) -> Iterator[Dict]:
+    """Decompress one gzip member of the given length from the current position, yielding its records."""
+    decompressor = zlib.decompressobj(31)
+    remaining = length
+    pending = b""
+    while remaining > 0:
+        chunk = f.read(min(READ_CHUNK, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        pending += decompressor.decompress(chunk)
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    pending += decompressor.flush()
+    for line in pending.split(b"\n"):
+        if line.strip():
+            yield json.loads(line)
+
+def records_from_dump(data: Dict) -> List[Dict]:
+    """
+    Flatten a legacy per-run JSON dump into transcript records.
+
+    Handles the conversation dumps ({"model", "interactions": [...]}) and the
+    simple agent test runs ({"test_run", "results": [...]}), whose per-test lists
+    of inputs, responses and agent states become one record per turn.
+
+    Args:
+        data: Parsed content of the dump
+
+    Returns:
+        List[Dict]: One "turn" record per exchange, plus "run" records for summaries and errors
+    """
+    records = []
+    for interaction in data.get("interactions", []):
+        records.append({"kind": "turn", "model": data.get("model"), **interaction})
+    for result in data.get("results", []):
+        responses = result.get("actual_responses", [])
+        expected = result.get("expected_behaviors", [])
+        states = result.get("agent_state", [])
+        for i, user_input in enumerate(result.get("inputs", [])):
+            records.append({
+                "kind": "turn",
+                "test_name": result.get("test_name"),
+                "step": i + 1,
+                "input": user_input,
+                "response": responses[i] if i < len(responses) else None,
+                "expected": expected[i] if i < len(expected) else None,
+                "agent_state": states[i] if i < len(states) else None
+            })
+        records.append({
+            "kind": "run",
+            "test_name": result.get("test_name"),
+            "passed": result.get("passed"),
+            "notes": result.get("notes", [])
+        })
+    if "test_run" in data:
+        records.append({"kind": "run", **data["test_run"]})
+    if "error" in data:
+        records.append({"kind": "run", "error": data["error"]})
+    return records
+
+def convert_dumps(paths: List[str], log: TranscriptLog, remove: bool = False) -> int:
+    """
+    Append legacy JSON dumps to a transcript log, skipping runs whose records the log already holds.
+
+    Args:
+        paths: JSON files to convert
+        log: Destination log
+        remove: Delete each file once it is in the log, except the labelled fixtures
+
+    Returns:
+        int: Number of transcripts appended
+    """
+    known = {entry["digest"] for entry in log.entries()}
+    appended = 0
+    for path in sorted(paths):
+        with open(path) as f:
+            data = json.load(f)
+        session = os.path.splitext(os.path.basename(path))[0]
+        timestamp = data.get("timestamp") or data.get("test_run", {}).get("timestamp")
+        records = records_from_dump(data)
+        if records_digest(records) not in known:
+            entry = log.append(session, records, source=os.path.basename(os.path.dirname(path)), timestamp=timestamp)
+            known.add(entry["digest"])
+            appended += 1
+        if remove and not os.path.basename(path).startswith(LABELLED_PREFIXES):
+            os.remove(path)
+    return appended
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert per-run JSON dumps into the transcript log.")
+    parser.add_argument("dirs", nargs="*", default=["data", "test-data"], help="Directories holding the JSON dumps")
+    parser.add_argument("--log", default=DEFAULT_LOG_PATH)
+    parser.add_argument("--remove", action="store_true", help="Delete the dumps once converted (labelled responses are kept)")
+    parser.add_argument("--rebuild-index", action="store_true", help="Rebuild the index from the log and exit")
+    args = parser.parse_args()
+
+    transcript_log = TranscriptLog(args.log)
+    if args.rebuild_index:
+        print(f"Indexed {transcript_log.rebuild_index()} transcripts in {args.log}")
+    else:
+        dumps = [path for directory in args.dirs for path in glob.glob(os.path.join(directory, "*.json"))
+                 if os.path.basename(path).startswith(DUMP_PREFIXES)]
+        count = convert_dumps(dumps, transcript_log, remove=args.remove)
+        print(f"Appended {count} transcripts from {len(dumps)} files to {args.log}")
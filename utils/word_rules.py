@@ -0,0 +1,54 @@
+import re
+from typing import FrozenSet, List
+
+# A word, with inner apostrophes, hyphens and dots kept ("don't", "spring-cleaning", "a.m")
+WORD = re.compile(r"\w(?:[\w'’.-]*\w)?")
+# Label a student puts in front of a version ("v1.", "Version 2:")
+VERSION_LABEL = re.compile(r"^\s*[\"'“]?\s*v(?:ersion)?\s*\d+\s*[.:)-]?\s*", re.IGNORECASE)
+
+# Function words a reconstruction may reuse; the method's own answer key keeps
+# "the", "had", "been" and "of" in its most accurate versions
+STOPWORDS = frozenset(
+    "a an the and or but of to in on at for with by from as it its his her he she they them this that "
+    "there was were is are be been had has have some also".split()
+)
+
+def strip_version_label(text: str) -> str:
+    """A version without its "v1." label."""
+    return VERSION_LABEL.sub("", text)
+
+def words(text: str) -> List[str]:
+    """Lowercased words of a text, in order."""
+    return [word.lower() for word in WORD.findall(text)]
+
+def forbidden_words(original: str) -> FrozenSet[str]:
+    """
+    Words of a sentence that a reconstruction may not repeat.
+
+    Every word counts except function words (STOPWORDS) and names, taken to be
+    the capitalized words past the start of the sentence.
+    """
+    original_words = WORD.findall(original)
+    names = {word.lower() for word in original_words[1:] if word[:1].isupper()}
+    return frozenset(word.lower() for word in original_words) - names - STOPWORDS
+
+def find_repeated(forbidden: FrozenSet[str], reconstruction: str) -> List[str]:
+    """Forbidden words a reconstruction uses, in the order it first uses them."""
+    repeated = []
+    for word in words(strip_version_label(reconstruction)):
+        if word in forbidden and word not in repeated:
+            repeated.append(word)
+    return repeated
+
+def repeated_words(original: str, reconstruction: str) -> List[str]:
+    """
+    Check the method's rule against repeating words of the original sentence.
+
+    Args:
+        original: The sentence being reconstructed
+        reconstruction: The student's version, with or without its version label
+
+    Returns:
+        List[str]: The repeated words, in the order the reconstruction uses them
+    """
+    return find_repeated(forbidden_words(original), reconstruction)
@@ -0,0 +1,48 @@
+import threading
+from typing import Any, Dict, Optional
+
+class HubFull(Exception):
+    """Raised when a worker already holds its maximum number of WebSocket sessions."""
+
+class ConnectionHub:
+    """
+    The WebSocket sessions held open by one worker, one connection per session.
+
+    Many sessions are multiplexed on the worker's event loop. A student who
+    reconnects (e.g. from a new tab) takes the session over: connect() hands back
+    the previous connection so the caller can close it.
+    """
+
+    def __init__(self, max_connections: int = 1000):
+        self.max_connections = max_connections
+        self._connections: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+    def connect(self, session_id: str, connection: Any) -> Optional[Any]:
+        """
+        Register the connection of a session.
+
+        Returns:
+            Optional[Any]: The connection it replaces, if the session was already open
+
+        Raises:
+            HubFull: If max_connections sessions are open and this one is new
+        """
+        with self._lock:
+            previous = self._connections.get(session_id)
+            if previous is None and len(self._connections) >= self.max_connections:
+                raise HubFull(f"{len(self._connections)} sessions are already open")
+            self._connections[session_id] = connection
+            return previous
+
+    def disconnect(self, session_id: str, connection: Any):
+        """Forget a connection, unless it was already replaced by a newer one."""
+        with self._lock:
+            if self._connections.get(session_id) is connection:
+                del self._connections[session_id]
+
+    def get(self, session_id: str) -> Optional[Any]:
+        return self._connections.get(session_id)